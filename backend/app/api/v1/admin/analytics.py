@@ -9,8 +9,13 @@ from sqlmodel import Session
 from app.db.session import get_session
 from app.api.deps import require_admin_user
 from app.models.domain import User
-from app.schemas.admin import DashboardStatsResponse, WorkerAnalyticsResponse
+from app.schemas.admin import (
+    AdminSlaReportResponse,
+    DashboardStatsResponse,
+    WorkerAnalyticsResponse,
+)
 from app.services.admin_analytics_service import AdminAnalyticsService
+from app.services.sla_service import SlaService
 
 router = APIRouter()
 
@@ -43,3 +48,18 @@ def get_dashboard_stats(
     """Get quick dashboard statistics"""
     org_id = None if current_user.role == "SYSADMIN" else current_user.org_id
     return AdminAnalyticsService.get_dashboard_stats(session, org_id=org_id)
+
+
+@router.get(
+    "/sla",
+    response_model=AdminSlaReportResponse,
+    summary="Get SLA compliance",
+    description="Return SLA compliance, breaches, and time to the next breach against each category's expected resolution days, overall and per organization, category, and priority in the current administrative scope.",
+)
+def get_sla_report(
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_admin_user),
+):
+    """Get SLA compliance for the admin's authority"""
+    org_id = None if current_user.role == "SYSADMIN" else current_user.org_id
+    return SlaService.get_report(session, org_id=org_id, include_groups=True)
@@ -1,78 +1,235 @@
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlmodel import Session, select, col
 
 from app.db.session import get_session
 from app.api.deps import require_admin_user
 from app.models.domain import User, AuditLog, Issue
+from app.core.config import settings
+from app.core.time import municipal_today
+from app.schemas.common import ErrorResponse
 from app.schemas.analytics import (
+    CacheStatsResponse,
     GlobalStatsResponse,
     HeatmapPoint,
+    IssueCluster,
     PublicIssueMapItem,
+    SlaReportResponse,
 )
-from app.services.public_analytics_service import PublicAnalyticsService
+from app.services.analytics_cache import AnalyticsCacheService
+from app.services.issue_clusters import issue_cluster_index
+from app.services.public_analytics_service import (
+    BBox,
+    PublicAnalyticsService,
+    decode_cursor,
+    heatmap_cell_degrees,
+    snap_bbox,
+)
+from app.services.sla_service import SlaService
+from app.services.vector_tiles import MEDIA_TYPE, VectorTileService, tile_in_range
 
 router = APIRouter()
 
+
+def _parse_bbox(bbox: Optional[str]) -> Optional[BBox]:
+    if bbox is None:
+        return None
+    try:
+        west, south, east, north = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="bbox must be 'west,south,east,north'"
+        )
+    if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range")
+    return west, south, east, north
+
 @router.get(
     "/heatmap",
     response_model=List[HeatmapPoint],
     summary="Get public issue heatmap data",
-    description="Return geospatial heatmap points for all non-closed issues for use in public and admin map views.",
+    description=(
+        "Return heatmap cells for non-closed issues, optionally limited to a "
+        "bounding box. Issues are binned server-side into screen-sized cells "
+        "for the given zoom level (a city-scale default when omitted), "
+        "weighted by report count and priority."
+    ),
+    responses={400: {"model": ErrorResponse, "description": "Invalid bounding box"}},
 )
 def get_heatmap(
+    bbox: Optional[str] = Query(
+        default=None, description="west,south,east,north in degrees"
+    ),
+    zoom: Optional[int] = Query(default=None, ge=0, le=22),
     session: Session = Depends(get_session),
 ):
     """Public endpoint - returns heatmap data for all issues"""
-    return PublicAnalyticsService.get_heatmap_data(session)
+    bounds = _parse_bbox(bbox)
+    if zoom is None:
+        zoom = settings.HEATMAP_DEFAULT_ZOOM
+    if bounds is not None:
+        bounds = snap_bbox(bounds, heatmap_cell_degrees(zoom))
+    return AnalyticsCacheService.cached(
+        session,
+        f"heatmap:{zoom}:{bounds}",
+        ["issue"],
+        lambda s: PublicAnalyticsService.get_heatmap_data(s, bounds, zoom),
+    )
+
+@router.get(
+    "/clusters",
+    response_model=List[IssueCluster],
+    summary="Get clustered open issues for a map view",
+    description=(
+        "Return clusters and single issues in the bounding box at the given zoom "
+        "level, each with counts by status. Clusters are precomputed per zoom "
+        "from an in-memory KD-tree of open issues."
+    ),
+    responses={400: {"model": ErrorResponse, "description": "Invalid bounding box"}},
+)
+def get_issue_clusters(
+    zoom: int = Query(ge=0, le=22),
+    bbox: Optional[str] = Query(
+        default=None, description="west,south,east,north in degrees"
+    ),
+    session: Session = Depends(get_session),
+):
+    bounds = _parse_bbox(bbox) or (-180.0, -85.0511, 180.0, 85.0511)
+    return issue_cluster_index.clusters(session, bounds, zoom)
+
+@router.get(
+    "/tiles/{z}/{x}/{y}.pbf",
+    response_class=Response,
+    summary="Get a vector tile of issues and zones",
+    description=(
+        "Return a Mapbox Vector Tile with an `issues` layer (open issues with "
+        "status, category, priority and report_count) and a `zones` layer "
+        "(authority boundaries) for the given web-mercator tile."
+    ),
+    responses={
+        200: {
+            "description": "Mapbox Vector Tile",
+            "content": {MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}},
+        },
+        304: {"description": "Client copy is current (If-None-Match)"},
+        400: {"model": ErrorResponse, "description": "Tile coordinates out of range"},
+    },
+)
+def get_vector_tile(
+    z: int,
+    x: int,
+    y: int,
+    if_none_match: Optional[str] = Header(None),
+    session: Session = Depends(get_session),
+):
+    if not tile_in_range(z, x, y):
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range")
+
+    tile = VectorTileService.tile(session, z, x, y)
+    headers = {"ETag": tile.etag, "Cache-Control": "public, max-age=60"}
+    if if_none_match == tile.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=tile.content, media_type=MEDIA_TYPE, headers=headers)
 
 @router.get(
     "/stats",
     response_model=GlobalStatsResponse,
     summary="Get public aggregate analytics",
-    description="Return dashboard summary metrics, breakdown charts, and seven-day trend data for the public analytics view.",
+    description="Return dashboard summary metrics, breakdown charts, and daily trend data (seven days by default) for the public analytics view.",
 )
 def get_global_stats(
+    days: int = Query(
+        default=7,
+        ge=1,
+        le=settings.TREND_MAX_DAYS,
+        description="Trend window in days, ending today in the municipal timezone",
+    ),
     session: Session = Depends(get_session),
 ):
     """Public endpoint - returns aggregate statistics"""
-    return PublicAnalyticsService.get_global_stats(session)
+    source = "rollup" if settings.ANALYTICS_USE_ROLLUPS else "live"
+    # The trend window moves at municipal midnight.
+    return AnalyticsCacheService.cached(
+        session,
+        f"stats:{source}:{days}:{municipal_today().isoformat()}",
+        ["issue", "category", "user", "issuedailyrollup", "issuestatuscounter"],
+        lambda s: PublicAnalyticsService.get_global_stats(s, days),
+    )
+
+@router.get(
+    "/sla",
+    response_model=SlaReportResponse,
+    summary="Get public SLA compliance",
+    description="Return SLA compliance against each category's expected resolution days, overall and per category and priority.",
+)
+def get_sla_report(session: Session = Depends(get_session)):
+    """Public endpoint - returns SLA compliance"""
+    # Open issues cross their deadlines as time passes; the cache TTL bounds
+    # how late that shows up.
+    return AnalyticsCacheService.cached(
+        session, "sla", ["issue", "category"], SlaService.get_report
+    )
 
 @router.get(
     "/issues-public",
     response_model=List[PublicIssueMapItem],
     summary="Get public map issues",
-    description="Return simplified public issue records for map rendering without exposing internal assignment details.",
+    description=(
+        "Return simplified public issue records for map rendering without exposing "
+        "internal assignment details, newest first. Filter by bounding box, status, "
+        "category and creation time. When more issues match than `limit`, the "
+        "`X-Next-Cursor` response header holds the `cursor` for the next page."
+    ),
+    responses={400: {"model": ErrorResponse, "description": "Invalid bounding box or cursor"}},
 )
 def get_public_issues(
+    response: Response,
+    bbox: Optional[str] = Query(
+        default=None, description="west,south,east,north in degrees"
+    ),
+    status: Optional[List[str]] = Query(default=None),
+    category_id: Optional[UUID] = Query(default=None),
+    created_since: Optional[datetime] = Query(default=None),
+    limit: int = Query(default=1000, ge=1, le=5000),
+    cursor: Optional[str] = Query(default=None),
     session: Session = Depends(get_session),
 ):
-    """Public endpoint - returns all issues for map display"""
-    from app.models.domain import Category
-
-    issues = session.exec(select(Issue)).all()
-    result = []
-    for issue in issues:
-        cat_name = "Unknown"
-        if issue.category_id:
-            cat = session.get(Category, issue.category_id)
-            cat_name = cat.name if cat else "Unknown"
-
-        result.append(
-            {
-                "id": str(issue.id),
-                "lat": issue.lat,
-                "lng": issue.lng,
-                "status": issue.status,
-                "category_name": cat_name,
-                "created_at": issue.created_at.isoformat()
-                if issue.created_at
-                else None,
-            }
-        )
-    return result
+    """Public endpoint - returns issues for map display"""
+    bounds = _parse_bbox(bbox)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    statuses = sorted(set(status)) if status else None
+
+    items, next_cursor = AnalyticsCacheService.cached(
+        session,
+        f"issues-public:{bounds}:{statuses}:{category_id}:{created_since}:{limit}:{cursor}",
+        ["issue", "category"],
+        lambda s: PublicAnalyticsService.get_public_issues(
+            s,
+            bbox=bounds,
+            statuses=statuses,
+            category_id=category_id,
+            created_since=created_since,
+            limit=limit,
+            cursor=after,
+        ),
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+@router.get(
+    "/cache-stats",
+    response_model=CacheStatsResponse,
+    summary="Get public analytics cache counters",
+    description="Return hit, miss, coalescing and refresh counters of the cache in front of the public analytics endpoints for this process.",
+)
+def get_cache_stats(current_user: User = Depends(require_admin_user)):
+    return AnalyticsCacheService.stats()
 
 @router.get(
     "/audit/{entity_id}",
@@ -1,13 +1,33 @@
 import logging
+from contextlib import nullcontext
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlmodel import Session, select, col
+from app.core.config import settings
 from app.db.session import get_session
 from app.models.domain import Category, Issue, Evidence, User
 from app.schemas.common import ErrorResponse
-from app.schemas.issue import IssueRead, IssueReportResponse
+from app.schemas.issue import (
+    BatchReportItemResult,
+    BatchReportResponse,
+    IngestMetricsResponse,
+    IngestStatusResponse,
+    IssueRead,
+    IssueReportAccepted,
+    IssueReportResponse,
+)
+from app.services.batch_report_service import BatchReportItem, BatchReportService
+from app.services.ingest_service import (
+    IngestQueueFull,
+    IngestReservation,
+    ingest_pipeline,
+)
+from app.services.idempotency_service import IdempotencyService, IdempotentRequest
 from app.services.issue_service import IssueService
-from app.api.deps import require_citizen_user
+from app.services.photo_storage import PhotoStorage
+from app.api.deps import require_admin_user, require_citizen_user
 from uuid import UUID
 from typing import Any, List, Optional, cast
 
@@ -19,87 +39,252 @@ logger = logging.getLogger(__name__)
     "/report",
     response_model=IssueReportResponse,
     summary="Report a road issue",
-    description="Create a new citizen issue report or merge it into an existing nearby report when the location is a duplicate.",
+    description=(
+        "Create a new citizen issue report or merge it into an existing nearby report when the location is a duplicate. "
+        "In staged ingestion mode the photo is processed in the background and the endpoint answers 202. "
+        "Retries sending the same Idempotency-Key replay the first response."
+    ),
     responses={
+        202: {"model": IssueReportAccepted, "description": "Report persisted, photo queued for ingestion"},
         404: {"model": ErrorResponse, "description": "Issue category not found"},
-        422: {"model": ErrorResponse, "description": "No authority jurisdiction covers the supplied coordinates"},
+        400: {"model": ErrorResponse, "description": "Idempotency-Key is malformed"},
+        413: {"model": ErrorResponse, "description": "Photo exceeds the upload size limit"},
+        422: {"model": ErrorResponse, "description": "No authority jurisdiction covers the supplied coordinates, or Idempotency-Key reused for another request"},
+        503: {"model": ErrorResponse, "description": "Ingestion queue is full"},
     },
 )
-async def report_issue(
+def report_issue(
     category_id: UUID = Form(...),
     lat: float = Form(...),
     lng: float = Form(...),
     address: Optional[str] = Form(None),
     photo: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_citizen_user),
 ):
+    # Declared sync so FastAPI runs the DB, EXIF and storage work in its
+    # threadpool instead of on the event loop.
     reporter = current_user
+    idempotency = IdempotencyService.for_request(
+        reporter.id, "report", idempotency_key, category_id, lat, lng, address
+    )
+    replayed = idempotency.replay(session)
+    if replayed is not None:
+        return replayed
+
     category = session.get(Category, category_id)
     if category is None:
         raise HTTPException(status_code=404, detail="Issue category not found")
+    PhotoStorage.ensure_within_limit(photo)
+
+    staged = settings.REPORT_INGEST_MODE == "staged"
+    reservation: Optional[IngestReservation] = None
+    if staged:
+        try:
+            reservation = ingest_pipeline.reserve()
+        except IngestQueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Report ingestion queue is full, retry shortly",
+                headers={"Retry-After": str(settings.INGEST_RETRY_AFTER_SECONDS)},
+            )
 
-    point_wkt = IssueService.build_point_wkt(lat, lng)
-    duplicate_issue = IssueService.find_duplicate_issue(session, point_wkt)
+    with reservation or nullcontext():
+        point_wkt = IssueService.build_point_wkt(lat, lng)
+        duplicate_issue = IssueService.find_duplicate_issue(session, point_wkt)
+
+        if duplicate_issue:
+            evidence = _report_evidence(
+                duplicate_issue.id, reporter.id, photo, reservation
+            )
+            duplicate_issue.report_count += 1
+            session.add(duplicate_issue)
+            session.add(evidence)
+            return _commit_report(
+                session, reservation, idempotency, duplicate_issue.id, evidence
+            )
+
+        org_id = IssueService.find_org_for_location(session, point_wkt)
+        if org_id is None:
+            logger.warning(
+                "Rejected issue report outside configured jurisdiction for reporter=%s lat=%s lng=%s",
+                reporter.email,
+                lat,
+                lng,
+            )
+            raise HTTPException(
+                status_code=422,
+                detail=(
+                    f"No authority jurisdiction covers coordinates lat={lat}, lng={lng}. "
+                    "Ask a system administrator to configure coverage for this area."
+                ),
+            )
 
-    if duplicate_issue:
-        photo_content = await photo.read()
-        exif_data = IssueService.extract_exif(photo_content)
-        file_path = IssueService.store_issue_photo(photo_content)
-        duplicate_issue.report_count += 1
-        evidence = IssueService.build_evidence(
-            duplicate_issue.id, reporter.id, file_path, exif_data
+        new_issue = Issue(
+            category_id=category_id,
+            status="REPORTED",
+            location=point_wkt,
+            address=address,
+            reporter_id=reporter.id,
+            org_id=org_id,
+            priority=None,
+            report_count=1,
         )
-        session.add(duplicate_issue)
+        # Ids are generated client-side, so the issue and its evidence are
+        # written in a single flush and committed together.
+        evidence = _report_evidence(new_issue.id, reporter.id, photo, reservation)
+        session.add(new_issue)
         session.add(evidence)
-        session.commit()
-        return IssueReportResponse(
+        return _commit_report(
+            session, reservation, idempotency, new_issue.id, evidence
+        )
+
+
+def _report_evidence(
+    issue_id: UUID,
+    reporter_id: UUID,
+    photo: UploadFile,
+    reservation: Optional[IngestReservation],
+) -> Evidence:
+    if reservation is not None:
+        reservation.spool(photo.file)
+        return IssueService.build_pending_evidence(issue_id, reporter_id)
+    exif_data = IssueService.extract_exif(photo.file)
+    stored = IssueService.store_issue_photo(photo.file)
+    return IssueService.build_evidence(
+        issue_id, reporter_id, stored.file_path, exif_data, content_sha256=stored.sha256
+    )
+
+
+def _commit_report(
+    session: Session,
+    reservation: Optional[IngestReservation],
+    idempotency: IdempotentRequest,
+    issue_id: UUID,
+    evidence: Evidence,
+):
+    # Read before commit: committed instances are expired and would be
+    # reloaded with an extra SELECT.
+    evidence_id, file_path = evidence.id, evidence.file_path
+    if reservation is None:
+        status_code = 200
+        body: Any = IssueReportResponse(
             message="Report submitted successfully",
-            issue_id=duplicate_issue.id,
+            issue_id=issue_id,
+        )
+    else:
+        status_code = 202
+        body = IssueReportAccepted(
+            message="Report accepted for processing",
+            issue_id=issue_id,
+            evidence_id=evidence_id,
+            upload_status="PENDING",
         )
+    idempotency.record(session, status_code, body)
+    replayed = idempotency.commit(session)
+    if replayed is not None:
+        return replayed
+
+    if reservation is None:
+        return body
+    reservation.submit(evidence_id, file_path)
+    return JSONResponse(status_code=202, content=jsonable_encoder(body))
+
 
-    org_id = IssueService.find_org_for_location(session, point_wkt)
-    if org_id is None:
-        logger.warning(
-            "Rejected issue report outside configured jurisdiction for reporter=%s lat=%s lng=%s",
-            reporter.email,
-            lat,
-            lng,
+@router.post(
+    "/report-batch",
+    response_model=BatchReportResponse,
+    summary="Report several road issues at once",
+    description=(
+        "Submit reports queued offline as repeated form fields, one entry per report in the same order. "
+        "Each item is created, merged into an existing nearby issue, or rejected individually; "
+        "accepted items are committed together."
+    ),
+    responses={
+        400: {"model": ErrorResponse, "description": "Batch fields are inconsistent or exceed the item limit"},
+    },
+)
+def report_issue_batch(
+    category_id: List[UUID] = Form(...),
+    lat: List[float] = Form(...),
+    lng: List[float] = Form(...),
+    address: Optional[List[str]] = Form(None),
+    photo: List[UploadFile] = File(...),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_citizen_user),
+):
+    count = len(photo)
+    addresses = address or [""] * count
+    if any(len(field) != count for field in (category_id, lat, lng, addresses)):
+        raise HTTPException(
+            status_code=400, detail="Every batch field needs one value per photo"
         )
+    if count > settings.BATCH_REPORT_MAX_ITEMS:
         raise HTTPException(
-            status_code=422,
-            detail=(
-                f"No authority jurisdiction covers coordinates lat={lat}, lng={lng}. "
-                "Ask a system administrator to configure coverage for this area."
-            ),
+            status_code=400,
+            detail=f"A batch may contain at most {settings.BATCH_REPORT_MAX_ITEMS} reports",
         )
 
-    photo_content = await photo.read()
-    exif_data = IssueService.extract_exif(photo_content)
-    file_path = IssueService.store_issue_photo(photo_content)
-
-    new_issue = Issue(
-        category_id=category_id,
-        status="REPORTED",
-        location=point_wkt,
-        address=address,
-        reporter_id=reporter.id,
-        org_id=org_id,
-        priority=None,
-        report_count=1,
+    items = [
+        BatchReportItem(
+            category_id=category_id[i],
+            lat=lat[i],
+            lng=lng[i],
+            address=addresses[i] or None,
+            photo=photo[i],
+        )
+        for i in range(count)
+    ]
+    results = BatchReportService.submit(session, current_user, items)
+    return BatchReportResponse(
+        items=[
+            BatchReportItemResult(
+                index=result.index,
+                status=result.status,
+                issue_id=result.issue_id,
+                detail=result.detail,
+            )
+            for result in results
+        ]
     )
-    session.add(new_issue)
-    session.commit()
-    session.refresh(new_issue)
 
-    evidence = IssueService.build_evidence(
-        new_issue.id, reporter.id, file_path, exif_data
-    )
-    session.add(evidence)
-    session.commit()
-    return IssueReportResponse(
-        message="Report submitted successfully",
-        issue_id=new_issue.id,
+
+@router.get(
+    "/ingest/metrics",
+    response_model=IngestMetricsResponse,
+    summary="Get ingestion pipeline metrics",
+    description="Return queue depth, worker utilisation, and backpressure counters for staged report ingestion.",
+)
+def get_ingest_metrics(current_user: User = Depends(require_admin_user)):
+    return ingest_pipeline.metrics()
+
+
+@router.get(
+    "/ingest/{evidence_id}",
+    response_model=IngestStatusResponse,
+    summary="Get report ingestion status",
+    description="Return the processing state of a staged report photo and the EXIF metadata once it is stored.",
+    responses={404: {"model": ErrorResponse, "description": "Evidence not found"}},
+)
+def get_ingest_status(
+    evidence_id: UUID,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(require_citizen_user),
+):
+    evidence = session.get(Evidence, evidence_id)
+    if evidence is None or (
+        current_user.role == "CITIZEN" and evidence.reporter_id != current_user.id
+    ):
+        raise HTTPException(status_code=404, detail="Evidence not found")
+
+    return IngestStatusResponse(
+        evidence_id=evidence.id,
+        issue_id=evidence.issue_id,
+        upload_status=evidence.upload_status,
+        exif_timestamp=evidence.exif_timestamp,
+        exif_lat=evidence.exif_lat,
+        exif_lng=evidence.exif_lng,
     )
 
 
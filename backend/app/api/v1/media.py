@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlmodel import Session, select
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
+from minio.error import S3Error
+from starlette.background import BackgroundTask
+from sqlmodel import Session
 from app.db.session import get_session
-from app.models.domain import Evidence
+from app.services.evidence_lookup import EvidenceLookupService
+from app.services.media_derivatives import FORMATS, MediaDerivativeService
 from app.services.minio_client import minio_client
+from app.services.presigned_urls import PresignedUrl, presigned_urls
 from app.core.config import settings
 from uuid import UUID
 from app.schemas.common import ErrorResponse
@@ -10,46 +19,210 @@ from app.schemas.common import ErrorResponse
 router = APIRouter()
 
 
+def _not_modified(
+    etag: str,
+    last_modified,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+) -> bool:
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _parse_range(header: str, size: int) -> Tuple[int, int]:
+    """Inclusive (start, end) of a single ``bytes=`` range, or 416."""
+    unsatisfiable = HTTPException(
+        status_code=416,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{size}"},
+    )
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec or "-" not in spec:
+        raise unsatisfiable
+    first, _, last = (part.strip() for part in spec.partition("-"))
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # Suffix range: the final N bytes.
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        raise unsatisfiable
+    if start > end or start >= size:
+        raise unsatisfiable
+    return start, end
+
+
+def _redirect(signed: PresignedUrl) -> RedirectResponse:
+    # Browsers may reuse the redirect for as long as the target URL stays valid.
+    max_age = max(
+        int(signed.remaining()) - settings.MEDIA_PRESIGN_REFRESH_MARGIN_SECONDS, 0
+    )
+    return RedirectResponse(
+        signed.url,
+        status_code=302,
+        headers={"Cache-Control": f"private, max-age={max_age}", "Vary": "Accept"},
+    )
+
+
+class _ObjectStream:
+    """Iterate an object body and hand its connection back to the pool once."""
+
+    def __init__(self, response, chunk_size: int):
+        self._response = response
+        self._chunks = response.stream(chunk_size)
+        self._released = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        # Called on exhaustion, on errors and from the response's background
+        # task, which also runs when the client went away before the first chunk.
+        if self._released:
+            return
+        self._released = True
+        self._response.close()
+        self._response.release_conn()
+
+
 @router.get(
     "/{issue_id}/{type}",
     summary="Fetch issue media",
-    description="Return the latest before or after JPEG evidence image for an issue from object storage.",
+    description=(
+        "Return the latest before or after evidence image for an issue from object storage. "
+        "`size=thumb|medium` returns a downscaled rendition, WebP when the client accepts it."
+    ),
     responses={
         200: {
             "description": "JPEG issue evidence image",
             "content": {
                 "image/jpeg": {
                     "schema": {"type": "string", "format": "binary"}
-                }
+                },
+                "image/webp": {
+                    "schema": {"type": "string", "format": "binary"}
+                },
             },
         },
-        400: {"model": ErrorResponse, "description": "Media type is invalid"},
+        206: {"description": "Requested byte range of the image"},
+        302: {"description": "Redirect to a presigned object URL (MEDIA_DELIVERY_MODE=redirect)"},
+        304: {"description": "Client copy is current (If-None-Match / If-Modified-Since)"},
+        400: {"model": ErrorResponse, "description": "Media type or size is invalid"},
         404: {"model": ErrorResponse, "description": "Media not found"},
+        416: {"model": ErrorResponse, "description": "Requested range not satisfiable"},
         500: {"model": ErrorResponse, "description": "Media retrieval failed"},
     },
 )
-def get_media(issue_id: UUID, type: str, session: Session = Depends(get_session)):
+def get_media(
+    issue_id: UUID,
+    type: str,
+    size: str = Query("original"),
+    accept: Optional[str] = Header(None),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    session: Session = Depends(get_session),
+):
     # type is 'before' (REPORT) or 'after' (RESOLVE)
     if type not in {"before", "after"}:
         raise HTTPException(
             status_code=400,
             detail="Media type must be either 'before' or 'after'",
         )
+    if size not in {"thumb", "medium", "original"}:
+        raise HTTPException(
+            status_code=400,
+            detail="Media size must be one of 'thumb', 'medium' or 'original'",
+        )
 
     evidence_type = "REPORT" if type == "before" else "RESOLVE"
 
-    statement = (
-        select(Evidence)
-        .where(Evidence.issue_id == issue_id, Evidence.type == evidence_type)
-        .order_by(Evidence.created_at.desc())
-    )
-
-    evidence = session.exec(statement).first()
-    if not evidence:
+    latest = EvidenceLookupService.latest(session, issue_id, evidence_type)
+    if latest is None:
         raise HTTPException(status_code=404, detail="Media not found")
 
+    # Stored objects are immutable, so a cached ETag answers revalidation
+    # without touching the database or object storage.
+    proxy_original = size == "original" and settings.MEDIA_DELIVERY_MODE != "redirect"
+    if proxy_original and latest.etag is not None and if_none_match is not None:
+        if _not_modified(latest.etag, None, if_none_match, None):
+            return Response(
+                status_code=304,
+                headers={"ETag": latest.etag, "Accept-Ranges": "bytes", "Vary": "Accept"},
+            )
+
+    file_path, media_type = latest.file_path, "image/jpeg"
     try:
-        response = minio_client.get_object(settings.MINIO_BUCKET, evidence.file_path)
-        return Response(content=response.read(), media_type="image/jpeg")
-    except Exception as e:
+        if size != "original":
+            fmt = "webp" if accept and "image/webp" in accept else "jpeg"
+            file_path = MediaDerivativeService.ensure(latest.file_path, size, fmt)
+            media_type = FORMATS[fmt][1]
+        if settings.MEDIA_DELIVERY_MODE == "redirect":
+            return _redirect(presigned_urls.get(file_path))
+        stat = minio_client.stat_object(settings.MINIO_BUCKET, file_path)
+    except S3Error as e:
+        if e.code in ("NoSuchKey", "NoSuchObject"):
+            raise HTTPException(status_code=404, detail="Media not found")
+        raise HTTPException(status_code=500, detail="Failed to retrieve storage object")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to retrieve storage object")
+
+    if stat.size is None or stat.last_modified is None:
         raise HTTPException(status_code=500, detail="Failed to retrieve storage object")
+    size_bytes, last_modified = stat.size, stat.last_modified
+
+    etag = f'"{stat.etag}"'
+    if proxy_original:
+        EvidenceLookupService.remember_etag(issue_id, evidence_type, file_path, etag)
+    headers: Dict[str, str] = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept",
+    }
+    if _not_modified(etag, last_modified, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    status_code, offset, length = 200, 0, size_bytes
+    if range_header is not None and (if_range is None or if_range == etag):
+        start, end = _parse_range(range_header, size_bytes)
+        status_code, offset, length = 206, start, end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{size_bytes}"
+    headers["Content-Length"] = str(length)
+
+    try:
+        response = minio_client.get_object(
+            settings.MINIO_BUCKET, file_path, offset=offset, length=length
+        )
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to retrieve storage object")
+
+    body = _ObjectStream(response, settings.MEDIA_STREAM_CHUNK_BYTES)
+    return StreamingResponse(
+        body,
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+        background=BackgroundTask(body.close),
+    )
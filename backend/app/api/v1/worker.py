@@ -1,18 +1,17 @@
 """Worker task management endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, File, Header, HTTPException, UploadFile
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
 from app.db.session import get_session
 from app.models.domain import Issue, Evidence, User
-from app.services.minio_client import minio_client
-from app.core.config import settings
-from app.services.exif import ExifService
+from app.services.idempotency_service import IdempotencyService
+from app.services.issue_service import IssueService
+from app.services.photo_storage import PhotoStorage
 from app.services.workflow_service import WorkflowService
-from uuid import UUID, uuid4
-from typing import Any, List, cast
+from uuid import UUID
+from typing import Any, List, Optional, cast
 from datetime import datetime
-import io
 
 from app.api.deps import require_worker_user
 from app.schemas.common import ErrorResponse, MessageResponse
@@ -104,42 +103,52 @@ def start_task(
     "/tasks/{issue_id}/resolve",
     response_model=MessageResponse,
     summary="Resolve a task",
-    description="Upload resolution evidence, capture EXIF metadata, and transition the task into the resolved state.",
-    responses={404: {"model": ErrorResponse, "description": "Task not found"}},
+    description=(
+        "Upload resolution evidence, capture EXIF metadata, and transition the task into the resolved state. "
+        "Retries sending the same Idempotency-Key replay the first response."
+    ),
+    responses={
+        400: {"model": ErrorResponse, "description": "Idempotency-Key is malformed"},
+        404: {"model": ErrorResponse, "description": "Task not found"},
+        413: {"model": ErrorResponse, "description": "Photo exceeds the upload size limit"},
+    },
 )
-async def resolve_task(
+def resolve_task(
     issue_id: UUID,
     photo: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     session: Session = Depends(get_session),
     current_user: User = Depends(require_worker_user),
 ):
     """Resolve a task with photo evidence and EXIF capture."""
+    # A retried resolve is replayed before the workflow would reject it as
+    # already resolved.
+    idempotency = IdempotencyService.for_request(
+        current_user.id, f"resolve:{issue_id}", idempotency_key
+    )
+    replayed = idempotency.replay(session)
+    if replayed is not None:
+        return replayed
+
     issue = session.get(Issue, issue_id)
     if not issue or issue.worker_id != current_user.id:
         raise HTTPException(status_code=404, detail="Task not found")
+    PhotoStorage.ensure_within_limit(photo)
 
-    photo_content = await photo.read()
     # Validation EXIF (mandatory for resolve as per spec)
-    exif_data = ExifService.extract_metadata(photo_content)
+    exif_data = IssueService.extract_exif(photo.file)
 
     # Requirement Story 4: Resolve photo mandatory camera
     # (Enforced in UI, but we log EXIF for verification)
 
-    # Save Photo to Minio
-    file_id = str(uuid4())
-    file_path = f"resolutions/{file_id}.jpg"
-    minio_client.put_object(
-        settings.MINIO_BUCKET,
-        file_path,
-        io.BytesIO(photo_content),
-        len(photo_content),
-        content_type="image/jpeg",
-    )
+    # Stream photo to Minio
+    stored = IssueService.store_issue_photo(photo.file, prefix="resolutions")
 
     evidence = Evidence(
         issue_id=issue.id,
         type="RESOLVE",
-        file_path=file_path,
+        file_path=stored.file_path,
+        content_sha256=stored.sha256,
         exif_timestamp=exif_data["timestamp"],
         exif_lat=exif_data["lat"],
         exif_lng=exif_data["lng"],
@@ -148,5 +157,7 @@ async def resolve_task(
 
     # Use workflow service for status transition
     WorkflowService.resolve_task(session, issue, current_user.id)
-    session.commit()
-    return {"message": "Task resolved successfully"}
+    body = {"message": "Task resolved successfully"}
+    idempotency.record(session, 200, body)
+    replayed = idempotency.commit(session)
+    return replayed if replayed is not None else body
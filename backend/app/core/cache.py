@@ -0,0 +1,303 @@
+"""Small caches shared by services.
+
+``LRUCache`` is a plain bounded mapping. ``ResponseCache`` sits on top of a
+pluggable ``CacheBackend`` (in-process LRU or Redis) and adds TTLs,
+single-flight computation of cold keys and stale-while-revalidate.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (stored_at wall-clock seconds, value)
+Entry = Tuple[float, Any]
+
+
+class LRUCache:
+    """Thread-safe bounded mapping with an optional per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (
+                self.ttl_seconds is not None and now - entry[0] > self.ttl_seconds
+            ):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class CacheBackend:
+    """Storage for ``ResponseCache`` entries; a miss is ``None``."""
+
+    # Shared backends are seen by every worker process, so keys must not
+    # embed process-local state such as data versions.
+    shared = False
+
+    def get(self, key: str) -> Optional[Entry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: Entry, ttl_seconds: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class NullBackend(CacheBackend):
+    """Stores nothing; concurrent cold requests are still coalesced."""
+
+    def get(self, key: str) -> Optional[Entry]:
+        return None
+
+    def set(self, key: str, entry: Entry, ttl_seconds: float) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU. Values are stored pickled, so every hit gets its own
+    copy and a caller mutating it cannot change what others are served."""
+
+    def __init__(self, max_entries: int):
+        self._entries = LRUCache(max_entries)
+
+    def get(self, key: str) -> Optional[Entry]:
+        stored = self._entries.get(key)
+        if stored is None:
+            return None
+        stored_at, value = stored
+        return stored_at, pickle.loads(value)
+
+    def set(self, key: str, entry: Entry, ttl_seconds: float) -> None:
+        # Expiry is decided by ResponseCache from stored_at; the LRU bound
+        # evicts entries nobody asks for any more.
+        self._entries.set(
+            key, (entry[0], pickle.dumps(entry[1], protocol=pickle.HIGHEST_PROTOCOL))
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def size(self) -> Optional[int]:
+        return self._entries.stats()["size"]
+
+
+class RedisBackend(CacheBackend):
+    """JSON entries in Redis. Errors are logged and treated as misses."""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "marg:cache:"):
+        import redis
+
+        self._errors = (redis.RedisError,)
+        self._client = redis.Redis.from_url(url, socket_timeout=1)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Entry]:
+        try:
+            raw = self._client.get(self.prefix + key)
+        except self._errors:
+            logger.warning("Redis cache read failed for %s", key, exc_info=True)
+            return None
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        return payload["stored_at"], payload["value"]
+
+    def set(self, key: str, entry: Entry, ttl_seconds: float) -> None:
+        payload = json.dumps(
+            {"stored_at": entry[0], "value": entry[1]}, default=str
+        )
+        try:
+            self._client.set(
+                self.prefix + key, payload, ex=max(1, math.ceil(ttl_seconds))
+            )
+        except self._errors:
+            logger.warning("Redis cache write failed for %s", key, exc_info=True)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self._client.scan_iter(match=self.prefix + "*"))
+            if keys:
+                self._client.delete(*keys)
+        except self._errors:
+            logger.warning("Redis cache clear failed", exc_info=True)
+
+
+class ResponseCache:
+    """TTL cache with single-flight misses and stale-while-revalidate.
+
+    A fresh entry (younger than ``ttl_seconds``) is returned as is. A stale
+    one (up to ``stale_seconds`` older) is returned immediately while one
+    background refresh replaces it. On a miss the first caller computes and
+    concurrent callers for the same key wait for its result instead of
+    computing again. Coalescing is per process.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: float,
+        stale_seconds: float = 0,
+        refresh_workers: int = 2,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._refresh_workers = refresh_workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._counters: Dict[str, int] = {
+            name: 0
+            for name in ("hits", "stale_hits", "misses", "coalesced", "refreshes", "errors")
+        }
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        refresh: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """Cached value for ``key``.
+
+        ``compute`` runs on the calling thread; ``refresh`` (default
+        ``compute``) runs on a background thread to revalidate stale entries,
+        so it must not rely on request-scoped resources.
+        """
+        entry = self.backend.get(key)
+        if entry is not None:
+            age = self._clock() - entry[0]
+            if age < self.ttl_seconds:
+                self._count("hits")
+                return entry[1]
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._count("stale_hits")
+                self._revalidate(key, refresh or compute)
+                return entry[1]
+
+        self._count("misses")
+        flight, leader = self._join_flight(key)
+        if not leader:
+            self._count("coalesced")
+            return flight.result()
+        self._run(key, flight, compute)
+        return flight.result()
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        with self._lock:
+            counters: Dict[str, Optional[int]] = {
+                name: count for name, count in self._counters.items()
+            }
+        counters["size"] = self.backend.size()
+        return counters
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _join_flight(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._inflight[key] = Future()
+            return flight, True
+
+    def _run(self, key: str, flight: Future, compute: Callable[[], Any]) -> None:
+        try:
+            value = compute()
+        except BaseException as exc:
+            self._count("errors")
+            flight.set_exception(exc)
+        else:
+            self.backend.set(
+                key, (self._clock(), value), self.ttl_seconds + self.stale_seconds
+            )
+            flight.set_result(value)
+        finally:
+            # Only after the backend write, so later callers find the entry.
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _revalidate(self, key: str, refresh: Callable[[], Any]) -> None:
+        flight, leader = self._join_flight(key)
+        if not leader:
+            return
+        self._count("refreshes")
+
+        def run() -> None:
+            self._run(key, flight, refresh)
+            if flight.exception() is not None:
+                logger.error(
+                    "Cache refresh failed for %s", key, exc_info=flight.exception()
+                )
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._refresh_workers,
+                    thread_name_prefix="cache-refresh",
+                )
+            executor = self._executor
+        executor.submit(run)
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import AnyHttpUrl, field_validator
 
@@ -47,6 +47,111 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET: str = "infrastructure-evidence"
     MINIO_SECURE: bool = False
+    # Host clients use to reach MinIO directly (presigned URLs are signed
+    # for it); defaults to MINIO_ENDPOINT.
+    MINIO_PUBLIC_ENDPOINT: Optional[str] = None
+    MINIO_PUBLIC_SECURE: Optional[bool] = None
+    MINIO_REGION: str = "us-east-1"
+
+    # Report ingestion: "sync" stores the photo inline, "staged" returns 202
+    # and hands EXIF extraction and the object upload to a background pool.
+    REPORT_INGEST_MODE: str = "sync"
+    INGEST_WORKERS: int = 4
+    INGEST_MAX_PENDING: int = 64
+    INGEST_RETRY_AFTER_SECONDS: int = 5
+
+    # Photo uploads are streamed to MinIO in parts; only a bounded prefix is
+    # read for EXIF, so per-request memory does not grow with photo size.
+    MAX_PHOTO_UPLOAD_BYTES: int = 15 * 1024 * 1024
+    PHOTO_UPLOAD_PART_SIZE: int = 5 * 1024 * 1024
+    EXIF_SCAN_BYTES: int = 128 * 1024
+
+    # "unique" writes every upload to a fresh {prefix}/{uuid}.jpg; "content"
+    # keys objects by SHA-256 so identical photos are uploaded and stored once.
+    PHOTO_STORAGE_MODE: str = "unique"
+    CONTENT_DIGEST_INDEX_SIZE: int = 10_000
+
+    # Thumbnail/medium renditions served by GET /media/...?size=. "lazy"
+    # renders on first request, "eager" right after the upload.
+    MEDIA_DERIVATIVE_MODE: str = "lazy"
+    MEDIA_DERIVATIVE_WORKERS: int = 2
+    MEDIA_THUMB_MAX_PX: int = 320
+    MEDIA_MEDIUM_MAX_PX: int = 1280
+    # Media responses are streamed from MinIO in chunks of this size.
+    MEDIA_STREAM_CHUNK_BYTES: int = 64 * 1024
+    # "proxy" streams media through the API; "redirect" answers with a 302
+    # to a presigned MinIO URL, reused until shortly before it expires.
+    MEDIA_DELIVERY_MODE: str = "proxy"
+    MEDIA_PRESIGN_TTL_SECONDS: int = 900
+    MEDIA_PRESIGN_REFRESH_MARGIN_SECONDS: int = 60
+    MEDIA_PRESIGN_CACHE_SIZE: int = 10_000
+    # (issue, type) -> latest stored evidence key and ETag.
+    MEDIA_LOOKUP_CACHE_SIZE: int = 50_000
+    MEDIA_LOOKUP_CACHE_TTL_SECONDS: int = 300
+
+    # Upper bound on how long a process trusts its in-memory jurisdiction
+    # index when zones may have been edited by another worker process.
+    JURISDICTION_INDEX_TTL_SECONDS: int = 300
+
+    # Cache for the unauthenticated analytics endpoints: "memory" (per
+    # process, dropped on local writes), "redis" (shared, TTL-bounded) or
+    # "none". Entries older than the TTL are served for STALE_SECONDS more
+    # while one background refresh runs.
+    ANALYTICS_CACHE_BACKEND: str = "memory"
+    ANALYTICS_CACHE_TTL_SECONDS: float = 30
+    ANALYTICS_CACHE_STALE_SECONDS: float = 300
+    ANALYTICS_CACHE_SIZE: int = 256
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Rendered /analytics/tiles responses kept per process; the TTL bounds
+    # staleness after edits made by other processes.
+    VECTOR_TILE_CACHE_SIZE: int = 4096
+    VECTOR_TILE_CACHE_TTL_SECONDS: float = 300
+
+    # Per-org worker workload behind the assignment dropdown; dropped on
+    # local assignment changes, TTL-bounded for other processes.
+    WORKLOAD_SNAPSHOT_CACHE_SIZE: int = 1024
+    WORKLOAD_SNAPSHOT_TTL_SECONDS: int = 60
+
+    # /analytics/clusters: points closer than CLUSTER_RADIUS_PX (on 512px
+    # tiles) merge; above CLUSTER_MAX_ZOOM every issue is its own leaf.
+    CLUSTER_MAX_ZOOM: int = 16
+    CLUSTER_RADIUS_PX: float = 40
+    CLUSTER_INDEX_TTL_SECONDS: int = 300
+    # Issue writes trigger a background rebuild at most this often; the
+    # previous index is served until it finishes.
+    CLUSTER_MIN_REBUILD_SECONDS: int = 30
+
+    # Screen pixels per heatmap cell at the requested zoom level, and the
+    # zoom used when the client passes none (~230 m cells at 14).
+    HEATMAP_CELL_PX: int = 24
+    HEATMAP_DEFAULT_ZOOM: int = 14
+
+    # IANA zone whose midnight starts each analytics trend day. Timestamps
+    # stay naive UTC in the database.
+    MUNICIPAL_TIMEZONE: str = "Asia/Kolkata"
+    # Longest trend window /analytics/stats accepts, in days.
+    TREND_MAX_DAYS: int = 366
+
+    # Serve public analytics from the issuedailyrollup table instead of
+    # scanning issues. The table is only maintained while this is on, so run
+    # `python rebuild_rollups.py` when enabling it.
+    ANALYTICS_USE_ROLLUPS: bool = False
+
+    # Seconds between background checks of the dashboard status counters
+    # against real issue counts. One check always runs at startup; 0 skips
+    # the periodic ones (run reconcile_counters.py by hand).
+    STATUS_COUNTER_RECONCILE_SECONDS: int = 3600
+
+    # Retries carrying the same Idempotency-Key replay the first response.
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    # Seconds between background purges of expired idempotency records. One
+    # purge always runs at startup; 0 skips the periodic ones.
+    IDEMPOTENCY_PURGE_SECONDS: int = 60 * 60
+
+    # Offline clients sync queued reports through /issues/report-batch.
+    BATCH_REPORT_MAX_ITEMS: int = 20
+    BATCH_UPLOAD_CONCURRENCY: int = 4
 
     SECRET_KEY: str = "secret-key-for-jwt-change-me"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
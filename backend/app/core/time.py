@@ -1,8 +1,39 @@
 """Time utilities for consistent UTC handling."""
 
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, cast, func
+
+from app.core.config import settings
 
 
 def utc_now() -> datetime:
     """Return current UTC time as a naive datetime for DB compatibility."""
     return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def municipal_tz() -> ZoneInfo:
+    return ZoneInfo(settings.MUNICIPAL_TIMEZONE)
+
+
+def municipal_today() -> date:
+    """Today's date where the authority operates."""
+    return datetime.now(municipal_tz()).date()
+
+
+def municipal_date(value: datetime) -> date:
+    """Local calendar day of a naive UTC timestamp."""
+    return value.replace(tzinfo=timezone.utc).astimezone(municipal_tz()).date()
+
+
+def municipal_day_start(day: date) -> datetime:
+    """Naive UTC timestamp of local midnight at the start of ``day``."""
+    local = datetime.combine(day, time.min, tzinfo=municipal_tz())
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def municipal_day(column):
+    """SQL: local calendar day of a naive UTC timestamp column."""
+    local = func.timezone(settings.MUNICIPAL_TIMEZONE, func.timezone("UTC", column))
+    return cast(func.date_trunc("day", local), Date)
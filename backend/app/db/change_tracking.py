@@ -0,0 +1,78 @@
+"""Per-table data versions for in-process caches.
+
+Every ORM session records which tables it wrote during flushes; once the
+transaction commits, the version counter of each touched table is bumped.
+Caches derived from table contents compare the version they were built at
+with ``data_version(table)`` instead of querying the database to find out
+whether they are stale. Changes made with Core ``update()``/``insert()``
+statements are invisible to the ORM, so callers register them explicitly
+with ``mark_changed``.
+"""
+
+from __future__ import annotations
+
+import threading
+from itertools import chain
+from typing import Dict, Iterable, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_TOUCHED_KEY = "touched_tables"
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = {}
+_epoch = 0
+
+
+def data_version(*tables: str) -> int:
+    """Combined version of the given tables; changes whenever any of them does."""
+    with _lock:
+        return _epoch + sum(_versions.get(table, 0) for table in tables)
+
+
+def bump(tables: Iterable[str]) -> None:
+    with _lock:
+        for table in tables:
+            _versions[table] = _versions.get(table, 0) + 1
+
+
+def invalidate_all() -> None:
+    """Mark every table as changed, e.g. after raw SQL maintenance."""
+    global _epoch
+    with _lock:
+        _epoch += 1
+
+
+def mark_changed(session: Session, *tables: str) -> None:
+    """Record writes the ORM cannot see so they are published on commit."""
+    session.info.setdefault(_TOUCHED_KEY, set()).update(tables)
+
+
+def pending_changes(session: Session) -> Set[str]:
+    """Tables this session has written but not yet committed."""
+    touched = set(session.info.get(_TOUCHED_KEY, ()))
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            touched.add(table)
+    return touched
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_touched_tables(session: Session, flush_context, instances) -> None:
+    touched = pending_changes(session)
+    if touched:
+        session.info[_TOUCHED_KEY] = touched
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_touched_tables(session: Session) -> None:
+    touched = session.info.pop(_TOUCHED_KEY, None)
+    if touched:
+        bump(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_touched_tables(session: Session) -> None:
+    session.info.pop(_TOUCHED_KEY, None)
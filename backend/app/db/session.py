@@ -1,5 +1,7 @@
 from sqlmodel import create_engine, Session
 from app.core.config import settings
+from app.db import change_tracking  # noqa: F401  registers session listeners
+from app.services import issue_metrics_service  # noqa: F401  rollup maintenance
 
 engine = create_engine(
     settings.DATABASE_URL or settings.assemble_db_connection(None, settings),
@@ -3,11 +3,20 @@ import logging
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlmodel import Session
 from app.api.v1 import api_router
 from app.core.config import settings
 from app.core.middleware import SecurityHeadersMiddleware
 from app.schemas.common import RootResponse
 
+from app.db.session import engine
+from app.services.analytics_cache import AnalyticsCacheService
+from app.services.idempotency_service import idempotency_purger
+from app.services.ingest_service import ingest_pipeline
+from app.services.issue_clusters import issue_cluster_index
+from app.services.issue_metrics_service import status_counter_reconciler
+from app.services.jurisdiction_index import jurisdiction_index
+from app.services.media_derivatives import MediaDerivativeService
 from app.services.minio_client import init_minio
 
 logging.basicConfig(
@@ -35,7 +44,22 @@ OPENAPI_TAGS = [
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_minio()
+    try:
+        with Session(engine) as session:
+            jurisdiction_index.rebuild(session)
+    except Exception:
+        logging.getLogger(__name__).exception(
+            "Jurisdiction index warm-up failed; it will be built on first report"
+        )
+    status_counter_reconciler.start(engine, settings.STATUS_COUNTER_RECONCILE_SECONDS)
+    idempotency_purger.start(engine, settings.IDEMPOTENCY_PURGE_SECONDS)
     yield
+    idempotency_purger.shutdown()
+    issue_cluster_index.join()
+    status_counter_reconciler.shutdown()
+    ingest_pipeline.shutdown(wait=True)
+    MediaDerivativeService.shutdown(wait=True)
+    AnalyticsCacheService.shutdown(wait=True)
 
 
 app = FastAPI(
@@ -70,6 +94,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,8 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Any
 from uuid import UUID, uuid4
+from sqlalchemy import Index, UniqueConstraint, cast
 from sqlmodel import SQLModel, Field, Relationship, Column
-from geoalchemy2 import Geometry
+from geoalchemy2 import Geography, Geometry
 from shapely.wkt import loads
 
 from app.core.time import utc_now
@@ -146,6 +147,38 @@ class Issue(IssueBase, table=True):
     evidence: List["Evidence"] = Relationship(back_populates="issue")
 
 
+# Issue.location as geography, so ST_DWithin radii and KNN distances are in
+# metres. Queries must use this exact expression to hit the index below.
+issue_location_geography = cast(
+    Issue.__table__.c.location, Geography(geometry_type="POINT", srid=4326)
+)
+
+# Partial GiST index for duplicate detection: only open issues are candidates.
+Index(
+    "ix_issue_open_location_geog",
+    issue_location_geography,
+    postgresql_using="gist",
+    postgresql_where=Issue.__table__.c.status != "CLOSED",
+)
+
+# Keyset pagination of /analytics/issues-public (newest first); also serves
+# the created_at range scans of the analytics trend.
+Index(
+    "ix_issue_created_at_id",
+    Issue.__table__.c.created_at.desc(),
+    Issue.__table__.c.id.desc(),
+)
+
+# Range scans of the "resolved" analytics trend; issues closed without a
+# resolution are bucketed by updated_at.
+Index("ix_issue_resolved_at", Issue.__table__.c.resolved_at)
+Index(
+    "ix_issue_unresolved_updated_at",
+    Issue.__table__.c.updated_at,
+    postgresql_where=Issue.__table__.c.resolved_at.is_(None),
+)
+
+
 class EvidenceBase(SQLModel):
     issue_id: UUID = Field(foreign_key="issue.id")
     type: str  # REPORT, RESOLVE
@@ -154,6 +187,8 @@ class EvidenceBase(SQLModel):
     exif_timestamp: Optional[datetime] = None
     exif_lat: Optional[float] = None
     exif_lng: Optional[float] = None
+    upload_status: str = "STORED"  # PENDING, STORED, FAILED
+    content_sha256: Optional[str] = Field(default=None, index=True)
 
 
 class Evidence(EvidenceBase, table=True):
@@ -163,6 +198,18 @@ class Evidence(EvidenceBase, table=True):
     issue: Issue = Relationship(back_populates="evidence")
 
 
+# Covers the "latest stored photo of an issue" lookup behind GET /media,
+# including file_path so it is answered by an index-only scan.
+Index(
+    "ix_evidence_latest_stored",
+    Evidence.__table__.c.issue_id,
+    Evidence.__table__.c.type,
+    Evidence.__table__.c.created_at.desc(),
+    postgresql_include=["file_path"],
+    postgresql_where=Evidence.__table__.c.upload_status == "STORED",
+)
+
+
 class InviteBase(SQLModel):
     email: str
     org_id: UUID = Field(foreign_key="organization.id")
@@ -203,3 +250,50 @@ class AuditLog(SQLModel, table=True):
     old_value: Optional[str] = None
     new_value: Optional[str] = None
     created_at: datetime = Field(default_factory=utc_now)
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    """First response to an upload request, replayed for client retries."""
+
+    __table_args__ = (UniqueConstraint("user_id", "scope", "key"),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="user.id")
+    scope: str  # e.g. "report", "resolve:<issue_id>"
+    key: str
+    request_hash: str
+    status_code: int
+    response_body: str
+    created_at: datetime = Field(default_factory=utc_now)
+    expires_at: datetime = Field(index=True)
+
+
+class IssueDailyRollup(SQLModel, table=True):
+    """Issue counts per (org, category, status, day), maintained on every flush.
+
+    ``issue_count`` counts issues created on ``day`` that are currently in
+    ``status``; ``transition_count`` counts moves into ``status`` on ``day``;
+    ``resolved_count`` counts issues currently in ``status`` whose
+    ``resolved_at`` falls on ``day``. Days are calendar days in
+    MUNICIPAL_TIMEZONE.
+    Issues without an authority use org_id ``UUID(int=0)``.
+    """
+
+    org_id: UUID = Field(primary_key=True)
+    category_id: UUID = Field(primary_key=True)
+    status: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    issue_count: int = 0
+    transition_count: int = 0
+    resolved_count: int = 0
+
+
+class IssueStatusCounter(SQLModel, table=True):
+    """Live issue count per (org, status), maintained on every flush.
+
+    Issues without an authority use org_id ``UUID(int=0)``.
+    """
+
+    org_id: UUID = Field(primary_key=True)
+    status: str = Field(primary_key=True)
+    issue_count: int = 0
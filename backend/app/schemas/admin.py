@@ -2,6 +2,8 @@ from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from uuid import UUID
 
+from app.schemas.analytics import SlaMetrics, SlaReportResponse
+
 
 class BulkAssignRequest(BaseModel):
     issue_ids: List[UUID]
@@ -70,6 +72,20 @@ class DashboardStatsResponse(BaseModel):
     resolved: int
 
 
+class SlaGroup(SlaMetrics):
+    """SLA figures for one (org, category, priority) combination"""
+
+    org_id: Optional[UUID] = None
+    category_id: UUID
+    category_name: str
+    priority: str
+    sla_days: int
+
+
+class AdminSlaReportResponse(SlaReportResponse):
+    groups: List[SlaGroup]
+
+
 class WorkerBulkRegisterRequest(BaseModel):
     emails_csv: str
 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -9,6 +9,8 @@ class HeatmapPoint(BaseModel):
     lat: float
     lng: float
     intensity: float
+    # Issues aggregated into this point; 1 unless a zoom level was given.
+    count: int = 1
 
 
 class AnalyticsBreakdownItem(BaseModel):
@@ -18,6 +20,8 @@ class AnalyticsBreakdownItem(BaseModel):
 
 class TrendPoint(BaseModel):
     name: str
+    # ISO calendar day in MUNICIPAL_TIMEZONE.
+    date: str
     reports: int
     resolved: int
 
@@ -36,6 +40,27 @@ class GlobalStatsResponse(BaseModel):
     trend: List[TrendPoint]
 
 
+class CacheStatsResponse(BaseModel):
+    hits: int
+    stale_hits: int
+    misses: int
+    coalesced: int
+    refreshes: int
+    errors: int
+    size: Optional[int] = None
+
+
+class IssueCluster(BaseModel):
+    lat: float
+    lng: float
+    count: int
+    status_counts: Dict[str, int]
+    # Set for single issues (leaves).
+    issue_id: Optional[UUID] = None
+    # Set for clusters: the zoom at which the cluster splits up.
+    expansion_zoom: Optional[int] = None
+
+
 class PublicIssueMapItem(BaseModel):
     id: UUID
     lat: float
@@ -43,3 +68,27 @@ class PublicIssueMapItem(BaseModel):
     status: str
     category_name: str
     created_at: Optional[datetime] = None
+
+
+class SlaMetrics(BaseModel):
+    issues: int
+    met: int
+    breached: int
+    resolved_late: int
+    open_within_sla: int
+    open_breached: int
+    # Percentage of met among met + breached; None while nothing is decided.
+    compliance: Optional[float] = None
+    # Hours until the next open issue breaches; None when none is pending.
+    hours_to_next_breach: Optional[float] = None
+    avg_accept_hours: Optional[float] = None
+
+
+class SlaBreakdownItem(SlaMetrics):
+    name: str
+
+
+class SlaReportResponse(BaseModel):
+    summary: SlaMetrics
+    by_category: List[SlaBreakdownItem]
+    by_priority: List[SlaBreakdownItem]
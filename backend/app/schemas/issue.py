@@ -32,3 +32,42 @@ class IssueRead(BaseModel):
 class IssueReportResponse(BaseModel):
     message: str
     issue_id: UUID
+
+
+class IssueReportAccepted(BaseModel):
+    message: str
+    issue_id: UUID
+    evidence_id: UUID
+    upload_status: str
+
+
+class IngestStatusResponse(BaseModel):
+    evidence_id: UUID
+    issue_id: UUID
+    upload_status: str
+    exif_timestamp: Optional[datetime] = None
+    exif_lat: Optional[float] = None
+    exif_lng: Optional[float] = None
+
+
+class IngestMetricsResponse(BaseModel):
+    capacity: int
+    workers: int
+    reserved: int
+    queued: int
+    running: int
+    completed: int
+    failed: int
+    rejected: int
+    avg_processing_ms: float
+
+
+class BatchReportItemResult(BaseModel):
+    index: int
+    status: str  # CREATED, MERGED, REJECTED
+    issue_id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+
+class BatchReportResponse(BaseModel):
+    items: List[BatchReportItemResult]
@@ -1,13 +1,16 @@
 """Admin analytics service for worker and dashboard metrics."""
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
+from sqlalchemy import Date, and_, cast
 from sqlmodel import Session, col, func, select
 
 from app.models.domain import Issue, User
 from app.core.time import utc_now
+from app.services.issue_metrics_service import IssueMetricsService
+from app.services.workload_snapshot import WorkloadSnapshot
 
 
 class AdminAnalyticsService:
@@ -20,27 +23,97 @@ class AdminAnalyticsService:
         """
         Get comprehensive analytics for all workers.
         Returns worker stats with task counts and performance metrics.
-        """
-        statement = select(User).where(col(User.role) == "WORKER")
-        if org_id is not None:
-            statement = statement.where(col(User.org_id) == org_id)
-        workers = session.exec(statement).all()
 
+        One statement: per-worker aggregates over Issue, left-joined to the
+        worker list so workers without tasks still appear.
+        """
         now = utc_now()
         week_ago = now - timedelta(days=7)
         month_ago = now - timedelta(days=30)
 
+        status = col(Issue.status)
+        closed = status.in_(["RESOLVED", "CLOSED"])
+        timed = and_(
+            closed,
+            col(Issue.accepted_at).is_not(None),
+            col(Issue.resolved_at).is_not(None),
+        )
+        count_all = func.count()
+        per_worker_query = (
+            select(
+                col(Issue.worker_id).label("worker_id"),
+                count_all.filter(status == "ASSIGNED").label("pending"),
+                count_all.filter(status.in_(["ACCEPTED", "IN_PROGRESS"])).label(
+                    "in_progress"
+                ),
+                count_all.filter(status == "RESOLVED").label("resolved"),
+                count_all.filter(status == "CLOSED").label("closed"),
+                count_all.filter(closed, col(Issue.resolved_at) >= week_ago).label(
+                    "tasks_week"
+                ),
+                count_all.filter(closed, col(Issue.resolved_at) >= month_ago).label(
+                    "tasks_month"
+                ),
+                # Whole calendar days, summed here and averaged in Python
+                # exactly as before.
+                func.sum(
+                    cast(col(Issue.resolved_at), Date) - cast(col(Issue.accepted_at), Date)
+                )
+                .filter(timed)
+                .label("resolution_days"),
+                count_all.filter(timed).label("timed"),
+            )
+            .where(col(Issue.worker_id).is_not(None))
+            .group_by(col(Issue.worker_id))
+        )
+        if org_id is not None:
+            # Scope the aggregate itself so only this org's issues are counted.
+            per_worker_query = per_worker_query.where(col(Issue.org_id) == org_id)
+        per_worker = per_worker_query.subquery()
+
+        statement = (
+            select(User, per_worker)
+            .outerjoin(per_worker, per_worker.c.worker_id == col(User.id))
+            .where(col(User.role) == "WORKER")
+        )
+        if org_id is not None:
+            statement = statement.where(col(User.org_id) == org_id)
+        rows = session.exec(statement).all()
+
         worker_stats: List[Dict[str, Any]] = []
         total_active = 0
         total_resolved = 0
 
-        for worker in workers:
-            stats = AdminAnalyticsService._compute_worker_stats(
-                session, worker, week_ago, month_ago
+        for row in rows:
+            worker = row[0]
+            counts = row._mapping
+            pending = counts["pending"] or 0
+            in_progress = counts["in_progress"] or 0
+            resolved = counts["resolved"] or 0
+            closed_count = counts["closed"] or 0
+            timed_count = counts["timed"] or 0
+            avg_days = (
+                round(counts["resolution_days"] / timed_count, 1)
+                if timed_count
+                else None
+            )
+            worker_stats.append(
+                {
+                    "worker_id": worker.id,
+                    "worker_name": worker.full_name or worker.email,
+                    "email": worker.email,
+                    "active_tasks": pending + in_progress,
+                    "pending_acceptance": pending,
+                    "in_progress": in_progress,
+                    "total_resolved": resolved,
+                    "total_closed": closed_count,
+                    "avg_resolution_days": avg_days,
+                    "tasks_this_week": counts["tasks_week"] or 0,
+                    "tasks_this_month": counts["tasks_month"] or 0,
+                }
             )
-            worker_stats.append(stats)
-            total_active += stats["active_tasks"]
-            total_resolved += stats["total_resolved"] + stats["total_closed"]
+            total_active += pending + in_progress
+            total_resolved += resolved + closed_count
 
         worker_stats.sort(
             key=lambda worker_stat: worker_stat["tasks_this_week"], reverse=True
@@ -49,111 +122,15 @@ class AdminAnalyticsService:
         return {
             "workers": worker_stats,
             "summary": {
-                "total_workers": len(workers),
+                "total_workers": len(rows),
                 "total_active_tasks": total_active,
                 "total_resolved": total_resolved,
-                "avg_tasks_per_worker": round(total_active / len(workers), 1)
-                if workers
+                "avg_tasks_per_worker": round(total_active / len(rows), 1)
+                if rows
                 else 0,
             },
         }
 
-    @staticmethod
-    def _count_worker_issues(
-        session: Session,
-        worker_id: UUID,
-        statuses: Optional[List[str]] = None,
-        resolved_after: Optional[datetime] = None,
-    ) -> int:
-        statement = (
-            select(func.count())
-            .select_from(Issue)
-            .where(col(Issue.worker_id) == worker_id)
-        )
-
-        if statuses is not None:
-            statement = statement.where(col(Issue.status).in_(statuses))
-
-        if resolved_after is not None:
-            statement = statement.where(col(Issue.resolved_at) >= resolved_after)
-
-        return session.exec(statement).one()
-
-    @staticmethod
-    def _compute_worker_stats(
-        session: Session, worker: User, week_ago: datetime, month_ago: datetime
-    ) -> Dict[str, Any]:
-        """Compute statistics for a single worker"""
-        worker_id = worker.id
-
-        pending = AdminAnalyticsService._count_worker_issues(
-            session, worker_id, statuses=["ASSIGNED"]
-        )
-        in_progress = AdminAnalyticsService._count_worker_issues(
-            session, worker_id, statuses=["ACCEPTED", "IN_PROGRESS"]
-        )
-        resolved = AdminAnalyticsService._count_worker_issues(
-            session, worker_id, statuses=["RESOLVED"]
-        )
-        closed = AdminAnalyticsService._count_worker_issues(
-            session, worker_id, statuses=["CLOSED"]
-        )
-        tasks_week = AdminAnalyticsService._count_worker_issues(
-            session,
-            worker_id,
-            statuses=["RESOLVED", "CLOSED"],
-            resolved_after=week_ago,
-        )
-        tasks_month = AdminAnalyticsService._count_worker_issues(
-            session,
-            worker_id,
-            statuses=["RESOLVED", "CLOSED"],
-            resolved_after=month_ago,
-        )
-
-        avg_days = AdminAnalyticsService._compute_avg_resolution_days(
-            session, worker_id
-        )
-
-        return {
-            "worker_id": worker_id,
-            "worker_name": worker.full_name or worker.email,
-            "email": worker.email,
-            "active_tasks": pending + in_progress,
-            "pending_acceptance": pending,
-            "in_progress": in_progress,
-            "total_resolved": resolved,
-            "total_closed": closed,
-            "avg_resolution_days": avg_days,
-            "tasks_this_week": tasks_week,
-            "tasks_this_month": tasks_month,
-        }
-
-    @staticmethod
-    def _compute_avg_resolution_days(
-        session: Session, worker_id: UUID
-    ) -> Optional[float]:
-        """Calculate average resolution time in calendar days for a worker."""
-        resolved_issues = session.exec(
-            select(Issue).where(
-                col(Issue.worker_id) == worker_id,
-                col(Issue.status).in_(["RESOLVED", "CLOSED"]),
-                col(Issue.accepted_at).is_not(None),
-                col(Issue.resolved_at).is_not(None),
-            )
-        ).all()
-
-        if not resolved_issues:
-            return None
-
-        total_days = sum(
-            (issue.resolved_at.date() - issue.accepted_at.date()).days
-            for issue in resolved_issues
-            if issue.accepted_at and issue.resolved_at
-        )
-
-        return round(total_days / len(resolved_issues), 1)
-
     @staticmethod
     def get_workers_with_stats(
         session: Session, org_id: Optional[UUID] = None
@@ -162,70 +139,25 @@ class AdminAnalyticsService:
         Get all workers with their current task counts for assignment dropdown.
         Returns workers sorted by workload (least busy first).
         """
-        statement = select(User).where(col(User.role) == "WORKER")
-        if org_id is not None:
-            statement = statement.where(col(User.org_id) == org_id)
-        workers = session.exec(statement).all()
-
-        result: List[Dict[str, Any]] = []
-        for worker in workers:
-            active_count = AdminAnalyticsService._count_worker_issues(
-                session,
-                worker.id,
-                statuses=["ASSIGNED", "ACCEPTED", "IN_PROGRESS"],
-            )
-            total_assigned = AdminAnalyticsService._count_worker_issues(
-                session, worker.id
-            )
-            resolved_count = AdminAnalyticsService._count_worker_issues(
-                session,
-                worker.id,
-                statuses=["RESOLVED", "CLOSED"],
-            )
-
-            result.append(
-                {
-                    "id": worker.id,
-                    "email": worker.email,
-                    "full_name": worker.full_name,
-                    "status": worker.status,
-                    "active_task_count": active_count,
-                    "total_assigned": total_assigned,
-                    "resolved_count": resolved_count,
-                }
-            )
-
-        result.sort(key=lambda worker_stat: worker_stat["active_task_count"])
-        return result
+        return WorkloadSnapshot.workers(session, org_id)
 
     @staticmethod
     def get_dashboard_stats(
         session: Session, org_id: Optional[UUID] = None
     ) -> Dict[str, int]:
-        """Get quick dashboard statistics"""
-        reported_stmt = (
-            select(func.count())
-            .select_from(Issue)
-            .where(col(Issue.status) == "REPORTED")
-        )
-        in_progress_stmt = (
-            select(func.count())
-            .select_from(Issue)
-            .where(col(Issue.status).in_(["ASSIGNED", "ACCEPTED", "IN_PROGRESS"]))
-        )
-        resolved_stmt = (
-            select(func.count())
-            .select_from(Issue)
-            .where(col(Issue.status).in_(["RESOLVED", "CLOSED"]))
-        )
-
-        if org_id is not None:
-            reported_stmt = reported_stmt.where(col(Issue.org_id) == org_id)
-            in_progress_stmt = in_progress_stmt.where(col(Issue.org_id) == org_id)
-            resolved_stmt = resolved_stmt.where(col(Issue.org_id) == org_id)
+        """Get quick dashboard statistics.
 
+        Read from the per-(org, status) counters, so the cost depends on the
+        number of statuses rather than the number of issues.
+        """
+        by_status = IssueMetricsService.status_counts(session, org_id)
         return {
-            "reported": session.exec(reported_stmt).one(),
-            "in_progress": session.exec(in_progress_stmt).one(),
-            "resolved": session.exec(resolved_stmt).one(),
+            "reported": by_status.get("REPORTED", 0),
+            "in_progress": sum(
+                by_status.get(status, 0)
+                for status in ["ASSIGNED", "ACCEPTED", "IN_PROGRESS"]
+            ),
+            "resolved": sum(
+                by_status.get(status, 0) for status in ["RESOLVED", "CLOSED"]
+            ),
         }
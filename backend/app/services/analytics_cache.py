@@ -0,0 +1,73 @@
+"""Shared cache for the unauthenticated analytics endpoints.
+
+The heatmap, stats and public issue list are identical for every visitor,
+so one computation per key serves all of them until the TTL runs out. With
+the in-process backend keys carry the data version of the tables a result is
+built from, so local commits take effect on the next request; the shared
+Redis backend relies on the TTL alone.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlmodel import Session
+
+from app.core.cache import (
+    CacheBackend,
+    MemoryBackend,
+    NullBackend,
+    RedisBackend,
+    ResponseCache,
+)
+from app.core.config import settings
+from app.db.change_tracking import data_version
+
+
+def _build_backend() -> CacheBackend:
+    if settings.ANALYTICS_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL, prefix="marg:analytics:")
+    if settings.ANALYTICS_CACHE_BACKEND == "none":
+        return NullBackend()
+    return MemoryBackend(settings.ANALYTICS_CACHE_SIZE)
+
+
+analytics_cache = ResponseCache(
+    _build_backend(),
+    ttl_seconds=settings.ANALYTICS_CACHE_TTL_SECONDS,
+    stale_seconds=settings.ANALYTICS_CACHE_STALE_SECONDS,
+)
+
+
+class AnalyticsCacheService:
+    @staticmethod
+    def cached(
+        session: Session,
+        name: str,
+        tables: Iterable[str],
+        loader: Callable[[Session], Any],
+    ) -> Any:
+        """``loader(session)``, shared across requests for the same ``name``."""
+        key = name
+        if not analytics_cache.backend.shared:
+            key = f"{name}:v{data_version(*tables)}"
+        bind = session.get_bind()
+
+        def refresh() -> Any:
+            # Runs after the request that noticed the stale entry has ended.
+            with Session(bind) as fresh:
+                return loader(fresh)
+
+        return analytics_cache.get_or_compute(key, lambda: loader(session), refresh)
+
+    @staticmethod
+    def stats() -> Dict[str, Optional[int]]:
+        return analytics_cache.stats()
+
+    @staticmethod
+    def clear() -> None:
+        analytics_cache.clear()
+
+    @staticmethod
+    def shutdown(wait: bool = True) -> None:
+        analytics_cache.shutdown(wait=wait)
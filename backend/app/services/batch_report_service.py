@@ -0,0 +1,179 @@
+"""Batch submission of queued citizen reports.
+
+Offline mobile clients sync several reports at once. The batch is resolved
+with set-based queries (one category lookup, one LATERAL nearest-duplicate
+query), photos are uploaded concurrently, and every issue and evidence row is
+written in a single transaction.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import case, update
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.db.change_tracking import mark_changed
+from app.models.domain import Category, Evidence, Issue, User
+from app.services.exif import ExifService
+from app.services.issue_service import DUPLICATE_RADIUS_M, IssueService
+from app.services.photo_storage import PhotoStorage, StoredPhoto
+
+
+@dataclass
+class BatchReportItem:
+    category_id: UUID
+    lat: float
+    lng: float
+    address: Optional[str]
+    photo: UploadFile
+
+
+@dataclass
+class BatchReportOutcome:
+    index: int
+    status: str  # CREATED, MERGED, REJECTED
+    issue_id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+
+def _rejected(index: int, detail: str) -> BatchReportOutcome:
+    return BatchReportOutcome(index=index, status="REJECTED", detail=detail)
+
+
+def _store_photo(photo: UploadFile) -> Tuple[dict, StoredPhoto]:
+    exif_data = IssueService.extract_exif(photo.file)
+    return exif_data, IssueService.store_issue_photo(photo.file)
+
+
+class BatchReportService:
+    @staticmethod
+    def submit(
+        session: Session, reporter: User, items: List[BatchReportItem]
+    ) -> List[BatchReportOutcome]:
+        results: Dict[int, BatchReportOutcome] = {}
+
+        category_ids = {item.category_id for item in items}
+        known_categories = set(
+            session.exec(
+                select(Category.id).where(col(Category.id).in_(category_ids))
+            ).all()
+        )
+        pending: List[int] = []
+        for index, item in enumerate(items):
+            if item.category_id not in known_categories:
+                results[index] = _rejected(index, "Issue category not found")
+                continue
+            try:
+                PhotoStorage.ensure_within_limit(item.photo)
+            except HTTPException as exc:
+                results[index] = _rejected(index, exc.detail)
+                continue
+            pending.append(index)
+
+        duplicate_ids = IssueService.find_duplicate_issue_ids(
+            session, [(items[i].lat, items[i].lng) for i in pending]
+        )
+        duplicates: Dict[int, Optional[UUID]] = dict(zip(pending, duplicate_ids))
+
+        org_ids: Dict[int, UUID] = {}
+        for index in pending:
+            if duplicates[index] is not None:
+                continue
+            point_wkt = IssueService.build_point_wkt(items[index].lat, items[index].lng)
+            org_id = IssueService.find_org_for_location(session, point_wkt)
+            if org_id is None:
+                results[index] = _rejected(
+                    index, "No authority jurisdiction covers these coordinates"
+                )
+            else:
+                org_ids[index] = org_id
+        pending = [index for index in pending if index not in results]
+
+        with ThreadPoolExecutor(
+            max_workers=settings.BATCH_UPLOAD_CONCURRENCY,
+            thread_name_prefix="batch-upload",
+        ) as pool:
+            uploads = {
+                index: pool.submit(_store_photo, items[index].photo)
+                for index in pending
+            }
+
+        new_issues: List[Tuple[Issue, BatchReportItem]] = []
+        evidence_rows: List[Evidence] = []
+        merged_counts: Dict[UUID, int] = {}
+        for index in pending:
+            try:
+                exif_data, stored = uploads[index].result()
+            except Exception:
+                results[index] = _rejected(index, "Photo upload failed")
+                continue
+
+            item = items[index]
+            status = "MERGED"
+            target: Optional[Issue] = None
+            target_id = duplicates[index]
+            if target_id is not None:
+                merged_counts[target_id] = merged_counts.get(target_id, 0) + 1
+            else:
+                # Reports queued offline at the same spot merge within the batch.
+                target = next(
+                    (
+                        issue
+                        for issue, origin in new_issues
+                        if ExifService.validate_proximity(
+                            origin.lat, origin.lng, item.lat, item.lng, DUPLICATE_RADIUS_M
+                        )
+                    ),
+                    None,
+                )
+                if target is not None:
+                    target.report_count += 1
+                else:
+                    status = "CREATED"
+                    target = Issue(
+                        category_id=item.category_id,
+                        status="REPORTED",
+                        location=IssueService.build_point_wkt(item.lat, item.lng),
+                        address=item.address,
+                        reporter_id=reporter.id,
+                        org_id=org_ids[index],
+                        priority=None,
+                        report_count=1,
+                    )
+                    new_issues.append((target, item))
+                target_id = target.id
+
+            evidence_rows.append(
+                IssueService.build_evidence(
+                    target_id,
+                    reporter.id,
+                    stored.file_path,
+                    exif_data,
+                    content_sha256=stored.sha256,
+                )
+            )
+            results[index] = BatchReportOutcome(
+                index=index, status=status, issue_id=target_id
+            )
+
+        if merged_counts:
+            session.exec(
+                update(Issue)
+                .where(col(Issue.id).in_(merged_counts))
+                .values(
+                    report_count=Issue.report_count
+                    + case(merged_counts, value=Issue.id)
+                )
+            )
+            mark_changed(session, "issue")
+        session.add_all(issue for issue, _ in new_issues)
+        session.add_all(evidence_rows)
+        session.commit()
+
+        return [results[index] for index in range(len(items))]
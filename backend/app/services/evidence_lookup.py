@@ -0,0 +1,113 @@
+"""Cached "latest stored evidence" lookup for media requests.
+
+Map and dashboard views request hundreds of images per page, and every one
+of them needs the object key of the newest stored photo for an
+(issue, REPORT/RESOLVE) pair. Results are kept in a bounded LRU together with
+the object's ETag, so a warm request needs neither a database round trip nor
+a MinIO stat to answer a conditional GET.
+
+Entries are dropped after any commit that inserts or updates evidence for
+the pair; the TTL bounds staleness for writes made by other processes. A
+lookup that overlaps an evidence commit is not cached, so a row read just
+before the commit cannot be stored after its invalidation has run.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.change_tracking import data_version
+from app.models.domain import Evidence
+
+_TOUCHED_KEY = "touched_evidence"
+
+CacheKey = Tuple[UUID, str]
+
+
+class LatestEvidence(NamedTuple):
+    file_path: str
+    etag: Optional[str] = None
+
+
+_cache = LRUCache(
+    settings.MEDIA_LOOKUP_CACHE_SIZE,
+    ttl_seconds=settings.MEDIA_LOOKUP_CACHE_TTL_SECONDS,
+)
+
+
+class EvidenceLookupService:
+    @staticmethod
+    def latest(
+        session: Session, issue_id: UUID, evidence_type: str
+    ) -> Optional[LatestEvidence]:
+        key = (issue_id, evidence_type)
+        # invalidate_all() (raw SQL maintenance) moves the epoch on.
+        epoch = data_version()
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == epoch:
+            return cached[1]
+
+        written = data_version(Evidence.__tablename__)
+        file_path = session.exec(
+            select(Evidence.file_path)
+            .where(
+                Evidence.issue_id == issue_id,
+                Evidence.type == evidence_type,
+                Evidence.upload_status == "STORED",
+            )
+            .order_by(Evidence.created_at.desc())
+            .limit(1)
+        ).first()
+        if file_path is None:
+            return None
+        latest = LatestEvidence(file_path=file_path)
+        if data_version(Evidence.__tablename__) == written:
+            _cache.set(key, (epoch, latest))
+        return latest
+
+    @staticmethod
+    def remember_etag(
+        issue_id: UUID, evidence_type: str, file_path: str, etag: str
+    ) -> None:
+        key = (issue_id, evidence_type)
+        cached = _cache.get(key)
+        if cached is not None and cached[1].file_path == file_path:
+            _cache.set(key, (cached[0], cached[1]._replace(etag=etag)))
+
+    @staticmethod
+    def invalidate(issue_id: UUID, evidence_type: str) -> None:
+        _cache.pop((issue_id, evidence_type))
+
+    @staticmethod
+    def clear() -> None:
+        _cache.clear()
+
+    @staticmethod
+    def stats() -> dict:
+        return _cache.stats()
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _collect_touched_evidence(session: OrmSession, flush_context, instances) -> None:
+    touched: Set[CacheKey] = session.info.setdefault(_TOUCHED_KEY, set())
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Evidence):
+            touched.add((obj.issue_id, obj.type))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_touched_evidence(session: OrmSession) -> None:
+    for issue_id, evidence_type in session.info.pop(_TOUCHED_KEY, ()):
+        EvidenceLookupService.invalidate(issue_id, evidence_type)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_touched_evidence(session: OrmSession) -> None:
+    session.info.pop(_TOUCHED_KEY, None)
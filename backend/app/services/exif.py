@@ -1,6 +1,7 @@
 import logging
+import struct
 from datetime import datetime, timedelta
-from typing import Tuple, Optional
+from typing import BinaryIO, Dict, Tuple, Optional
 import math
 from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
@@ -10,13 +11,196 @@ from app.core.time import utc_now
 
 logger = logging.getLogger(__name__)
 
+_JPEG_SOI = b"\xff\xd8"
+_EXIF_HEADER = b"Exif\x00\x00"
+
+# TIFF tags read by the JPEG fast path; everything else is skipped unparsed.
+_TAG_EXIF_IFD = 0x8769
+_TAG_GPS_IFD = 0x8825
+_TAG_DATETIME_ORIGINAL = 0x9003
+_GPS_LATITUDE_REF = 1
+_GPS_LATITUDE = 2
+_GPS_LONGITUDE_REF = 3
+_GPS_LONGITUDE = 4
+
+# TIFF field type -> (struct code, byte size)
+_TIFF_TYPES = {
+    1: ("B", 1),  # BYTE
+    2: ("s", 1),  # ASCII
+    3: ("H", 2),  # SHORT
+    4: ("L", 4),  # LONG
+    5: ("LL", 8),  # RATIONAL
+    7: ("B", 1),  # UNDEFINED
+    9: ("l", 4),  # SLONG
+    10: ("ll", 8),  # SRATIONAL
+}
+
+
+def _find_exif_segment(data: bytes) -> Optional[memoryview]:
+    """Return the TIFF payload of the JPEG APP1 Exif segment, if present.
+
+    Walks marker segments from SOI and stops at start-of-scan, so only the
+    header region of the file is ever touched.
+    """
+    view = memoryview(data)
+    pos = 2
+    end = len(data)
+    while pos + 4 <= end:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # standalone markers
+            pos += 2
+            continue
+        if marker in (0xDA, 0xD9):  # start of scan / end of image
+            return None
+        (length,) = struct.unpack_from(">H", data, pos + 2)
+        body = pos + 4
+        if marker == 0xE1 and data[body : body + 6] == _EXIF_HEADER:
+            return view[body + 6 : min(pos + 2 + length, end)]
+        pos += 2 + length
+    return None
+
+
+class _TiffReader:
+    """Minimal TIFF IFD reader for the handful of tags ExifService uses."""
+
+    def __init__(self, tiff: memoryview):
+        self.tiff = tiff
+        byte_order = bytes(tiff[:2])
+        if byte_order == b"II":
+            self.endian = "<"
+        elif byte_order == b"MM":
+            self.endian = ">"
+        else:
+            raise ValueError("Invalid TIFF byte order")
+
+    def _unpack(self, fmt: str, offset: int) -> tuple:
+        return struct.unpack_from(self.endian + fmt, self.tiff, offset)
+
+    def first_ifd(self) -> int:
+        return self._unpack("L", 4)[0]
+
+    def read_ifd(self, offset: int, wanted: Tuple[int, ...]) -> Dict[int, object]:
+        values: Dict[int, object] = {}
+        (count,) = self._unpack("H", offset)
+        for index in range(count):
+            entry = offset + 2 + index * 12
+            tag, field_type, n = self._unpack("HHL", entry)
+            if tag not in wanted or field_type not in _TIFF_TYPES:
+                continue
+            code, size = _TIFF_TYPES[field_type]
+            value_offset = entry + 8
+            if size * n > 4:
+                (value_offset,) = self._unpack("L", entry + 8)
+            if value_offset + size * n > len(self.tiff):
+                continue  # value lies beyond the scanned prefix
+            if field_type == 2:
+                raw = bytes(self.tiff[value_offset : value_offset + n])
+                values[tag] = raw.split(b"\x00", 1)[0].decode("ascii", "replace")
+            elif field_type in (5, 10):
+                parts = self._unpack(code * n, value_offset)
+                values[tag] = tuple(
+                    (parts[i], parts[i + 1]) for i in range(0, len(parts), 2)
+                )
+            else:
+                parts = self._unpack(code * n, value_offset)
+                values[tag] = parts[0] if n == 1 else parts
+        return values
+
+
+def _rational_degrees(value: object) -> Optional[float]:
+    if not isinstance(value, tuple) or len(value) < 3:
+        return None
+    parts = []
+    for numerator, denominator in value[:3]:
+        if denominator == 0:
+            return None
+        parts.append(numerator / denominator)
+    return parts[0] + parts[1] / 60.0 + parts[2] / 3600.0
+
 
 class ExifService:
     @staticmethod
-    def extract_metadata(file_content: bytes) -> dict:
+    def extract_metadata(
+        file_content: bytes, source: Optional[BinaryIO] = None
+    ) -> dict:
+        """Read capture time and GPS position from an image.
+
+        JPEGs are parsed straight from the APP1 header, so ``file_content``
+        only needs to hold the first few tens of KB. Other formats, or JPEGs
+        the fast path cannot make sense of, go through a full PIL decode;
+        when ``file_content`` is only a prefix of ``source``, that decode
+        reads the whole stream, which is rewound afterwards.
+        """
+        if file_content[:2] == _JPEG_SOI:
+            try:
+                return ExifService._extract_jpeg_metadata(file_content)
+            except (ValueError, struct.error) as e:
+                logger.debug("Fast EXIF parse failed, using PIL: %s", e)
+        if source is None:
+            return ExifService._extract_metadata_pil(io.BytesIO(file_content))
+        source.seek(0)
+        try:
+            return ExifService._extract_metadata_pil(source)
+        finally:
+            source.seek(0)
+
+    @staticmethod
+    def _extract_jpeg_metadata(file_content: bytes) -> dict:
+        metadata = {"timestamp": utc_now(), "lat": None, "lng": None}
+        tiff = _find_exif_segment(file_content)
+        if tiff is None:
+            return metadata
+
+        reader = _TiffReader(tiff)
+        ifd0 = reader.read_ifd(
+            reader.first_ifd(),
+            (_TAG_EXIF_IFD, _TAG_GPS_IFD, _TAG_DATETIME_ORIGINAL),
+        )
+
+        original = ifd0.get(_TAG_DATETIME_ORIGINAL)
+        exif_ifd = ifd0.get(_TAG_EXIF_IFD)
+        if isinstance(exif_ifd, int):
+            original = reader.read_ifd(exif_ifd, (_TAG_DATETIME_ORIGINAL,)).get(
+                _TAG_DATETIME_ORIGINAL, original
+            )
+        if isinstance(original, str):
+            try:
+                metadata["timestamp"] = datetime.strptime(
+                    original, "%Y:%m:%d %H:%M:%S"
+                )
+            except ValueError:
+                logger.warning("Unparseable DateTimeOriginal: %r", original)
+
+        gps_ifd = ifd0.get(_TAG_GPS_IFD)
+        if isinstance(gps_ifd, int):
+            gps = reader.read_ifd(
+                gps_ifd,
+                (
+                    _GPS_LATITUDE_REF,
+                    _GPS_LATITUDE,
+                    _GPS_LONGITUDE_REF,
+                    _GPS_LONGITUDE,
+                ),
+            )
+            lat = _rational_degrees(gps.get(_GPS_LATITUDE))
+            if lat is not None and _GPS_LATITUDE_REF in gps:
+                metadata["lat"] = lat if gps[_GPS_LATITUDE_REF] == "N" else -lat
+            lng = _rational_degrees(gps.get(_GPS_LONGITUDE))
+            if lng is not None and _GPS_LONGITUDE_REF in gps:
+                metadata["lng"] = lng if gps[_GPS_LONGITUDE_REF] == "E" else -lng
+
+        return metadata
+
+    @staticmethod
+    def _extract_metadata_pil(image_file: BinaryIO) -> dict:
         metadata = {"timestamp": utc_now(), "lat": None, "lng": None}
         try:
-            image = Image.open(io.BytesIO(file_content))
+            image = Image.open(image_file)
             exif = image.getexif()
             if not exif:
                 return metadata
@@ -0,0 +1,178 @@
+"""Idempotency-Key support for upload endpoints.
+
+The first successful response for a (user, scope, key) triple is stored in
+the same transaction as the work it describes, so a retry either finds the
+committed record and replays it or, if the original never committed, runs
+again from scratch. Reusing a key for a different request is rejected.
+
+Expired records are deleted by ``IdempotencyPurger`` in the background, so
+the table only holds keys that can still be replayed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.time import utc_now
+from app.models.domain import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+@dataclass
+class IdempotentRequest:
+    """One request's idempotency scope; a no-op when the client sent no key."""
+
+    user_id: UUID
+    scope: str
+    key: Optional[str]
+    request_hash: str
+
+    def replay(self, session: Session) -> Optional[JSONResponse]:
+        """Stored response for a retry, or None when the request must run."""
+        if self.key is None:
+            return None
+        if not self.key or len(self.key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters",
+            )
+
+        record = session.exec(
+            select(IdempotencyRecord).where(
+                IdempotencyRecord.user_id == self.user_id,
+                IdempotencyRecord.scope == self.scope,
+                IdempotencyRecord.key == self.key,
+            )
+        ).first()
+        if record is None:
+            return None
+        if record.expires_at <= utc_now():
+            # Expired: drop it so this request's response can take the key.
+            session.delete(record)
+            session.flush()
+            return None
+        if record.request_hash != self.request_hash:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        return JSONResponse(
+            status_code=record.status_code,
+            content=json.loads(record.response_body),
+            headers={REPLAY_HEADER: "true"},
+        )
+
+    def record(self, session: Session, status_code: int, body: Any) -> None:
+        """Stage the response; the caller's commit makes it visible."""
+        if self.key is None:
+            return
+        now = utc_now()
+        session.add(
+            IdempotencyRecord(
+                user_id=self.user_id,
+                scope=self.scope,
+                key=self.key,
+                request_hash=self.request_hash,
+                status_code=status_code,
+                response_body=json.dumps(jsonable_encoder(body)),
+                created_at=now,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+            )
+        )
+
+    def commit(self, session: Session) -> Optional[JSONResponse]:
+        """Commit; if a concurrent retry won the key, replay its response."""
+        try:
+            session.commit()
+        except IntegrityError:
+            if self.key is None:
+                raise
+            session.rollback()
+            replayed = self.replay(session)
+            if replayed is None:
+                raise
+            return replayed
+        return None
+
+
+class IdempotencyService:
+    @staticmethod
+    def for_request(
+        user_id: UUID, scope: str, key: Optional[str], *fields: Any
+    ) -> IdempotentRequest:
+        payload = json.dumps(jsonable_encoder(fields), separators=(",", ":"))
+        return IdempotentRequest(
+            user_id=user_id,
+            scope=scope,
+            key=key,
+            request_hash=hashlib.sha256(payload.encode()).hexdigest(),
+        )
+
+    @staticmethod
+    def purge_expired(session: Session) -> int:
+        """Delete expired records; returns how many were removed."""
+        result = session.exec(
+            delete(IdempotencyRecord).where(col(IdempotencyRecord.expires_at) < utc_now())
+        )
+        session.commit()
+        return result.rowcount
+
+
+class IdempotencyPurger:
+    """Runs ``purge_expired`` at startup, then every ``interval`` seconds
+    (never again when ``interval`` is 0)."""
+
+    def __init__(self) -> None:
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, engine: Engine, interval: float) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.is_set():
+                try:
+                    with Session(engine) as session:
+                        purged = IdempotencyService.purge_expired(session)
+                    if purged:
+                        logger.info("Purged %s expired idempotency records", purged)
+                except Exception:
+                    logger.exception("Idempotency record purge failed")
+                if interval <= 0 or self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(
+            target=run, name="idempotency-purger", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+idempotency_purger = IdempotencyPurger()
@@ -0,0 +1,217 @@
+"""Bounded background pipeline for staged report ingestion.
+
+In staged mode the report endpoint only validates the request and persists a
+PENDING evidence row; EXIF extraction and the object upload run here on a
+fixed-size thread pool. Capacity is reserved before any database write so a
+full queue turns into a fast 503 instead of unbounded memory growth.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.domain import Evidence
+from app.services.issue_service import IssueService
+from app.services.photo_storage import PhotoStorage, StoredPhoto
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """Raised when no ingest capacity is left for a new report."""
+
+
+@dataclass
+class IngestJob:
+    evidence_id: UUID
+    file_path: str
+    spool_path: str
+
+
+def _default_session_factory() -> Session:
+    from app.db.session import engine
+
+    return Session(engine)
+
+
+class IngestReservation:
+    """One unit of pipeline capacity, released unless a job is submitted.
+
+    The reservation owns the on-disk spool of the photo until ``submit``
+    hands it to the pipeline; an abandoned reservation deletes it.
+    """
+
+    def __init__(self, pipeline: "IngestPipeline"):
+        self._pipeline = pipeline
+        self._consumed = False
+        self._spool_path: Optional[str] = None
+
+    def spool(self, source: BinaryIO) -> None:
+        self._spool_path = PhotoStorage.spool_to_disk(source)
+
+    def submit(self, evidence_id: UUID, file_path: str) -> None:
+        if self._spool_path is None:
+            raise RuntimeError("Photo must be spooled before submitting")
+        self._consumed = True
+        self._pipeline._submit(
+            IngestJob(
+                evidence_id=evidence_id,
+                file_path=file_path,
+                spool_path=self._spool_path,
+            )
+        )
+
+    def __enter__(self) -> "IngestReservation":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self._consumed:
+            self._consumed = True
+            PhotoStorage.discard_spool(self._spool_path)
+            self._pipeline._release()
+
+
+class IngestPipeline:
+    """Thread pool with a hard cap on queued plus running ingest jobs."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.session_factory = session_factory or _default_session_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cond = threading.Condition()
+        self._reserved = 0
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_processing_s = 0.0
+
+    def reserve(self) -> IngestReservation:
+        with self._cond:
+            if self._reserved >= self.max_pending:
+                self._rejected += 1
+                raise IngestQueueFull()
+            self._reserved += 1
+        return IngestReservation(self)
+
+    def metrics(self) -> Dict[str, float]:
+        with self._cond:
+            finished = self._completed + self._failed
+            return {
+                "capacity": self.max_pending,
+                "workers": self.max_workers,
+                "reserved": self._reserved,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_processing_ms": round(
+                    self._total_processing_s * 1000 / finished, 2
+                )
+                if finished
+                else 0.0,
+            }
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Block until every reserved job has finished. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._reserved == 0, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _release(self) -> None:
+        with self._cond:
+            self._reserved -= 1
+            self._cond.notify_all()
+
+    def _submit(self, job: IngestJob) -> None:
+        with self._cond:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ingest"
+                )
+            self._queued += 1
+            executor = self._executor
+        executor.submit(self._run, job)
+
+    def _run(self, job: IngestJob) -> None:
+        with self._cond:
+            self._queued -= 1
+            self._running += 1
+        started = time.perf_counter()
+        ok = False
+        try:
+            ok = self._process(job)
+        except Exception:
+            logger.exception("Ingest job failed for evidence=%s", job.evidence_id)
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._reserved -= 1
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+                self._total_processing_s += time.perf_counter() - started
+                self._cond.notify_all()
+
+    def _process(self, job: IngestJob) -> bool:
+        exif_data: dict = {}
+        stored: Optional[StoredPhoto] = None
+        upload_status = "FAILED"
+        try:
+            with open(job.spool_path, "rb") as photo:
+                exif_data = IssueService.extract_exif(photo)
+                stored = IssueService.store_issue_photo(photo, file_path=job.file_path)
+            upload_status = "STORED"
+        except Exception:
+            logger.exception(
+                "Photo upload failed for evidence=%s path=%s",
+                job.evidence_id,
+                job.file_path,
+            )
+        finally:
+            PhotoStorage.discard_spool(job.spool_path)
+
+        with self.session_factory() as session:
+            evidence = session.get(Evidence, job.evidence_id)
+            if evidence is None:
+                logger.warning("Evidence %s vanished before ingest", job.evidence_id)
+                return False
+            evidence.upload_status = upload_status
+            if stored is not None:
+                # Content-addressed storage picks the key from the bytes.
+                evidence.file_path = stored.file_path
+                evidence.content_sha256 = stored.sha256
+                evidence.exif_timestamp = exif_data.get("timestamp")
+                evidence.exif_lat = exif_data.get("lat")
+                evidence.exif_lng = exif_data.get("lng")
+            session.add(evidence)
+            session.commit()
+        return upload_status == "STORED"
+
+
+ingest_pipeline = IngestPipeline(
+    max_workers=settings.INGEST_WORKERS,
+    max_pending=settings.INGEST_MAX_PENDING,
+)
@@ -0,0 +1,328 @@
+"""Hierarchical point clustering of open issues for the public map.
+
+A port of the supercluster approach: issues are projected to unit web-mercator
+coordinates and indexed in a static KD-tree (KDBush). For each zoom level,
+from the deepest up, points within ``CLUSTER_RADIUS_PX`` screen pixels of
+each other are merged into a weighted cluster. The result is one KD-tree per
+zoom. A bbox/zoom query is then a single range search in one tree, and its
+cost depends on the number of results rather than the number of issues.
+
+The index is rebuilt when the issue data version moves on, and after
+CLUSTER_INDEX_TTL_SECONDS to pick up writes made by other processes. Only the
+first build runs in a request; later rebuilds run in a background thread, at
+most once per CLUSTER_MIN_REBUILD_SECONDS, and replace the snapshot when
+done. Requests keep using the previous snapshot in the meantime.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session, col, func, select
+
+from app.core.config import settings
+from app.db.change_tracking import data_version
+from app.models.domain import Issue
+
+logger = logging.getLogger(__name__)
+
+_TABLES = ("issue",)
+# Tile extent the radius is measured against, as in supercluster.
+EXTENT = 512
+
+
+def lng_x(lng: float) -> float:
+    return lng / 360.0 + 0.5
+
+
+def lat_y(lat: float) -> float:
+    # Clamped to the web-mercator range; the poles are at infinity.
+    sin = math.sin(math.radians(min(max(lat, -85.0511), 85.0511)))
+    y = 0.5 - 0.25 * math.log((1 + sin) / (1 - sin)) / math.pi
+    return min(max(y, 0.0), 1.0)
+
+
+def x_lng(x: float) -> float:
+    return (x - 0.5) * 360.0
+
+
+def y_lat(y: float) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+
+
+class KDBush:
+    """Static 2-D KD-tree over parallel coordinate lists.
+
+    Items are sorted in place into a balanced tree (median at the middle of
+    every slice, alternating axes); leaves of ``node_size`` items are
+    scanned linearly.
+    """
+
+    def __init__(self, xs: Sequence[float], ys: Sequence[float], node_size: int = 64):
+        self.xs = xs
+        self.ys = ys
+        self.node_size = node_size
+        self.ids = list(range(len(xs)))
+        self._sort(0, len(self.ids) - 1, 0)
+
+    def _sort(self, left: int, right: int, axis: int) -> None:
+        if right - left <= self.node_size:
+            return
+        key = self.xs if axis == 0 else self.ys
+        self.ids[left : right + 1] = sorted(self.ids[left : right + 1], key=key.__getitem__)
+        middle = (left + right) >> 1
+        self._sort(left, middle - 1, 1 - axis)
+        self._sort(middle + 1, right, 1 - axis)
+
+    def range(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List[int]:
+        """Items inside the axis-aligned box."""
+        xs, ys, ids = self.xs, self.ys, self.ids
+        result: List[int] = []
+        stack = [(0, len(ids) - 1, 0)]
+        while stack:
+            left, right, axis = stack.pop()
+            if right - left <= self.node_size:
+                for i in range(left, right + 1):
+                    item = ids[i]
+                    if min_x <= xs[item] <= max_x and min_y <= ys[item] <= max_y:
+                        result.append(item)
+                continue
+
+            middle = (left + right) >> 1
+            item = ids[middle]
+            x, y = xs[item], ys[item]
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                result.append(item)
+            if (min_x <= x) if axis == 0 else (min_y <= y):
+                stack.append((left, middle - 1, 1 - axis))
+            if (max_x >= x) if axis == 0 else (max_y >= y):
+                stack.append((middle + 1, right, 1 - axis))
+        return result
+
+    def within(self, qx: float, qy: float, radius: float) -> List[int]:
+        """Items within ``radius`` of (qx, qy)."""
+        xs, ys, ids = self.xs, self.ys, self.ids
+        r2 = radius * radius
+        result: List[int] = []
+        stack = [(0, len(ids) - 1, 0)]
+        while stack:
+            left, right, axis = stack.pop()
+            if right - left <= self.node_size:
+                for i in range(left, right + 1):
+                    item = ids[i]
+                    if (xs[item] - qx) ** 2 + (ys[item] - qy) ** 2 <= r2:
+                        result.append(item)
+                continue
+
+            middle = (left + right) >> 1
+            item = ids[middle]
+            x, y = xs[item], ys[item]
+            if (x - qx) ** 2 + (y - qy) ** 2 <= r2:
+                result.append(item)
+            if (qx - radius <= x) if axis == 0 else (qy - radius <= y):
+                stack.append((left, middle - 1, 1 - axis))
+            if (qx + radius >= x) if axis == 0 else (qy + radius >= y):
+                stack.append((middle + 1, right, 1 - axis))
+        return result
+
+
+class _Node:
+    __slots__ = ("x", "y", "count", "statuses", "issue_id", "expansion_zoom", "zoom")
+
+    def __init__(self, x, y, count, statuses, issue_id=None, expansion_zoom=None):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.statuses: Dict[str, int] = statuses
+        self.issue_id: Optional[UUID] = issue_id
+        self.expansion_zoom: Optional[int] = expansion_zoom
+        # Deepest zoom at which this node has already been clustered.
+        self.zoom = math.inf
+
+
+class _Level(NamedTuple):
+    nodes: List[_Node]
+    tree: KDBush
+
+
+def _level(nodes: List[_Node]) -> _Level:
+    return _Level(nodes, KDBush([n.x for n in nodes], [n.y for n in nodes]))
+
+
+class ClusterIndex:
+    def __init__(
+        self,
+        points: Sequence[Tuple[UUID, float, float, str]],
+        max_zoom: int,
+        radius_px: float,
+    ):
+        """``points`` are (issue_id, lng, lat, status) tuples."""
+        self.max_zoom = max_zoom
+        self.radius_px = radius_px
+        leaves = [
+            _Node(lng_x(lng), lat_y(lat), 1, {status: 1}, issue_id)
+            for issue_id, lng, lat, status in points
+        ]
+        # Built from the leaves (max_zoom + 1) up, then indexed by zoom.
+        levels = [_level(leaves)]
+        for zoom in range(max_zoom, -1, -1):
+            levels.append(_level(self._cluster(levels[-1], zoom)))
+        levels.reverse()
+        self._levels: List[_Level] = levels
+
+    def _cluster(self, level: _Level, zoom: int) -> List[_Node]:
+        radius = self.radius_px / (EXTENT * 2**zoom)
+        nodes = level.nodes
+        clustered: List[_Node] = []
+        for node in nodes:
+            if node.zoom <= zoom:
+                continue
+            node.zoom = zoom
+
+            neighbours = [
+                nodes[i] for i in level.tree.within(node.x, node.y, radius)
+                if nodes[i].zoom > zoom
+            ]
+            if not neighbours:
+                # Carried to the next level up as is.
+                clustered.append(node)
+                continue
+
+            count = node.count
+            wx, wy = node.x * node.count, node.y * node.count
+            statuses = Counter(node.statuses)
+            for other in neighbours:
+                other.zoom = zoom
+                count += other.count
+                wx += other.x * other.count
+                wy += other.y * other.count
+                statuses.update(other.statuses)
+            clustered.append(
+                _Node(wx / count, wy / count, count, dict(statuses), expansion_zoom=zoom + 1)
+            )
+        return clustered
+
+    def clusters(
+        self, west: float, south: float, east: float, north: float, zoom: int
+    ) -> List[dict]:
+        level = self._levels[min(max(zoom, 0), self.max_zoom + 1)]
+        hits = level.tree.range(lng_x(west), lat_y(north), lng_x(east), lat_y(south))
+        return [
+            {
+                "lat": y_lat(node.y),
+                "lng": x_lng(node.x),
+                "count": node.count,
+                "status_counts": node.statuses,
+                "issue_id": node.issue_id,
+                "expansion_zoom": node.expansion_zoom,
+            }
+            for node in (level.nodes[i] for i in hits)
+        ]
+
+
+class _Snapshot(NamedTuple):
+    index: ClusterIndex
+    version: int
+    built_at: float
+
+
+class IssueClusterIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._rebuilding: Optional[threading.Thread] = None
+
+    def rebuild(self, session: Session) -> None:
+        version = data_version(*_TABLES)
+        location = col(Issue.location)
+        rows = session.exec(
+            select(
+                col(Issue.id), func.ST_X(location), func.ST_Y(location), col(Issue.status)
+            ).where(col(Issue.status) != "CLOSED", location.is_not(None))
+        ).all()
+        started = time.monotonic()
+        index = ClusterIndex(
+            rows, settings.CLUSTER_MAX_ZOOM, settings.CLUSTER_RADIUS_PX
+        )
+        with self._lock:
+            self._snapshot = _Snapshot(index, version, time.monotonic())
+        logger.info(
+            "Issue cluster index built with %s issues in %.0f ms",
+            len(rows),
+            (time.monotonic() - started) * 1000,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def join(self) -> None:
+        """Wait for a background rebuild in progress, if any."""
+        thread = self._rebuilding
+        if thread is not None:
+            thread.join()
+
+    def _is_current(self, snapshot: Optional[_Snapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == data_version(*_TABLES)
+            and time.monotonic() - snapshot.built_at
+            < settings.CLUSTER_INDEX_TTL_SECONDS
+        )
+
+    def _rebuild_in_background(self, bind: Union[Engine, Connection]) -> None:
+        def run() -> None:
+            try:
+                with self._build_lock, Session(bind) as session:
+                    self.rebuild(session)
+            except Exception:
+                logger.exception("Issue cluster index rebuild failed")
+            finally:
+                with self._lock:
+                    self._rebuilding = None
+
+        with self._lock:
+            if self._rebuilding is not None:
+                return
+            self._rebuilding = threading.Thread(
+                target=run, name="issue-cluster-rebuild", daemon=True
+            )
+            self._rebuilding.start()
+
+    def clusters(
+        self,
+        session: Session,
+        bbox: Tuple[float, float, float, float],
+        zoom: int,
+    ) -> List[dict]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Nothing to serve yet: the first build blocks, once.
+            with self._build_lock:
+                if self._snapshot is None:
+                    self.rebuild(session)
+            snapshot = self._snapshot
+            if snapshot is None:
+                # Cleared again before this request could use the build.
+                raise HTTPException(
+                    status_code=503, detail="Cluster index is not available yet"
+                )
+        elif (
+            not self._is_current(snapshot)
+            and time.monotonic() - snapshot.built_at
+            >= settings.CLUSTER_MIN_REBUILD_SECONDS
+        ):
+            self._rebuild_in_background(session.get_bind())
+        return snapshot.index.clusters(*bbox, zoom)
+
+
+issue_cluster_index = IssueClusterIndex()
@@ -0,0 +1,511 @@
+"""Incrementally maintained issue rollup (org x category x status x day).
+
+Every flush that creates, moves or deletes issues applies the matching count
+deltas to the per-(org, status) ``issuestatuscounter`` in the same
+transaction, so the counters commit or roll back together with the change
+they describe. With ANALYTICS_USE_ROLLUPS on, those flushes and the ones that
+write an issue status audit entry also maintain ``issuedailyrollup``; while it
+is off the rollup is left alone and must be rebuilt before it is enabled. Report creation, workflow and assignment transitions, worker
+deactivation and manual issues are all covered without each call site having
+to remember a hook.
+
+``rebuild`` regenerates both tables from ``issue`` and ``auditlog``; status
+transitions are attributed to the issue's current org and category. Resolved
+and closed issues are also counted by their resolution day, which is what
+the public "resolved" trend reports, so an issue resolved and then closed
+counts once, on the day it was resolved.
+``reconcile_status_counters`` compares the counters with real counts and
+repairs drift left by writes that bypassed the ORM.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, delete, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, col, func, select
+
+from app.core.config import settings
+from app.core.time import municipal_date, municipal_day
+from app.db.change_tracking import mark_changed
+from app.models.domain import AuditLog, Issue, IssueDailyRollup, IssueStatusCounter
+
+logger = logging.getLogger(__name__)
+
+NO_ORG = UUID(int=0)
+
+# Audit actions that move an issue into a status, and the status they imply.
+TRANSITION_ACTIONS = {
+    "ASSIGNMENT": "ASSIGNED",
+    "REASSIGNMENT": "ASSIGNED",
+    "UNASSIGNMENT": "REPORTED",
+    "AUTO_UNASSIGN": "REPORTED",
+}
+
+# Statuses counted by the "resolved" trend, on the day of ``resolved_at``, or
+# of ``updated_at`` for issues closed without a resolution.
+RESOLVED_STATES = ("RESOLVED", "CLOSED")
+
+RollupKey = Tuple[UUID, UUID, str, date]
+CounterKey = Tuple[UUID, str]
+
+# pg_advisory_xact_lock key serialising reconcile_status_counters.
+RECONCILE_LOCK_ID = 0x4D415247_0001
+
+
+def _key(
+    org_id: Optional[UUID], category_id: UUID, status: str, day: date
+) -> RollupKey:
+    return (org_id or NO_ORG, category_id, status, day)
+
+
+def _transition_status(entry: AuditLog) -> Optional[str]:
+    if entry.entity_type != "ISSUE":
+        return None
+    if entry.action == "STATUS_CHANGE":
+        return entry.new_value
+    return TRANSITION_ACTIONS.get(entry.action)
+
+
+def resolution_time(status, resolved_at, updated_at):
+    """When an issue counts as resolved, or None while it is open."""
+    if status not in RESOLVED_STATES:
+        return None
+    return resolved_at if resolved_at is not None else updated_at
+
+
+def _status_deltas(issue_deltas: Dict[RollupKey, int]) -> Dict[CounterKey, int]:
+    deltas: Counter = Counter()
+    for (org_id, _, status, _), delta in issue_deltas.items():
+        deltas[(org_id, status)] += delta
+    return deltas
+
+
+def _previous(obj: Issue, attr: str):
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+
+class IssueMetricsService:
+    @staticmethod
+    def apply(
+        session: Session,
+        issue_deltas: Dict[RollupKey, int],
+        transition_deltas: Dict[RollupKey, int],
+        resolved_deltas: Dict[RollupKey, int],
+    ) -> None:
+        keys = {
+            k
+            for deltas in (issue_deltas, transition_deltas, resolved_deltas)
+            for k, v in deltas.items()
+            if v
+        }
+        if not keys:
+            return
+        # Sorted so concurrent transactions lock rollup rows in one order.
+        rows = [
+            {
+                "org_id": key[0],
+                "category_id": key[1],
+                "status": key[2],
+                "day": key[3],
+                "issue_count": issue_deltas.get(key, 0),
+                "transition_count": transition_deltas.get(key, 0),
+                "resolved_count": resolved_deltas.get(key, 0),
+            }
+            for key in sorted(keys, key=str)
+        ]
+        table = IssueDailyRollup.__table__
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                table.c.org_id,
+                table.c.category_id,
+                table.c.status,
+                table.c.day,
+            ],
+            set_={
+                "issue_count": table.c.issue_count + statement.excluded.issue_count,
+                "transition_count": table.c.transition_count
+                + statement.excluded.transition_count,
+                "resolved_count": table.c.resolved_count
+                + statement.excluded.resolved_count,
+            },
+        )
+        session.connection().execute(statement)
+        mark_changed(session, IssueDailyRollup.__tablename__)
+        IssueMetricsService.apply_status_deltas(session, _status_deltas(issue_deltas))
+
+    @staticmethod
+    def apply_status_deltas(session: Session, deltas: Dict[CounterKey, int]) -> None:
+        keys = sorted((k for k, v in deltas.items() if v), key=str)
+        if not keys:
+            return
+        table = IssueStatusCounter.__table__
+        statement = insert(table).values(
+            [
+                {"org_id": org_id, "status": status, "issue_count": deltas[(org_id, status)]}
+                for org_id, status in keys
+            ]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.org_id, table.c.status],
+            set_={"issue_count": table.c.issue_count + statement.excluded.issue_count},
+        )
+        session.connection().execute(statement)
+        mark_changed(session, IssueStatusCounter.__tablename__)
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """Regenerate the rollup and status counters from issue and auditlog.
+
+        Returns the rollup row count.
+        """
+        issue_key = (
+            col(Issue.org_id),
+            col(Issue.category_id),
+            col(Issue.status),
+            municipal_day(col(Issue.created_at)),
+        )
+        issue_rows = session.exec(
+            select(*issue_key, func.count()).group_by(*issue_key)
+        ).all()
+
+        entered_status = case(
+            (col(AuditLog.action) == "STATUS_CHANGE", col(AuditLog.new_value)),
+            *[
+                (col(AuditLog.action) == action, status)
+                for action, status in TRANSITION_ACTIONS.items()
+            ],
+        )
+        transition_key = (
+            col(Issue.org_id),
+            col(Issue.category_id),
+            entered_status,
+            municipal_day(col(AuditLog.created_at)),
+        )
+        transition_rows = session.exec(
+            select(*transition_key, func.count())
+            .select_from(AuditLog)
+            .join(Issue, col(Issue.id) == col(AuditLog.entity_id))
+            .where(
+                col(AuditLog.entity_type) == "ISSUE",
+                col(AuditLog.action).in_(["STATUS_CHANGE", *TRANSITION_ACTIONS]),
+            )
+            .group_by(*transition_key)
+        ).all()
+
+        resolved_key = (
+            col(Issue.org_id),
+            col(Issue.category_id),
+            col(Issue.status),
+            municipal_day(func.coalesce(col(Issue.resolved_at), col(Issue.updated_at))),
+        )
+        resolved_rows = session.exec(
+            select(*resolved_key, func.count())
+            .where(col(Issue.status).in_(RESOLVED_STATES))
+            .group_by(*resolved_key)
+        ).all()
+
+        issue_counts: Counter = Counter()
+        for org_id, category_id, status, day, count in issue_rows:
+            issue_counts[_key(org_id, category_id, status, day)] += count
+        transition_counts: Counter = Counter()
+        for org_id, category_id, status, day, count in transition_rows:
+            transition_counts[_key(org_id, category_id, status, day)] += count
+        resolved_counts: Counter = Counter()
+        for org_id, category_id, status, day, count in resolved_rows:
+            resolved_counts[_key(org_id, category_id, status, day)] += count
+
+        session.exec(delete(IssueDailyRollup))
+        session.exec(delete(IssueStatusCounter))
+        IssueMetricsService.apply(
+            session, issue_counts, transition_counts, resolved_counts
+        )
+        session.commit()
+        rows = len(set(issue_counts) | set(transition_counts) | set(resolved_counts))
+        logger.info("Issue rollup rebuilt with %s rows", rows)
+        return rows
+
+    @staticmethod
+    def reconcile_status_counters(session: Session) -> int:
+        """Repair status counters that differ from the issue table.
+
+        Returns the number of (org, status) counters that were corrected.
+        """
+        # One reconcile at a time across processes (every API worker runs
+        # one). Locking the counter rows makes writers wait to increment them
+        # until this transaction commits, so the counts read afterwards are
+        # exact and the counters can be set to them outright.
+        connection = session.connection()
+        connection.execute(select(func.pg_advisory_xact_lock(RECONCILE_LOCK_ID)))
+        stored = {
+            (org_id, status): issue_count
+            for org_id, status, issue_count in connection.execute(
+                select(
+                    col(IssueStatusCounter.org_id),
+                    col(IssueStatusCounter.status),
+                    col(IssueStatusCounter.issue_count),
+                ).with_for_update()
+            )
+        }
+        actual: Counter = Counter()
+        for org_id, status, count in connection.execute(
+            select(col(Issue.org_id), col(Issue.status), func.count()).group_by(
+                col(Issue.org_id), col(Issue.status)
+            )
+        ):
+            actual[(org_id or NO_ORG, status)] += count
+
+        drift = {
+            key: actual.get(key, 0) - stored.get(key, 0)
+            for key in set(actual) | set(stored)
+            if actual.get(key, 0) != stored.get(key, 0)
+        }
+        if drift:
+            table = IssueStatusCounter.__table__
+            statement = insert(table).values(
+                [
+                    {"org_id": org_id, "status": status, "issue_count": actual[(org_id, status)]}
+                    for org_id, status in sorted(drift, key=str)
+                ]
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.org_id, table.c.status],
+                set_={"issue_count": statement.excluded.issue_count},
+            )
+            connection.execute(statement)
+            mark_changed(session, IssueStatusCounter.__tablename__)
+        session.commit()
+        if drift:
+            logger.warning(
+                "Repaired %s drifted issue status counters: %s",
+                len(drift),
+                {f"{org_id}/{status}": delta for (org_id, status), delta in drift.items()},
+            )
+        return len(drift)
+
+    @staticmethod
+    def status_counts(
+        session: Session, org_id: Optional[UUID] = None
+    ) -> Dict[str, int]:
+        """Issues per status, read from the status counters.
+
+        Falls back to counting issues while the counters are empty, e.g. on a
+        database that predates them until the startup reconcile has run.
+        """
+        statement = select(
+            col(IssueStatusCounter.status), func.sum(col(IssueStatusCounter.issue_count))
+        ).group_by(col(IssueStatusCounter.status))
+        if org_id is not None:
+            statement = statement.where(col(IssueStatusCounter.org_id) == org_id)
+        counts = {status: int(total) for status, total in session.exec(statement).all()}
+        if counts:
+            return counts
+
+        statement = select(col(Issue.status), func.count()).group_by(col(Issue.status))
+        if org_id is not None:
+            statement = statement.where(col(Issue.org_id) == org_id)
+        return {status: count for status, count in session.exec(statement).all()}
+
+    @staticmethod
+    def category_counts(session: Session) -> Dict[UUID, int]:
+        statement = select(
+            col(IssueDailyRollup.category_id), func.sum(col(IssueDailyRollup.issue_count))
+        ).group_by(col(IssueDailyRollup.category_id))
+        return {
+            category_id: int(total)
+            for category_id, total in session.exec(statement).all()
+        }
+
+    @staticmethod
+    def daily_counts(
+        session: Session, days: List[date], resolved_statuses: Iterable[str]
+    ) -> Dict[date, Tuple[int, int]]:
+        """Per day: (issues created, issues now in ``resolved_statuses`` that
+        were resolved that day)."""
+        statuses = list(resolved_statuses)
+        statement = (
+            select(
+                col(IssueDailyRollup.day),
+                func.sum(col(IssueDailyRollup.issue_count)),
+                func.coalesce(
+                    func.sum(col(IssueDailyRollup.resolved_count)).filter(
+                        col(IssueDailyRollup.status).in_(statuses)
+                    ),
+                    0,
+                ),
+            )
+            .where(
+                col(IssueDailyRollup.day) >= min(days),
+                col(IssueDailyRollup.day) < max(days) + timedelta(days=1),
+            )
+            .group_by(col(IssueDailyRollup.day))
+        )
+        return {
+            day: (int(created), int(resolved))
+            for day, created, resolved in session.exec(statement).all()
+        }
+
+
+class StatusCounterReconciler:
+    """Runs ``reconcile_status_counters`` at startup, then every ``interval``
+    seconds (never again when ``interval`` is 0)."""
+
+    def __init__(self) -> None:
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, engine: Engine, interval: float) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            # The first pass seeds the counters on databases that predate them.
+            while not self._stop.is_set():
+                try:
+                    with Session(engine) as session:
+                        IssueMetricsService.reconcile_status_counters(session)
+                except Exception:
+                    logger.exception("Issue status counter reconciliation failed")
+                if interval <= 0 or self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(
+            target=run, name="status-counter-reconciler", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+status_counter_reconciler = StatusCounterReconciler()
+
+
+def _loaded_owners(session: OrmSession) -> Dict[UUID, Tuple[UUID, UUID]]:
+    """(org_id, category_id) of issues already loaded in ``session``.
+
+    Reads instance state directly so expired issues are skipped rather than
+    refreshed with one SELECT each.
+    """
+    owners = {}
+    for obj in chain(session.new, session.identity_map.values()):
+        if not isinstance(obj, Issue):
+            continue
+        state = inspect(obj)
+        loaded = state.dict
+        issue_id = state.identity[0] if state.identity else loaded.get("id")
+        if issue_id is not None and "org_id" in loaded and "category_id" in loaded:
+            owners[issue_id] = (loaded["org_id"], loaded["category_id"])
+    return owners
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _maintain_issue_rollup(session: OrmSession, flush_context) -> None:
+    rollups = settings.ANALYTICS_USE_ROLLUPS
+    tracked = (Issue, AuditLog) if rollups else Issue
+    changed = chain(session.new, session.dirty, session.deleted)
+    if not any(isinstance(obj, tracked) for obj in changed):
+        return
+
+    issue_deltas: Counter = Counter()
+    transition_deltas: Counter = Counter()
+    resolved_deltas: Counter = Counter()
+
+    def count_resolved(org_id, category_id, status, resolved_at, updated_at, delta) -> None:
+        when = resolution_time(status, resolved_at, updated_at)
+        if when is not None:
+            resolved_deltas[_key(org_id, category_id, status, municipal_date(when))] += delta
+
+    transitions = []
+    for obj in session.new:
+        if isinstance(obj, Issue):
+            issue_deltas[
+                _key(obj.org_id, obj.category_id, obj.status, municipal_date(obj.created_at))
+            ] += 1
+            count_resolved(
+                obj.org_id, obj.category_id, obj.status, obj.resolved_at, obj.updated_at, 1
+            )
+        elif rollups and isinstance(obj, AuditLog):
+            status = _transition_status(obj)
+            if status is not None:
+                transitions.append((obj, status))
+
+    if transitions:
+        owners = _loaded_owners(session)
+        missing = {entry.entity_id for entry, _ in transitions} - owners.keys()
+        if missing:
+            # Plain Core read: ORM loads are not allowed mid-flush.
+            owners.update(
+                (issue_id, (org_id, category_id))
+                for issue_id, org_id, category_id in session.connection().execute(
+                    select(
+                        col(Issue.id), col(Issue.org_id), col(Issue.category_id)
+                    ).where(col(Issue.id).in_(missing))
+                )
+            )
+        for entry, status in transitions:
+            owner = owners.get(entry.entity_id)
+            if owner is not None:
+                transition_deltas[
+                    _key(owner[0], owner[1], status, municipal_date(entry.created_at))
+                ] += 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Issue):
+            continue
+        state = inspect(obj)
+        if not any(
+            state.attrs[attr].history.has_changes()
+            for attr in ("status", "org_id", "category_id", "resolved_at", "updated_at")
+        ):
+            continue
+        day = municipal_date(obj.created_at)
+        previous = (
+            _previous(obj, "org_id"),
+            _previous(obj, "category_id"),
+            _previous(obj, "status"),
+        )
+        issue_deltas[_key(*previous, day)] -= 1
+        issue_deltas[_key(obj.org_id, obj.category_id, obj.status, day)] += 1
+        count_resolved(
+            *previous, _previous(obj, "resolved_at"), _previous(obj, "updated_at"), -1
+        )
+        count_resolved(
+            obj.org_id, obj.category_id, obj.status, obj.resolved_at, obj.updated_at, 1
+        )
+
+    for obj in session.deleted:
+        if isinstance(obj, Issue):
+            previous = (
+                _previous(obj, "org_id"),
+                _previous(obj, "category_id"),
+                _previous(obj, "status"),
+            )
+            issue_deltas[_key(*previous, municipal_date(obj.created_at))] -= 1
+            count_resolved(
+                *previous, _previous(obj, "resolved_at"), _previous(obj, "updated_at"), -1
+            )
+
+    if not rollups:
+        IssueMetricsService.apply_status_deltas(session, _status_deltas(issue_deltas))
+    elif issue_deltas or transition_deltas or resolved_deltas:
+        IssueMetricsService.apply(
+            session, issue_deltas, transition_deltas, resolved_deltas
+        )
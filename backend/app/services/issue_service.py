@@ -2,16 +2,28 @@
 
 from __future__ import annotations
 
-import io
-from typing import Optional
+from typing import BinaryIO, List, Optional, Tuple
 from uuid import UUID, uuid4
 
+from geoalchemy2 import Geography
+from sqlalchemy import Float, Integer, cast, column, true, values
 from sqlmodel import Session, select, func
+from sqlmodel.sql.expression import Select
 
 from app.core.config import settings
-from app.models.domain import Evidence, Issue
+from app.models.domain import (
+    Evidence,
+    Issue,
+    Organization,
+    Zone,
+    issue_location_geography,
+)
 from app.services.exif import ExifService
-from app.services.minio_client import minio_client
+from app.services.jurisdiction_index import jurisdiction_index, parse_point_wkt
+from app.services.media_derivatives import MediaDerivativeService
+from app.services.photo_storage import PhotoStorage, StoredPhoto
+
+DUPLICATE_RADIUS_M = 5.0
 
 
 class IssueService:
@@ -22,31 +34,92 @@ class IssueService:
         return f"SRID=4326;POINT({lng} {lat})"
 
     @staticmethod
-    def find_duplicate_issue(session: Session, point_wkt: str) -> Optional[Issue]:
-        statement = select(Issue).where(
-            Issue.status != "CLOSED",
-            func.ST_DWithin(
-                Issue.location, func.ST_GeomFromText(point_wkt), 5.0 / 111320.0
-            ),
+    def duplicate_issue_statement(point_wkt: str) -> Select:
+        """Nearest open issue within DUPLICATE_RADIUS_M metres of the point.
+
+        Served by the partial geography GiST index ix_issue_open_location_geog.
+        """
+        point = cast(
+            func.ST_GeomFromText(point_wkt),
+            Geography(geometry_type="POINT", srid=4326),
+        )
+        return (
+            select(Issue)
+            .where(
+                Issue.status != "CLOSED",
+                func.ST_DWithin(issue_location_geography, point, DUPLICATE_RADIUS_M),
+            )
+            .order_by(issue_location_geography.op("<->")(point))
+            .limit(1)
         )
-        return session.exec(statement).first()
 
     @staticmethod
-    def extract_exif(photo_content: bytes) -> dict:
-        return ExifService.extract_metadata(photo_content)
+    def find_duplicate_issue(session: Session, point_wkt: str) -> Optional[Issue]:
+        statement = IssueService.duplicate_issue_statement(point_wkt)
+        return session.exec(statement).first()
 
     @staticmethod
-    def store_issue_photo(photo_content: bytes, prefix: str = "issues") -> str:
-        file_id = str(uuid4())
-        file_path = f"{prefix}/{file_id}.jpg"
-        minio_client.put_object(
-            settings.MINIO_BUCKET,
-            file_path,
-            io.BytesIO(photo_content),
-            len(photo_content),
-            content_type="image/jpeg",
+    def find_duplicate_issue_ids(
+        session: Session, points: List[Tuple[float, float]]
+    ) -> List[Optional[UUID]]:
+        """Nearest open duplicate for each (lat, lng) in one round trip.
+
+        The points are sent as a VALUES list and joined LATERAL to the same
+        index-backed nearest-neighbour probe as ``duplicate_issue_statement``.
+        """
+        if not points:
+            return []
+        probe = values(
+            column("idx", Integer),
+            column("lat", Float),
+            column("lng", Float),
+            name="probe",
+        ).data([(idx, lat, lng) for idx, (lat, lng) in enumerate(points)])
+        point = cast(
+            func.ST_SetSRID(func.ST_MakePoint(probe.c.lng, probe.c.lat), 4326),
+            Geography(geometry_type="POINT", srid=4326),
+        )
+        nearest = (
+            select(Issue.id)
+            .where(
+                Issue.status != "CLOSED",
+                func.ST_DWithin(issue_location_geography, point, DUPLICATE_RADIUS_M),
+            )
+            .order_by(issue_location_geography.op("<->")(point))
+            .limit(1)
+            .lateral("nearest")
         )
-        return file_path
+        rows = session.exec(
+            select(probe.c.idx, nearest.c.id).select_from(probe).join(nearest, true())
+        ).all()
+        matches: List[Optional[UUID]] = [None] * len(points)
+        for idx, issue_id in rows:
+            matches[idx] = issue_id
+        return matches
+
+    @staticmethod
+    def extract_exif(photo: BinaryIO) -> dict:
+        return ExifService.extract_metadata(PhotoStorage.read_exif_prefix(photo), photo)
+
+    @staticmethod
+    def new_photo_path(prefix: str = "issues") -> str:
+        return f"{prefix}/{uuid4()}.jpg"
+
+    @staticmethod
+    def store_issue_photo(
+        photo: BinaryIO,
+        prefix: str = "issues",
+        file_path: Optional[str] = None,
+    ) -> StoredPhoto:
+        """Store a photo; ``file_path`` is ignored in content-addressed mode."""
+        if settings.PHOTO_STORAGE_MODE == "content":
+            stored = PhotoStorage.store_content_addressed(photo)
+        else:
+            file_path = file_path or IssueService.new_photo_path(prefix)
+            stored = PhotoStorage.store_stream(photo, file_path)
+        if not stored.reused:
+            MediaDerivativeService.schedule(stored.file_path)
+        return stored
 
     @staticmethod
     def build_evidence(
@@ -55,26 +128,51 @@ class IssueService:
         file_path: str,
         exif_data: dict,
         evidence_type: str = "REPORT",
+        content_sha256: Optional[str] = None,
     ) -> Evidence:
         return Evidence(
             issue_id=issue_id,
             type=evidence_type,
             file_path=file_path,
+            content_sha256=content_sha256,
             reporter_id=reporter_id,
             exif_timestamp=exif_data.get("timestamp"),
             exif_lat=exif_data.get("lat"),
             exif_lng=exif_data.get("lng"),
         )
 
+    @staticmethod
+    def build_pending_evidence(
+        issue_id: UUID,
+        reporter_id: UUID,
+        evidence_type: str = "REPORT",
+        prefix: str = "issues",
+    ) -> Evidence:
+        """Evidence placeholder whose photo is stored later by the ingest pipeline."""
+        return Evidence(
+            issue_id=issue_id,
+            type=evidence_type,
+            file_path=IssueService.new_photo_path(prefix),
+            reporter_id=reporter_id,
+            upload_status="PENDING",
+        )
+
     @staticmethod
     def find_org_for_location(session: Session, point_wkt: str) -> Optional[UUID]:
-        """Find the organization whose zone contains the given location."""
-        from app.models.domain import Organization, Zone
+        """Find the organization whose zone contains the given location.
+
+        Served from the in-process jurisdiction index; PostGIS is only queried
+        when the index has no covering zone or the session has unsaved zone edits.
+        """
+        org_id = jurisdiction_index.lookup(session, parse_point_wkt(point_wkt))
+        if org_id is not None:
+            return org_id
 
         statement = (
             select(Organization)
             .join(Zone)
             .where(func.ST_Covers(Zone.boundary, func.ST_GeomFromText(point_wkt)))
+            .order_by(func.ST_Area(Zone.boundary), Organization.id)
         )
         org = session.exec(statement).first()
         return org.id if org else None
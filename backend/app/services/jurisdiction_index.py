@@ -0,0 +1,106 @@
+"""In-process spatial index of authority jurisdictions.
+
+Zones change only when a system administrator edits an authority, so the
+polygons are kept in a shapely STRtree and point-in-zone routing for new
+reports is answered without a database round trip. The index is rebuilt
+lazily when the zone/organization data version moves on, and after
+JURISDICTION_INDEX_TTL_SECONDS to pick up edits made by other processes.
+
+Overlapping zones resolve to the smallest zone, then the lowest org id,
+both here and in the PostGIS fallback.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import List, NamedTuple, Optional
+from uuid import UUID
+
+from geoalchemy2.shape import to_shape
+from shapely import wkt as shapely_wkt
+from shapely.geometry import Point
+from shapely.strtree import STRtree
+from sqlmodel import Session, func, select
+
+from app.core.config import settings
+from app.db.change_tracking import data_version, pending_changes
+from app.models.domain import Organization, Zone
+
+logger = logging.getLogger(__name__)
+
+_TABLES = ("zone", "organization")
+
+
+class _Snapshot(NamedTuple):
+    tree: STRtree
+    org_ids: List[UUID]
+    version: int
+    built_at: float
+
+
+class JurisdictionIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+
+    def rebuild(self, session: Session) -> _Snapshot:
+        version = data_version(*_TABLES)
+        rows = session.exec(
+            select(Organization.id, Zone.boundary)
+            .join(Zone)
+            .where(Zone.boundary.is_not(None))
+            .order_by(func.ST_Area(Zone.boundary), Organization.id)
+        ).all()
+        polygons = [to_shape(boundary) for _, boundary in rows]
+        snapshot = _Snapshot(
+            tree=STRtree(polygons),
+            org_ids=[org_id for org_id, _ in rows],
+            version=version,
+            built_at=time.monotonic(),
+        )
+        with self._lock:
+            self._snapshot = snapshot
+        logger.info("Jurisdiction index built with %s zones", len(rows))
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def _is_current(self, snapshot: Optional[_Snapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == data_version(*_TABLES)
+            and time.monotonic() - snapshot.built_at
+            < settings.JURISDICTION_INDEX_TTL_SECONDS
+        )
+
+    def lookup(self, session: Session, point: Point) -> Optional[UUID]:
+        """Org covering ``point`` per the index, or None on a miss.
+
+        Sessions holding uncommitted zone edits bypass the index so they
+        always see their own writes.
+        """
+        if pending_changes(session) & set(_TABLES):
+            return None
+
+        snapshot = self._snapshot
+        if snapshot is None or not self._is_current(snapshot):
+            # Use the snapshot just built, even if another thread has
+            # cleared or replaced the shared one since.
+            snapshot = self.rebuild(session)
+
+        hits = snapshot.tree.query(point, predicate="covered_by")
+        if len(hits) == 0:
+            return None
+        # Tree items were inserted in winner order, so the lowest index wins.
+        return snapshot.org_ids[int(min(hits))]
+
+
+def parse_point_wkt(point_wkt: str) -> Point:
+    return shapely_wkt.loads(point_wkt.split(";", 1)[-1])
+
+
+jurisdiction_index = JurisdictionIndex()
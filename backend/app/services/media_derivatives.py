@@ -0,0 +1,181 @@
+"""Downscaled renditions of evidence photos for dashboards and the worker app.
+
+Each original gets ``thumb`` and ``medium`` renditions in JPEG and WebP,
+stored next to it in MinIO (``issues/<id>.jpg`` -> ``issues/<id>.thumb.webp``).
+Decoding and resizing is CPU bound, so it runs on a process pool; all four
+renditions come from one decode of the original. Renditions are produced on
+first request (``MEDIA_DERIVATIVE_MODE=lazy``) or scheduled right after the
+upload (``eager``). Renders of one original are single-flight within the
+process: concurrent requests for a missing rendition wait for the first one
+instead of decoding the same photo again.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.services.minio_client import minio_client
+from app.services.photo_storage import PhotoStorage
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_SIZES = ("thumb", "medium")
+FORMATS = {"jpeg": ("jpg", "image/jpeg"), "webp": ("webp", "image/webp")}
+
+
+def _max_px(size: str) -> int:
+    return settings.MEDIA_THUMB_MAX_PX if size == "thumb" else settings.MEDIA_MEDIUM_MAX_PX
+
+
+def render_derivatives(
+    original: bytes, sizes: Dict[str, int]
+) -> Dict[Tuple[str, str], bytes]:
+    """Render every (size, format) pair from one decode. Runs in a worker process."""
+    image = Image.open(io.BytesIO(original))
+    # JPEG draft mode decodes at a reduced scale, much cheaper than a full decode.
+    image.draft("RGB", (max(sizes.values()),) * 2)
+    image = ImageOps.exif_transpose(image).convert("RGB")
+
+    rendered: Dict[Tuple[str, str], bytes] = {}
+    for size, max_px in sorted(sizes.items(), key=lambda item: -item[1]):
+        image.thumbnail((max_px, max_px), Image.Resampling.LANCZOS)
+        for fmt in FORMATS:
+            buf = io.BytesIO()
+            image.save(buf, format=fmt.upper(), quality=80)
+            rendered[(size, fmt)] = buf.getvalue()
+    return rendered
+
+
+class _Pools:
+    """Lazily created pools, so importing the module never forks."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.render: Optional[ProcessPoolExecutor] = None
+        self.background: Optional[ThreadPoolExecutor] = None
+
+    def render_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self.render is None:
+                self.render = ProcessPoolExecutor(
+                    max_workers=settings.MEDIA_DERIVATIVE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self.render
+
+    def background_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self.background is None:
+                self.background = ThreadPoolExecutor(
+                    max_workers=settings.MEDIA_DERIVATIVE_WORKERS,
+                    thread_name_prefix="derivatives",
+                )
+            return self.background
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools = (self.background, self.render)
+            self.render = self.background = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
+
+
+_pools = _Pools()
+
+
+class _KeyedLocks:
+    """One lock per key, dropped once no thread holds or waits for it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._locks: Dict[str, Tuple[threading.Lock, int]] = {}
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        with self._lock:
+            lock, users = self._locks.get(key, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            self._locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, users = self._locks[key]
+                if users == 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, users - 1)
+
+
+_rendering = _KeyedLocks()
+
+
+class MediaDerivativeService:
+    @staticmethod
+    def derivative_path(file_path: str, size: str, fmt: str) -> str:
+        stem = file_path.rsplit(".", 1)[0]
+        return f"{stem}.{size}.{FORMATS[fmt][0]}"
+
+    @staticmethod
+    def generate(file_path: str) -> None:
+        """Render and store every derivative of the original at ``file_path``."""
+        response = minio_client.get_object(settings.MINIO_BUCKET, file_path)
+        try:
+            original = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+        sizes = {size: _max_px(size) for size in DERIVATIVE_SIZES}
+        rendered = _pools.render_pool().submit(render_derivatives, original, sizes).result()
+        for (size, fmt), content in rendered.items():
+            minio_client.put_object(
+                settings.MINIO_BUCKET,
+                MediaDerivativeService.derivative_path(file_path, size, fmt),
+                io.BytesIO(content),
+                length=len(content),
+                content_type=FORMATS[fmt][1],
+            )
+
+    @staticmethod
+    def ensure(file_path: str, size: str, fmt: str) -> str:
+        """Object key of the requested derivative, rendering it if missing."""
+        path = MediaDerivativeService.derivative_path(file_path, size, fmt)
+        if PhotoStorage.object_exists(path):
+            return path
+        with _rendering.hold(file_path):
+            # Another request may have rendered it while this one waited.
+            if not PhotoStorage.object_exists(path):
+                MediaDerivativeService.generate(file_path)
+        return path
+
+    @staticmethod
+    def schedule(file_path: str) -> None:
+        """Render derivatives in the background right after an upload."""
+        if settings.MEDIA_DERIVATIVE_MODE != "eager":
+            return
+
+        def run() -> None:
+            try:
+                with _rendering.hold(file_path):
+                    MediaDerivativeService.generate(file_path)
+            except Exception:
+                logger.exception("Derivative generation failed for %s", file_path)
+
+        _pools.background_pool().submit(run)
+
+    @staticmethod
+    def shutdown(wait: bool = True) -> None:
+        _pools.shutdown(wait=wait)
@@ -14,6 +14,18 @@ minio_client = Minio(
     secure=settings.MINIO_SECURE,
 )
 
+# Only used to sign URLs handed to clients; never opens a connection since
+# the region is fixed.
+public_minio_client = Minio(
+    settings.MINIO_PUBLIC_ENDPOINT or settings.MINIO_ENDPOINT,
+    access_key=settings.MINIO_ACCESS_KEY,
+    secret_key=settings.MINIO_SECRET_KEY,
+    secure=settings.MINIO_SECURE
+    if settings.MINIO_PUBLIC_SECURE is None
+    else settings.MINIO_PUBLIC_SECURE,
+    region=settings.MINIO_REGION,
+)
+
 
 def init_minio():
     if not minio_client.bucket_exists(settings.MINIO_BUCKET):
@@ -0,0 +1,210 @@
+"""Streaming, size-capped photo uploads into object storage.
+
+Photos are never materialised as one bytes object: MinIO pulls fixed-size
+parts from the upload spool while size and SHA-256 are computed on the fly,
+and EXIF parsing only sees a bounded prefix of the file.
+
+In content-addressed mode objects are keyed by the SHA-256 of their bytes.
+The PUT is skipped when the key is already in the local digest index or
+MinIO reports the object exists, so several evidence rows share one object.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.services.minio_client import minio_client
+
+_COPY_CHUNK_BYTES = 64 * 1024
+
+
+class PhotoTooLarge(Exception):
+    """Raised when an upload stream exceeds MAX_PHOTO_UPLOAD_BYTES."""
+
+
+@dataclass
+class StoredPhoto:
+    file_path: str
+    size: int
+    sha256: str
+    reused: bool = False
+
+
+class _HashingReader:
+    """File-like wrapper that counts, hashes and caps bytes as they are read."""
+
+    def __init__(self, source: BinaryIO, max_bytes: int):
+        self._source = source
+        self._max_bytes = max_bytes
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._source.read(size)
+        self.size += len(chunk)
+        if self.size > self._max_bytes:
+            raise PhotoTooLarge()
+        self._digest.update(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+class _DigestIndex:
+    """Bounded LRU of object keys known to exist in the bucket."""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._keys: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._keys:
+                return False
+            self._keys.move_to_end(key)
+            return True
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+            while len(self._keys) > self._max_entries:
+                self._keys.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+
+digest_index = _DigestIndex(settings.CONTENT_DIGEST_INDEX_SIZE)
+
+
+def _too_large() -> HTTPException:
+    limit_mb = settings.MAX_PHOTO_UPLOAD_BYTES / (1024 * 1024)
+    return HTTPException(
+        status_code=413,
+        detail=f"Photo exceeds the maximum upload size of {limit_mb:g} MB",
+    )
+
+
+class PhotoStorage:
+    """Helpers for moving upload spools into MinIO without buffering them."""
+
+    @staticmethod
+    def ensure_within_limit(photo: UploadFile) -> None:
+        """Reject oversized uploads before any storage or database work."""
+        if photo.size is not None and photo.size > settings.MAX_PHOTO_UPLOAD_BYTES:
+            raise _too_large()
+
+    @staticmethod
+    def read_exif_prefix(source: BinaryIO) -> bytes:
+        """Read the leading bytes that hold JPEG metadata, then rewind."""
+        source.seek(0)
+        prefix = source.read(settings.EXIF_SCAN_BYTES)
+        source.seek(0)
+        return prefix
+
+    @staticmethod
+    def store_stream(
+        source: BinaryIO,
+        file_path: str,
+        content_type: str = "image/jpeg",
+    ) -> StoredPhoto:
+        """Stream a file object into MinIO as a multipart upload."""
+        source.seek(0)
+        reader = _HashingReader(source, settings.MAX_PHOTO_UPLOAD_BYTES)
+        try:
+            minio_client.put_object(
+                settings.MINIO_BUCKET,
+                file_path,
+                reader,
+                length=-1,
+                part_size=settings.PHOTO_UPLOAD_PART_SIZE,
+                content_type=content_type,
+            )
+        except PhotoTooLarge:
+            raise _too_large()
+        return StoredPhoto(
+            file_path=file_path, size=reader.size, sha256=reader.hexdigest()
+        )
+
+    @staticmethod
+    def content_key(sha256: str) -> str:
+        return f"objects/{sha256[:2]}/{sha256}.jpg"
+
+    @staticmethod
+    def hash_stream(source: BinaryIO) -> Tuple[int, str]:
+        """Size and SHA-256 of a seekable upload, enforcing the size cap."""
+        source.seek(0)
+        reader = _HashingReader(source, settings.MAX_PHOTO_UPLOAD_BYTES)
+        try:
+            while reader.read(_COPY_CHUNK_BYTES):
+                pass
+        except PhotoTooLarge:
+            raise _too_large()
+        source.seek(0)
+        return reader.size, reader.hexdigest()
+
+    @staticmethod
+    def object_exists(file_path: str) -> bool:
+        try:
+            minio_client.stat_object(settings.MINIO_BUCKET, file_path)
+        except S3Error as exc:
+            if exc.code in ("NoSuchKey", "NoSuchObject", "ResourceNotFound"):
+                return False
+            raise
+        return True
+
+    @staticmethod
+    def store_content_addressed(
+        source: BinaryIO, content_type: str = "image/jpeg"
+    ) -> StoredPhoto:
+        """Store under the SHA-256 key, skipping the PUT for known content."""
+        size, sha256 = PhotoStorage.hash_stream(source)
+        file_path = PhotoStorage.content_key(sha256)
+        if file_path in digest_index or PhotoStorage.object_exists(file_path):
+            digest_index.add(file_path)
+            return StoredPhoto(file_path=file_path, size=size, sha256=sha256, reused=True)
+
+        stored = PhotoStorage.store_stream(source, file_path, content_type)
+        digest_index.add(file_path)
+        return stored
+
+    @staticmethod
+    def spool_to_disk(source: BinaryIO) -> str:
+        """Copy an upload into a temp file that outlives the request.
+
+        Used by staged ingestion, where the request's own spool is closed
+        before the background upload runs. The caller owns the returned path.
+        """
+        source.seek(0)
+        reader = _HashingReader(source, settings.MAX_PHOTO_UPLOAD_BYTES)
+        fd, path = tempfile.mkstemp(prefix="marg-upload-", suffix=".jpg")
+        try:
+            with os.fdopen(fd, "wb") as spool:
+                shutil.copyfileobj(reader, spool, _COPY_CHUNK_BYTES)
+        except PhotoTooLarge:
+            os.unlink(path)
+            raise _too_large()
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path
+
+    @staticmethod
+    def discard_spool(path: Optional[str]) -> None:
+        if path and os.path.exists(path):
+            os.unlink(path)
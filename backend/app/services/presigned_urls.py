@@ -0,0 +1,64 @@
+"""Cached presigned GET URLs for evidence objects.
+
+Signing is cheap but not free, and handing out a fresh URL on every request
+defeats browser caching of the redirect target. URLs are therefore reused
+per object key until MEDIA_PRESIGN_REFRESH_MARGIN_SECONDS before expiry.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from app.core.config import settings
+from app.services.minio_client import public_minio_client
+
+
+class PresignedUrl(NamedTuple):
+    url: str
+    expires_at: float
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        return self.expires_at - (time.monotonic() if now is None else now)
+
+
+class PresignedUrlCache:
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, PresignedUrl]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> PresignedUrl:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(file_path)
+            if (
+                cached is not None
+                and cached.remaining(now) > settings.MEDIA_PRESIGN_REFRESH_MARGIN_SECONDS
+            ):
+                self._entries.move_to_end(file_path)
+                return cached
+
+        ttl = settings.MEDIA_PRESIGN_TTL_SECONDS
+        signed = PresignedUrl(
+            url=public_minio_client.presigned_get_object(
+                settings.MINIO_BUCKET, file_path, expires=timedelta(seconds=ttl)
+            ),
+            expires_at=now + ttl,
+        )
+        with self._lock:
+            self._entries[file_path] = signed
+            self._entries.move_to_end(file_path)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return signed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+presigned_urls = PresignedUrlCache(settings.MEDIA_PRESIGN_CACHE_SIZE)
@@ -1,27 +1,182 @@
+import base64
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+import math
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
+from sqlalchemy import case, literal, tuple_, union_all
 from sqlmodel import Session, asc, col, func, select
 
+from app.core.config import settings
+from app.core.time import municipal_day, municipal_day_start, municipal_today
 from app.models.domain import AuditLog, Category, Issue, User
+from app.services.issue_metrics_service import RESOLVED_STATES, IssueMetricsService
 
 logger = logging.getLogger(__name__)
 
+STATUS_SPLIT = ["REPORTED", "ASSIGNED", "IN_PROGRESS", "RESOLVED", "CLOSED"]
+CLOSED_STATES = ["RESOLVED", "CLOSED"]
+
+# Heat contributed per report, by issue priority.
+PRIORITY_WEIGHTS = {"P1": 4.0, "P2": 3.0, "P3": 2.0, "P4": 1.0}
+
+# (west, south, east, north) in degrees
+BBox = Tuple[float, float, float, float]
+
+
+def heatmap_cell_degrees(zoom: int) -> float:
+    """Width in degrees of a HEATMAP_CELL_PX-wide cell on 256px tiles at ``zoom``."""
+    return settings.HEATMAP_CELL_PX * 360.0 / (256 * 2**zoom)
+
+
+def snap_bbox(bbox: BBox, cell: float) -> BBox:
+    """Grow ``bbox`` outward to cell boundaries, so panning reuses cells."""
+    west, south, east, north = bbox
+    return (
+        math.floor(west / cell) * cell,
+        math.floor(south / cell) * cell,
+        math.ceil(east / cell) * cell,
+        math.ceil(north / cell) * cell,
+    )
+
+
+def encode_cursor(created_at: datetime, issue_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{issue_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of ``encode_cursor``; ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, issue_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(issue_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
 class PublicAnalyticsService:
     @staticmethod
-    def get_heatmap_data(session: Session) -> List[dict]:
-        try:
-            statement = select(Issue).where(Issue.status != "CLOSED")
-            issues = session.exec(statement).all()
-            data = [{"lat": i.lat, "lng": i.lng, "intensity": 0.5} for i in issues]
-            logger.debug("Heatmap data generated with %s points", len(data))
-            return data
-        except Exception as e:
-            logger.exception("Failed to generate heatmap data")
+    def get_heatmap_data(
+        session: Session, bbox: Optional[BBox] = None, zoom: Optional[int] = None
+    ) -> List[dict]:
+        """Open issues as heatmap cells.
+
+        Issues are binned in SQL into cells a few screen pixels wide at
+        ``zoom`` (HEATMAP_DEFAULT_ZOOM when omitted) and each cell carries
+        its issue count and an intensity proportional to the
+        priority-weighted report count, normalised to the heaviest cell.
+        Database errors propagate, so a failure is never cached as an empty
+        heatmap.
+        """
+        if zoom is None:
+            zoom = settings.HEATMAP_DEFAULT_ZOOM
+        location = col(Issue.location)
+        filters = [col(Issue.status) != "CLOSED"]
+        if bbox is not None:
+            # && is the index-backed bounding-box overlap test.
+            filters.append(location.op("&&")(func.ST_MakeEnvelope(*bbox, 4326)))
+
+        data = PublicAnalyticsService._heatmap_cells(
+            session, filters, heatmap_cell_degrees(zoom)
+        )
+        logger.debug("Heatmap data generated with %s points", len(data))
+        return data
+
+    @staticmethod
+    def _heatmap_cells(session: Session, filters: list, cell: float) -> List[dict]:
+        location = col(Issue.location)
+        priority_weight = case(
+            *[
+                (col(Issue.priority) == priority, weight)
+                for priority, weight in PRIORITY_WEIGHTS.items()
+            ],
+            else_=PRIORITY_WEIGHTS["P3"],
+        )
+        rows = session.exec(
+            select(
+                func.avg(func.ST_Y(location)),
+                func.avg(func.ST_X(location)),
+                func.count(),
+                func.sum(col(Issue.report_count) * priority_weight),
+            )
+            .where(*filters)
+            .group_by(func.ST_SnapToGrid(location, cell))
+        ).all()
+        if not rows:
             return []
 
+        heaviest = max(float(weight) for *_, weight in rows) or 1.0
+        # Cells sit at the mean position of their issues, not the grid corner.
+        return [
+            {
+                "lat": float(lat),
+                "lng": float(lng),
+                "intensity": round(float(weight) / heaviest, 4),
+                "count": count,
+            }
+            for lat, lng, count, weight in rows
+        ]
+
+    @staticmethod
+    def get_public_issues(
+        session: Session,
+        bbox: Optional[BBox] = None,
+        statuses: Optional[List[str]] = None,
+        category_id: Optional[UUID] = None,
+        created_since: Optional[datetime] = None,
+        limit: int = 1000,
+        cursor: Optional[Tuple[datetime, UUID]] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """One page of issues, newest first, and the cursor of the next page."""
+        location = col(Issue.location)
+        statement = (
+            select(
+                col(Issue.id),
+                func.ST_Y(location),
+                func.ST_X(location),
+                col(Issue.status),
+                func.coalesce(col(Category.name), "Unknown"),
+                col(Issue.created_at),
+            )
+            .outerjoin(Category, col(Category.id) == col(Issue.category_id))
+            .order_by(col(Issue.created_at).desc(), col(Issue.id).desc())
+            .limit(limit + 1)
+        )
+        if bbox is not None:
+            statement = statement.where(
+                location.op("&&")(func.ST_MakeEnvelope(*bbox, 4326))
+            )
+        if statuses:
+            statement = statement.where(col(Issue.status).in_(statuses))
+        if category_id is not None:
+            statement = statement.where(col(Issue.category_id) == category_id)
+        if created_since is not None:
+            statement = statement.where(col(Issue.created_at) >= created_since)
+        if cursor is not None:
+            statement = statement.where(
+                tuple_(col(Issue.created_at), col(Issue.id)) < tuple_(*cursor)
+            )
+
+        rows = session.exec(statement).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][5], rows[-1][0])
+        items = [
+            {
+                "id": str(issue_id),
+                "lat": lat,
+                "lng": lng,
+                "status": status,
+                "category_name": category_name,
+                "created_at": created_at.isoformat() if created_at else None,
+            }
+            for issue_id, lat, lng, status, category_name, created_at in rows
+        ]
+        return items, next_cursor
+
     @staticmethod
     def get_audit_trail(session: Session, entity_id: UUID) -> List[AuditLog]:
         statement = (
@@ -32,84 +187,150 @@ class PublicAnalyticsService:
         return list(session.exec(statement).all())
 
     @staticmethod
-    def get_global_stats(session: Session) -> Dict[str, Any]:
-        total_reported = session.exec(select(func.count(col(Issue.id)))).one()
+    def get_global_stats(session: Session, days: int = 7) -> Dict[str, Any]:
+        """Summary, breakdowns and a ``days``-long daily trend ending today.
+
+        Trend days run from midnight to midnight in MUNICIPAL_TIMEZONE.
+        """
+        today = municipal_today()
+        trend_days = [today - timedelta(days=i) for i in range(days - 1, -1, -1)]
+        if settings.ANALYTICS_USE_ROLLUPS:
+            counts, category_split = PublicAnalyticsService._rollup_counts(session)
+            daily = IssueMetricsService.daily_counts(session, trend_days, CLOSED_STATES)
+        else:
+            counts, category_split = PublicAnalyticsService._live_counts(session)
+            daily = PublicAnalyticsService._live_trend(session, trend_days)
+
         active_workers = session.exec(
             select(func.count(col(User.id))).where(
                 col(User.role) == "WORKER", col(User.status) == "ACTIVE"
             )
         ).one()
-        resolved_count = session.exec(
-            select(func.count(col(Issue.id))).where(col(Issue.status) == "CLOSED")
-        ).one()
 
-        categories = session.exec(select(Category)).all()
-        category_split = []
-        for cat in categories:
-            count = session.exec(
-                select(func.count(col(Issue.id))).where(col(Issue.category_id) == cat.id)
-            ).one()
-            category_split.append({"name": cat.name, "value": count})
-
-        statuses = ["REPORTED", "ASSIGNED", "IN_PROGRESS", "RESOLVED", "CLOSED"]
-        status_split = []
-        for s in statuses:
-            count = session.exec(
-                select(func.count(col(Issue.id))).where(col(Issue.status) == s)
-            ).one()
-            status_split.append({"name": s, "value": count})
-
-        total_issues = session.exec(select(func.count(col(Issue.id)))).one()
+        total_issues = counts["total"]
         if total_issues > 0:
-            compliant_issues = session.exec(
-                select(func.count(col(Issue.id))).where(
-                    col(Issue.status).in_(["RESOLVED", "CLOSED"])
-                )
-            ).one()
-            compliance_rate = (compliant_issues / total_issues) * 100
+            compliance_rate = (counts["compliant"] / total_issues) * 100
             compliance_str = f"{compliance_rate:.1f}%"
         else:
             compliance_str = "N/A"
 
-        trend_data = PublicAnalyticsService._get_trend_data(session)
+        day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        trend_data = [
+            {
+                "name": day_names[day.weekday()],
+                "date": day.isoformat(),
+                "reports": daily.get(day, (0, 0))[0],
+                "resolved": daily.get(day, (0, 0))[1],
+            }
+            for day in trend_days
+        ]
 
         return {
             "summary": {
-                "reported": total_reported,
+                "reported": total_issues,
                 "workers": active_workers,
-                "resolved": resolved_count,
+                "resolved": counts["resolved"],
                 "compliance": compliance_str,
             },
             "category_split": category_split,
-            "status_split": status_split,
+            "status_split": [
+                {"name": status, "value": counts[f"status_{status}"]}
+                for status in STATUS_SPLIT
+            ],
             "trend": trend_data,
         }
 
     @staticmethod
-    def _get_trend_data(session: Session) -> List[Dict[str, Any]]:
-        trend = []
-        today = datetime.now().date()
-        day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    def _live_counts(session: Session) -> Tuple[Dict[str, int], List[dict]]:
+        # Two statements: one scan of Issue with FILTERed counts for the
+        # summary and status split, and one over Category.
+        count_all = func.count(col(Issue.id))
+        columns = [
+            count_all.label("total"),
+            count_all.filter(col(Issue.status) == "CLOSED").label("resolved"),
+            count_all.filter(col(Issue.status).in_(CLOSED_STATES)).label("compliant"),
+        ]
+        columns += [
+            count_all.filter(col(Issue.status) == status).label(f"status_{status}")
+            for status in STATUS_SPLIT
+        ]
+        counts = dict(session.exec(select(*columns)).one()._mapping)
+
+        # One hash aggregate over the join; the outer join keeps categories
+        # without issues.
+        per_category = (
+            select(col(Category.name), func.count(col(Issue.id)))
+            .select_from(Category)
+            .outerjoin(Issue, col(Issue.category_id) == col(Category.id))
+            .group_by(col(Category.id))
+            .order_by(col(Category.id))
+        )
+        category_split = [
+            {"name": name, "value": value}
+            for name, value in session.exec(per_category).all()
+        ]
+        return counts, category_split
+
+    @staticmethod
+    def _live_trend(
+        session: Session, trend_days: List[date]
+    ) -> Dict[date, Tuple[int, int]]:
+        """Per local day: (issues created, issues now resolved or closed
+        that were resolved that day).
 
-        for i in range(6, -1, -1):
-            target_date = today - timedelta(days=i)
-            day_name = day_names[target_date.weekday()]
-
-            reports_count = session.exec(
-                select(func.count(col(Issue.id))).where(
-                    func.date(col(Issue.created_at)) == target_date
-                )
-            ).one()
-
-            resolved_count = session.exec(
-                select(func.count(col(Issue.id))).where(
-                    func.date(col(Issue.updated_at)) == target_date,
-                    col(Issue.status).in_(["RESOLVED", "CLOSED"]),
-                )
-            ).one()
-
-            trend.append(
-                {"name": day_name, "reports": reports_count, "resolved": resolved_count}
+        One grouped statement. Issues closed without a resolution count on
+        the day of ``updated_at``. Every branch filters the raw timestamp
+        column with a half-open UTC range, so the created_at/resolved_at/
+        updated_at indexes apply; only the bucketing converts to the
+        municipal timezone.
+        """
+        start = municipal_day_start(trend_days[0])
+        end = municipal_day_start(trend_days[-1] + timedelta(days=1))
+        created_at, resolved_at = col(Issue.created_at), col(Issue.resolved_at)
+        updated_at = col(Issue.updated_at)
+        resolved = col(Issue.status).in_(RESOLVED_STATES)
+        events = union_all(
+            select(
+                literal("reports").label("series"),
+                municipal_day(created_at).label("day"),
+            ).where(created_at >= start, created_at < end),
+            select(literal("resolved"), municipal_day(resolved_at)).where(
+                resolved_at >= start, resolved_at < end, resolved
+            ),
+            select(literal("resolved"), municipal_day(updated_at)).where(
+                updated_at >= start, updated_at < end, resolved, resolved_at.is_(None)
+            ),
+        ).subquery("events")
+        rows = session.exec(
+            select(events.c.series, events.c.day, func.count()).group_by(
+                events.c.series, events.c.day
             )
+        ).all()
+
+        daily: Dict[date, Tuple[int, int]] = {}
+        for series, day, count in rows:
+            reports, resolved = daily.get(day, (0, 0))
+            daily[day] = (count, resolved) if series == "reports" else (reports, count)
+        return daily
+
+    @staticmethod
+    def _rollup_counts(session: Session) -> Tuple[Dict[str, int], List[dict]]:
+        # Same shape as _live_counts, read from the status counters and
+        # issuedailyrollup.
+        by_status = IssueMetricsService.status_counts(session)
+        counts = {
+            "total": sum(by_status.values()),
+            "resolved": by_status.get("CLOSED", 0),
+            "compliant": sum(by_status.get(status, 0) for status in CLOSED_STATES),
+        }
+        for status in STATUS_SPLIT:
+            counts[f"status_{status}"] = by_status.get(status, 0)
 
-        return trend
+        by_category = IssueMetricsService.category_counts(session)
+        category_split = [
+            {"name": name, "value": by_category.get(category_id, 0)}
+            for category_id, name in session.exec(
+                select(Category.id, Category.name).order_by(col(Category.id))
+            ).all()
+        ]
+        return counts, category_split
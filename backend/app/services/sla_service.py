@@ -0,0 +1,223 @@
+"""SLA compliance against ``Category.expected_sla_days``.
+
+An issue's SLA clock starts when it is reported and its deadline falls
+``expected_sla_days`` later. A resolved issue met the SLA if ``resolved_at``
+is on or before the deadline. An open issue is breached once the deadline
+has passed; until then it counts as within SLA and reports the hours left.
+Issues closed without a resolution are not counted. Compliance is
+met / (met + breached); open issues still within SLA are undecided.
+
+One statement groups issues by (org, category, priority) and returns each
+group's timestamps as float8 epoch arrays. The per-issue arithmetic then runs
+with NumPy over the concatenated columns, and per-group totals are segment
+reductions (groups are contiguous), so no Python code runs per issue.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import timezone
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import literal_column, or_
+from sqlmodel import Session, col, func, select
+
+from app.core.time import utc_now
+from app.models.domain import Category, Issue
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# Additive per-group counters; everything reported is derived from these.
+COUNTERS = (
+    "issues",
+    "met",
+    "resolved_late",
+    "open_within_sla",
+    "open_breached",
+    "accepted",
+    "accept_hours_sum",
+)
+
+
+def _epochs(column):
+    # date_part returns float8 (extract returns numeric, which would arrive
+    # as Decimals); NULL becomes NaN so every array is plain floats.
+    return func.array_agg(
+        func.coalesce(func.date_part("epoch", column), literal_column("'NaN'::float8"))
+    )
+
+
+def evaluate(
+    lengths: np.ndarray,
+    sla_days: np.ndarray,
+    created: np.ndarray,
+    accepted: np.ndarray,
+    resolved: np.ndarray,
+    now: float,
+) -> Dict[str, np.ndarray]:
+    """Per-group SLA counters for issues stored group after group.
+
+    ``lengths`` and ``sla_days`` have one entry per (non-empty) group; the
+    timestamp arrays (epoch seconds, NaN when unset) one entry per issue.
+    """
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    deadline = created + np.repeat(sla_days * DAY, lengths)
+    hours_left = (deadline - now) / HOUR
+
+    is_resolved = ~np.isnan(resolved)
+    met = is_resolved & (resolved <= deadline)
+    open_within_sla = ~is_resolved & (hours_left > 0)
+    accept_hours = (accepted - created) / HOUR
+    has_accepted = ~np.isnan(accept_hours)
+
+    def count(mask: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(mask.astype(np.int64), starts)
+
+    return {
+        "issues": lengths.astype(np.int64),
+        "met": count(met),
+        "resolved_late": count(is_resolved & ~met),
+        "open_within_sla": count(open_within_sla),
+        "open_breached": count(~is_resolved & ~open_within_sla),
+        "accepted": count(has_accepted),
+        "accept_hours_sum": np.add.reduceat(
+            np.where(has_accepted, accept_hours, 0.0), starts
+        ),
+        "hours_to_next_breach": np.minimum.reduceat(
+            np.where(open_within_sla, hours_left, np.inf), starts
+        ),
+    }
+
+
+def _metrics(counters: Dict[str, Any], hours_to_next_breach: float) -> Dict[str, Any]:
+    breached = counters["resolved_late"] + counters["open_breached"]
+    decided = counters["met"] + breached
+    return {
+        "issues": counters["issues"],
+        "met": counters["met"],
+        "breached": breached,
+        "resolved_late": counters["resolved_late"],
+        "open_within_sla": counters["open_within_sla"],
+        "open_breached": counters["open_breached"],
+        "compliance": round(counters["met"] / decided * 100, 1) if decided else None,
+        "hours_to_next_breach": round(hours_to_next_breach, 1)
+        if np.isfinite(hours_to_next_breach)
+        else None,
+        "avg_accept_hours": round(counters["accept_hours_sum"] / counters["accepted"], 1)
+        if counters["accepted"]
+        else None,
+    }
+
+
+def _combine(groups: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    counters = {name: sum(group[name] for group in groups) for name in COUNTERS}
+    next_breach = min((group["hours_to_next_breach"] for group in groups), default=np.inf)
+    return _metrics(counters, next_breach)
+
+
+def _breakdown(
+    groups: Sequence[Dict[str, Any]],
+    key: Callable[[Dict[str, Any]], Hashable],
+    label: Callable[[Dict[str, Any]], str],
+) -> List[Dict[str, Any]]:
+    """Groups combined per ``key``, each named by ``label`` and sorted by it."""
+    buckets: Dict[Hashable, List[Dict[str, Any]]] = defaultdict(list)
+    for group in groups:
+        buckets[key(group)].append(group)
+    items = sorted(buckets.items(), key=lambda item: (label(item[1][0]), str(item[0])))
+    return [{"name": label(members[0]), **_combine(members)} for _, members in items]
+
+
+class SlaService:
+    @staticmethod
+    def load_groups(
+        session: Session, org_id: Optional[UUID] = None
+    ) -> List[Dict[str, Any]]:
+        """Raw SLA counters per (org, category, priority)."""
+        priority = func.coalesce(col(Issue.priority), "P3")
+        group_key = (
+            col(Issue.org_id),
+            col(Issue.category_id),
+            col(Category.name),
+            priority,
+            col(Category.expected_sla_days),
+        )
+        statement = (
+            select(
+                *group_key,
+                _epochs(col(Issue.created_at)),
+                _epochs(col(Issue.accepted_at)),
+                _epochs(col(Issue.resolved_at)),
+            )
+            .join(Category, col(Category.id) == col(Issue.category_id))
+            .where(
+                or_(col(Issue.resolved_at).is_not(None), col(Issue.status) != "CLOSED")
+            )
+            .group_by(*group_key)
+        )
+        if org_id is not None:
+            statement = statement.where(col(Issue.org_id) == org_id)
+
+        rows = session.exec(statement).all()
+        if not rows:
+            return []
+
+        def column(index: int) -> np.ndarray:
+            return np.concatenate([np.asarray(row[index], dtype=np.float64) for row in rows])
+
+        counters = evaluate(
+            lengths=np.array([len(row[5]) for row in rows], dtype=np.int64),
+            sla_days=np.array([row[4] for row in rows], dtype=np.float64),
+            created=column(5),
+            accepted=column(6),
+            resolved=column(7),
+            now=utc_now().replace(tzinfo=timezone.utc).timestamp(),
+        )
+        return [
+            {
+                "org_id": row[0],
+                "category_id": row[1],
+                "category_name": row[2],
+                "priority": row[3],
+                "sla_days": row[4],
+                **{name: values[i].item() for name, values in counters.items()},
+            }
+            for i, row in enumerate(rows)
+        ]
+
+    @staticmethod
+    def get_report(
+        session: Session, org_id: Optional[UUID] = None, include_groups: bool = False
+    ) -> Dict[str, Any]:
+        """Overall SLA figures with per-category and per-priority breakdowns.
+
+        ``include_groups`` adds the per-(org, category, priority) rows.
+        """
+        groups = SlaService.load_groups(session, org_id)
+        report: Dict[str, Any] = {
+            "summary": _combine(groups),
+            "by_category": _breakdown(
+                groups,
+                lambda group: group["category_id"],
+                lambda group: group["category_name"],
+            ),
+            "by_priority": _breakdown(
+                groups, lambda group: group["priority"], lambda group: group["priority"]
+            ),
+        }
+        if include_groups:
+            report["groups"] = [
+                {
+                    "org_id": group["org_id"],
+                    "category_id": group["category_id"],
+                    "category_name": group["category_name"],
+                    "priority": group["priority"],
+                    "sla_days": group["sla_days"],
+                    **_metrics(group, group["hours_to_next_breach"]),
+                }
+                for group in groups
+            ]
+        return report
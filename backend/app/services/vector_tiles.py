@@ -0,0 +1,114 @@
+"""Mapbox Vector Tiles of open issues and authority zones.
+
+Tiles are rendered by PostGIS (``ST_AsMVT``) in one statement with two
+layers: ``issues`` (open issues with status, category, priority and report
+count) and ``zones`` (jurisdiction boundaries). Rendered tiles are cached
+per (z, x, y, data version of issue/category/zone), so a change to any of
+those tables takes effect on the next request in this process; the TTL
+bounds staleness for edits made by other processes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import NamedTuple
+
+from sqlalchemy import String, cast, literal_column
+from sqlmodel import Session, col, func, select
+
+from app.core.cache import MemoryBackend, ResponseCache
+from app.core.config import settings
+from app.db.change_tracking import data_version
+from app.models.domain import Category, Issue, Zone
+
+MAX_ZOOM = 22
+EXTENT = 4096
+BUFFER = 64
+MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+_TABLES = ("issue", "category", "zone")
+
+
+class VectorTile(NamedTuple):
+    content: bytes
+    etag: str
+
+
+_tiles = ResponseCache(
+    MemoryBackend(settings.VECTOR_TILE_CACHE_SIZE),
+    ttl_seconds=settings.VECTOR_TILE_CACHE_TTL_SECONDS,
+)
+
+
+def tile_in_range(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+class VectorTileService:
+    @staticmethod
+    def tile(session: Session, z: int, x: int, y: int) -> VectorTile:
+        key = f"{z}/{x}/{y}:v{data_version(*_TABLES)}"
+        return _tiles.get_or_compute(
+            key, lambda: VectorTileService.render(session, z, x, y)
+        )
+
+    @staticmethod
+    def render(session: Session, z: int, x: int, y: int) -> VectorTile:
+        envelope = func.ST_TileEnvelope(z, x, y)
+        # Index-backed prefilter in the storage SRID; && on the tile bounds.
+        in_tile = func.ST_Transform(envelope, 4326)
+
+        issues = (
+            select(
+                func.ST_AsMVTGeom(
+                    func.ST_Transform(col(Issue.location), 3857), envelope, EXTENT, BUFFER
+                ).label("geom"),
+                cast(col(Issue.id), String).label("id"),
+                col(Issue.status).label("status"),
+                col(Category.name).label("category"),
+                col(Issue.priority).label("priority"),
+                col(Issue.report_count).label("report_count"),
+            )
+            .join(Category, col(Category.id) == col(Issue.category_id))
+            .where(
+                col(Issue.status) != "CLOSED",
+                col(Issue.location).op("&&")(in_tile),
+            )
+            .subquery("issues")
+        )
+        zones = (
+            select(
+                func.ST_AsMVTGeom(
+                    func.ST_Transform(col(Zone.boundary), 3857), envelope, EXTENT, BUFFER
+                ).label("geom"),
+                cast(col(Zone.id), String).label("id"),
+                col(Zone.name).label("name"),
+            )
+            .where(col(Zone.boundary).op("&&")(in_tile))
+            .subquery("zones")
+        )
+
+        def layer(rows, name: str):
+            # ST_AsMVT takes the whole row; every non-geometry column becomes
+            # a feature property.
+            return (
+                select(
+                    func.coalesce(
+                        func.ST_AsMVT(literal_column(rows.name), name, EXTENT, "geom"),
+                        literal_column("''::bytea"),
+                    )
+                )
+                .select_from(rows)
+                .scalar_subquery()
+            )
+
+        content = bytes(
+            session.exec(
+                select(layer(issues, "issues").op("||")(layer(zones, "zones")))
+            ).one()
+        )
+        return VectorTile(content=content, etag=f'"{hashlib.md5(content).hexdigest()}"')
+
+    @staticmethod
+    def stats() -> dict:
+        return _tiles.stats()
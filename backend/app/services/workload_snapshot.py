@@ -0,0 +1,136 @@
+"""Per-org worker workload snapshot behind the assignment dropdown.
+
+The snapshot (active, total assigned and resolved task counts per worker)
+comes from one grouped query and is cached per org. Any flush that moves an
+issue onto, off or between workers, changes the status of an assigned
+issue, or edits a worker account records a ``workload`` change; once that
+transaction commits the cached snapshots are stale. Assignment, bulk
+assignment, reassignment, unassignment, worker deactivation and the worker
+task transitions all go through this without calling the cache themselves.
+The TTL bounds staleness for writes made by other processes.
+"""
+
+from __future__ import annotations
+
+from itertools import chain
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, col, func, select
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.change_tracking import data_version, mark_changed
+from app.models.domain import Issue, User
+
+WORKLOAD = "workload"
+
+_cache = LRUCache(
+    settings.WORKLOAD_SNAPSHOT_CACHE_SIZE,
+    ttl_seconds=settings.WORKLOAD_SNAPSHOT_TTL_SECONDS,
+)
+
+
+class WorkloadSnapshot:
+    @staticmethod
+    def workers(session: Session, org_id: Optional[UUID] = None) -> List[Dict[str, Any]]:
+        """Workers with task counts, least busy first."""
+        version = data_version(WORKLOAD)
+        cached = _cache.get(org_id)
+        if cached is not None and cached[0] == version:
+            return list(cached[1])
+
+        workers = WorkloadSnapshot.load(session, org_id)
+        _cache.set(org_id, (version, workers))
+        return list(workers)
+
+    @staticmethod
+    def load(session: Session, org_id: Optional[UUID] = None) -> List[Dict[str, Any]]:
+        status = col(Issue.status)
+        per_worker = (
+            select(
+                col(Issue.worker_id).label("worker_id"),
+                func.count()
+                .filter(status.in_(["ASSIGNED", "ACCEPTED", "IN_PROGRESS"]))
+                .label("active"),
+                func.count().label("total"),
+                func.count().filter(status.in_(["RESOLVED", "CLOSED"])).label("resolved"),
+            )
+            .where(col(Issue.worker_id).is_not(None))
+            .group_by(col(Issue.worker_id))
+            .subquery()
+        )
+        statement = (
+            select(
+                User.id,
+                User.email,
+                User.full_name,
+                User.status,
+                per_worker.c.active,
+                per_worker.c.total,
+                per_worker.c.resolved,
+            )
+            .outerjoin(per_worker, per_worker.c.worker_id == col(User.id))
+            .where(col(User.role) == "WORKER")
+        )
+        if org_id is not None:
+            statement = statement.where(col(User.org_id) == org_id)
+
+        workers = [
+            {
+                "id": worker_id,
+                "email": email,
+                "full_name": full_name,
+                "status": worker_status,
+                "active_task_count": active or 0,
+                "total_assigned": total or 0,
+                "resolved_count": resolved or 0,
+            }
+            for worker_id, email, full_name, worker_status, active, total, resolved in (
+                session.exec(statement).all()
+            )
+        ]
+        workers.sort(key=lambda worker_stat: worker_stat["active_task_count"])
+        return workers
+
+    @staticmethod
+    def clear() -> None:
+        _cache.clear()
+
+
+def _changed(obj: Any, *attrs: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _previous(obj: Any, attr: str) -> Any:
+    history = inspect(obj).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(obj, attr)
+
+
+def _affects_workload(session: OrmSession) -> bool:
+    for obj in chain(session.new, session.deleted):
+        if isinstance(obj, Issue) and obj.worker_id is not None:
+            return True
+        if isinstance(obj, User) and obj.role == "WORKER":
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, Issue):
+            if (obj.worker_id or _previous(obj, "worker_id")) and _changed(
+                obj, "worker_id", "status"
+            ):
+                return True
+        elif isinstance(obj, User):
+            if "WORKER" in (obj.role, _previous(obj, "role")) and _changed(
+                obj, "role", "status", "org_id", "email", "full_name"
+            ):
+                return True
+    return False
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _track_workload_changes(session: OrmSession, flush_context, instances) -> None:
+    if _affects_workload(session):
+        mark_changed(session, WORKLOAD)
@@ -0,0 +1,105 @@
+"""Benchmark the header-only EXIF parser against the full PIL decode.
+
+Usage:
+    python benchmark_exif.py /path/to/phone-photos [--repeat 200]
+
+Every *.jpg / *.jpeg under the corpus directory is parsed by both
+implementations; results are cross-checked and per-photo timings printed.
+Without a corpus a synthetic 12 MP JPEG with GPS EXIF is used instead.
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services.exif import ExifService
+
+
+def _synthetic_photo() -> Tuple[str, bytes]:
+    exif = Image.Exif()
+    exif.get_ifd(0x8769)[0x9003] = "2024:06:01 08:15:00"
+    exif.get_ifd(0x8825).update(
+        {1: "N", 2: (17.0, 26.0, 40.92), 3: "E", 4: (78.0, 20.0, 53.88)}
+    )
+    buf = io.BytesIO()
+    Image.new("RGB", (4000, 3000), color=(90, 90, 90)).save(
+        buf, format="JPEG", exif=exif
+    )
+    return "synthetic-12mp.jpg", buf.getvalue()
+
+
+def _load_corpus(directory: Path) -> List[Tuple[str, bytes]]:
+    photos = [
+        (path.name, path.read_bytes())
+        for path in sorted(directory.rglob("*"))
+        if path.suffix.lower() in {".jpg", ".jpeg"}
+    ]
+    if not photos:
+        sys.exit(f"No JPEG files found under {directory}")
+    return photos
+
+
+def _time_us(fn: Callable[[bytes], dict], payload: bytes, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def _same_result(fast: dict, legacy: dict) -> bool:
+    # Timestamps are not compared: the PIL path only sees DateTimeOriginal
+    # when a writer puts it in IFD0, the fast path also reads the Exif IFD.
+    for key in ("lat", "lng"):
+        if (fast[key] is None) != (legacy[key] is None):
+            return False
+        if fast[key] is not None and abs(fast[key] - legacy[key]) > 1e-6:
+            return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", type=Path)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    photos = _load_corpus(args.corpus) if args.corpus else [_synthetic_photo()]
+
+    fast_total = legacy_total = 0.0
+    mismatches = 0
+    print(f"{'photo':40} {'size':>9} {'fast µs':>10} {'PIL µs':>10} {'speedup':>8}")
+    for name, content in photos:
+        prefix = content[: settings.EXIF_SCAN_BYTES]
+        fast_us = _time_us(ExifService.extract_metadata, prefix, args.repeat)
+        legacy_us = _time_us(ExifService._extract_metadata_pil, content, args.repeat)
+        if not _same_result(
+            ExifService.extract_metadata(prefix),
+            ExifService._extract_metadata_pil(content),
+        ):
+            mismatches += 1
+            name = f"{name} (MISMATCH)"
+        fast_total += fast_us
+        legacy_total += legacy_us
+        print(
+            f"{name[:40]:40} {len(content):>9} {fast_us:>10.1f} "
+            f"{legacy_us:>10.1f} {legacy_us / fast_us:>7.1f}x"
+        )
+
+    count = len(photos)
+    print(
+        f"\n{count} photos, mean of per-photo medians: fast {fast_total / count:.1f} µs, "
+        f"PIL {legacy_total / count:.1f} µs, {mismatches} GPS mismatches"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the SLA engine.
+
+Usage:
+    python benchmark_sla.py [--repeat 5]
+    python benchmark_sla.py --synthetic [--issues 1000000] [--groups 160]
+
+By default the full report is timed against the configured database, query
+included. With --synthetic, generated issues are spread over (org, category,
+priority) groups and only the NumPy evaluation is timed.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from sqlmodel import Session
+
+from app.services.sla_service import DAY, SlaService, evaluate
+
+
+def _synthetic(issues: int, groups: int, now: float):
+    rng = np.random.default_rng(7)
+    lengths = np.bincount(rng.integers(0, groups, issues), minlength=groups)
+    created = now - rng.uniform(0, 180 * DAY, issues)
+    accepted = np.where(
+        rng.random(issues) < 0.7, created + rng.uniform(0, 3 * DAY, issues), np.nan
+    )
+    resolved = np.where(
+        rng.random(issues) < 0.6, created + rng.uniform(0, 20 * DAY, issues), np.nan
+    )
+    sla_days = rng.choice([3.0, 5.0, 7.0, 14.0], groups)
+    return lengths, sla_days, created, accepted, resolved
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--issues", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=160)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        now = time.time()
+        data = _synthetic(args.issues, args.groups, now)
+        elapsed = _median_ms(lambda: evaluate(*data, now=now), args.repeat)
+        print(
+            f"SLA evaluation over {args.issues} issues in {args.groups} groups: "
+            f"{elapsed:.1f} ms (median)"
+        )
+        return
+
+    from app.db.session import engine
+
+    with Session(engine) as session:
+        elapsed = _median_ms(lambda: SlaService.get_report(session), args.repeat)
+        issues = SlaService.get_report(session)["summary"]["issues"]
+    print(f"SLA report over {issues} issues: {elapsed:.1f} ms (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Regenerate the issuedailyrollup table from issue and auditlog.
+
+Run after bulk loads or raw SQL maintenance that bypassed the ORM, or after
+an upgrade that adds rollup columns:
+
+    python rebuild_rollups.py
+"""
+
+from sqlmodel import Session, SQLModel, text
+
+from app.db.session import engine
+from app.services.issue_metrics_service import IssueMetricsService
+
+# Ensure SQLModel metadata is populated when this script runs standalone.
+from app.models import auth as _auth_models  # noqa: F401
+from app.models import domain as _domain_models  # noqa: F401
+
+
+def rebuild_rollups() -> int:
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "ALTER TABLE issuedailyrollup ADD COLUMN IF NOT EXISTS resolved_count INTEGER NOT NULL DEFAULT 0"
+            )
+        )
+    with Session(engine) as session:
+        return IssueMetricsService.rebuild(session)
+
+
+if __name__ == "__main__":
+    rows = rebuild_rollups()
+    print(f"Issue rollup rebuilt: {rows} rows.")
@@ -0,0 +1,27 @@
+"""Compare the issuestatuscounter table with real issue counts and repair drift.
+
+The API runs this every STATUS_COUNTER_RECONCILE_SECONDS; run it by hand
+after raw SQL maintenance that bypassed the ORM:
+
+    python reconcile_counters.py
+"""
+
+from sqlmodel import Session, SQLModel
+
+from app.db.session import engine
+from app.services.issue_metrics_service import IssueMetricsService
+
+# Ensure SQLModel metadata is populated when this script runs standalone.
+from app.models import auth as _auth_models  # noqa: F401
+from app.models import domain as _domain_models  # noqa: F401
+
+
+def reconcile_counters() -> int:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        return IssueMetricsService.reconcile_status_counters(session)
+
+
+if __name__ == "__main__":
+    repaired = reconcile_counters()
+    print(f"Issue status counters reconciled: {repaired} repaired.")
@@ -28,6 +28,25 @@ def reset_db():
                     "CREATE INDEX IF NOT EXISTS ix_refreshtoken_token_lookup ON refreshtoken (token_lookup)"
                 )
             )
+            conn.execute(
+                text(
+                    "ALTER TABLE evidence ADD COLUMN IF NOT EXISTS upload_status VARCHAR NOT NULL DEFAULT 'STORED'"
+                )
+            )
+            conn.execute(
+                text(
+                    "ALTER TABLE evidence ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR"
+                )
+            )
+            conn.execute(
+                text(
+                    "ALTER TABLE issuedailyrollup ADD COLUMN IF NOT EXISTS resolved_count INTEGER NOT NULL DEFAULT 0"
+                )
+            )
+            # create_all skips indexes on tables that already exist.
+            for table in SQLModel.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
             tables = [f'"{table.name}"' for table in SQLModel.metadata.sorted_tables]
             if tables:
                 conn.execute(
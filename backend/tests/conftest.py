@@ -1,8 +1,12 @@
 import os
+import re
+from contextlib import contextmanager
+from typing import List
+
 import pytest
 from sqlmodel import SQLModel, create_engine, Session
 from fastapi.testclient import TestClient
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlmodel import select, desc
 
 db_host = os.getenv("POSTGRES_SERVER", os.getenv("POSTGRES_HOST", "localhost"))
@@ -36,6 +40,7 @@ _truncate_engine = create_engine(
 )
 
 from app.main import app as fastapi_app
+from app.db.change_tracking import invalidate_all
 from app.db.session import get_session
 from app.services.minio_client import init_minio
 
@@ -68,6 +73,8 @@ def session_fixture():
         if tables:
             names = ", ".join(f'"{t}"' for t in tables)
             conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE;"))
+    # Raw TRUNCATE bypasses the ORM, so in-process caches must be told.
+    invalidate_all()
 
     with Session(test_engine) as session:
         yield session
@@ -129,3 +136,33 @@ def seed_default_authority(session: Session):
     session.refresh(zone)
     session.refresh(organization)
     return zone, organization
+
+
+class StatementLog:
+    def __init__(self):
+        self.statements: List[str] = []
+        self.commits = 0
+
+    def matching(self, pattern: str) -> List[str]:
+        regex = re.compile(pattern, re.IGNORECASE)
+        return [statement for statement in self.statements if regex.search(statement)]
+
+
+@contextmanager
+def record_statements(engine=test_engine):
+    """Record SQL statements and COMMITs issued on ``engine`` inside the block."""
+    log = StatementLog()
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        log.statements.append(statement)
+
+    def on_commit(conn):
+        log.commits += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        yield log
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
@@ -16,11 +16,11 @@ Covers:
 
 import pytest
 from datetime import datetime, timedelta
-from app.core.time import utc_now
+from app.core.time import municipal_day_start, municipal_today, utc_now
 from uuid import uuid4
 from sqlmodel import Session, select, desc
 
-from app.models.domain import Category, User, Issue, AuditLog, Otp
+from app.models.domain import Category, User, Issue, AuditLog, Organization, Otp
 
 
 # ---------------------------------------------------------------------------
@@ -80,12 +80,18 @@ def _seed(session: Session):
 
 
 def _create_issue(
-    session: Session, cat, reporter, status="REPORTED", worker=None, **kwargs
+    session: Session,
+    cat,
+    reporter,
+    status="REPORTED",
+    worker=None,
+    location="SRID=4326;POINT(78.35 17.44)",
+    **kwargs,
 ):
     issue = Issue(
         category_id=cat.id,
         status=status,
-        location="SRID=4326;POINT(78.35 17.44)",
+        location=location,
         reporter_id=reporter.id,
         worker_id=worker.id if worker else None,
         **kwargs,
@@ -173,6 +179,19 @@ class TestGlobalStats:
         assert cat_map["Drainage"] == 2
         assert cat_map["Street Light"] == 1
 
+    def test_category_split_lists_every_category_in_id_order(self, client, session):
+        cat_p, cat_d, cat_l, citizen, *_ = _seed(session)
+        _create_issue(session, cat_d, citizen)
+
+        data = client.get("/api/v1/analytics/stats").json()
+
+        expected = sorted(
+            [(cat_p.id, "Pothole", 0), (cat_d.id, "Drainage", 1), (cat_l.id, "Street Light", 0)]
+        )
+        assert [(c["name"], c["value"]) for c in data["category_split"]] == [
+            (name, value) for _, name, value in expected
+        ]
+
     def test_status_split_covers_all_statuses(self, client, session):
         cat, _, _, citizen, _, worker_a, worker_b, _ = _seed(session)
 
@@ -194,6 +213,83 @@ class TestGlobalStats:
         # ACCEPTED is not in the list
         assert "ACCEPTED" not in status_map
 
+    def test_stats_use_constant_number_of_statements(self, client, session):
+        from conftest import record_statements
+
+        cat_p, cat_d, cat_l, citizen, *_ = _seed(session)
+        for cat in (cat_p, cat_d, cat_l):
+            _create_issue(session, cat, citizen)
+        # Closed without a resolution: counted on the day of updated_at.
+        _create_issue(session, cat_p, citizen, status="CLOSED")
+
+        with record_statements() as log:
+            resp = client.get("/api/v1/analytics/stats")
+        assert resp.status_code == 200
+        # Issue aggregates, trend, category split, active workers — independent
+        # of how many categories, statuses or trend days are reported.
+        assert len(log.statements) == 4, log.statements
+        trend = resp.json()["trend"]
+        assert len(trend) == 7
+        assert trend[-1]["reports"] == 4
+        assert trend[-1]["resolved"] == 1
+
+        with record_statements() as log:
+            resp = client.get("/api/v1/analytics/stats?days=90")
+        assert len(log.statements) == 4, log.statements
+        trend = resp.json()["trend"]
+        assert len(trend) == 90
+        assert trend[-1]["date"] == municipal_today().isoformat()
+        assert sum(point["reports"] for point in trend) == 4
+
+    def test_trend_days_follow_municipal_midnight(self, client, session):
+        cat_p, _, _, citizen, *_ = _seed(session)
+        midnight = municipal_day_start(municipal_today())
+        _create_issue(session, cat_p, citizen, created_at=midnight)
+        _create_issue(
+            session,
+            cat_p,
+            citizen,
+            created_at=midnight - timedelta(seconds=1),
+        )
+        _create_issue(
+            session, cat_p, citizen, created_at=midnight - timedelta(days=40)
+        )
+
+        trend = client.get("/api/v1/analytics/stats?days=30").json()["trend"]
+        assert len(trend) == 30
+        assert [point["reports"] for point in trend[-2:]] == [1, 1]
+        assert sum(point["reports"] for point in trend) == 2
+
+    def test_resolved_trend_counts_closes_without_resolution(self, client, session):
+        cat_p, _, _, citizen, *_ = _seed(session)
+        today = municipal_day_start(municipal_today())
+        yesterday = today - timedelta(hours=12)
+        long_ago = today - timedelta(days=20)
+        # Closed by an admin without a resolution: counted on updated_at.
+        _create_issue(
+            session, cat_p, citizen, status="CLOSED", created_at=long_ago, updated_at=yesterday
+        )
+        # Resolved today: counted on resolved_at, whatever updated_at says.
+        _create_issue(
+            session,
+            cat_p,
+            citizen,
+            status="CLOSED",
+            created_at=long_ago,
+            updated_at=long_ago,
+            resolved_at=today,
+        )
+        # Still open: never counted.
+        _create_issue(session, cat_p, citizen, created_at=long_ago, updated_at=yesterday)
+
+        trend = client.get("/api/v1/analytics/stats").json()["trend"]
+        assert [point["resolved"] for point in trend[-2:]] == [1, 1]
+        assert sum(point["resolved"] for point in trend) == 2
+
+    def test_trend_window_is_bounded(self, client, session):
+        assert client.get("/api/v1/analytics/stats?days=0").status_code == 422
+        assert client.get("/api/v1/analytics/stats?days=367").status_code == 422
+
 
 # ===========================================================================
 # 2. HEATMAP
@@ -213,7 +309,7 @@ class TestHeatmap:
         resp = client.get("/api/v1/analytics/heatmap")
         assert resp.status_code == 200
         data = resp.json()
-        assert len(data) == 2
+        assert sum(point["count"] for point in data) == 2
 
     def test_heatmap_returns_correct_coordinates(self, client, session):
         cat, _, _, citizen, *_ = _seed(session)
@@ -226,7 +322,8 @@ class TestHeatmap:
         assert len(data) == 1
         assert abs(data[0]["lat"] - 17.44) < 0.001
         assert abs(data[0]["lng"] - 78.35) < 0.001
-        assert data[0]["intensity"] == 0.5
+        assert data[0]["intensity"] == 1.0
+        assert data[0]["count"] == 1
 
     def test_heatmap_empty_when_all_closed(self, client, session):
         cat, _, _, citizen, _, worker_a, *_ = _seed(session)
@@ -238,6 +335,86 @@ class TestHeatmap:
         data = resp.json()
         assert len(data) == 0
 
+    def test_heatmap_bins_nearby_issues_at_low_zoom(self, client, session):
+        cat, _, _, citizen, *_ = _seed(session)
+
+        _create_issue(session, cat, citizen, location="SRID=4326;POINT(78.3500 17.4400)")
+        _create_issue(session, cat, citizen, location="SRID=4326;POINT(78.3502 17.4402)")
+        _create_issue(session, cat, citizen, location="SRID=4326;POINT(77.2000 28.6000)")
+
+        data = client.get("/api/v1/analytics/heatmap?zoom=8").json()
+        assert sorted(point["count"] for point in data) == [1, 2]
+        cell = next(point for point in data if point["count"] == 2)
+        assert abs(cell["lat"] - 17.4401) < 0.0001
+        assert abs(cell["lng"] - 78.3501) < 0.0001
+
+        # At street level the two nearby issues get cells of their own.
+        assert len(client.get("/api/v1/analytics/heatmap?zoom=20").json()) == 3
+
+    def test_heatmap_weights_cells_by_priority_and_reports(self, client, session):
+        cat, _, _, citizen, *_ = _seed(session)
+
+        _create_issue(
+            session, cat, citizen, location="SRID=4326;POINT(78.35 17.44)",
+            priority="P1", report_count=3,
+        )
+        _create_issue(
+            session, cat, citizen, location="SRID=4326;POINT(77.20 28.60)",
+            priority="P4", report_count=1,
+        )
+
+        data = client.get("/api/v1/analytics/heatmap?zoom=10").json()
+        by_lat = {round(point["lat"]): point["intensity"] for point in data}
+        # 3 reports x P1 (4.0) against 1 report x P4 (1.0)
+        assert by_lat[17] == 1.0
+        assert by_lat[29] == pytest.approx(1 / 12, abs=0.001)
+
+    def test_heatmap_bbox_limits_points(self, client, session):
+        cat, _, _, citizen, *_ = _seed(session)
+
+        _create_issue(session, cat, citizen, location="SRID=4326;POINT(78.35 17.44)")
+        _create_issue(session, cat, citizen, location="SRID=4326;POINT(77.20 28.60)")
+
+        data = client.get("/api/v1/analytics/heatmap?bbox=78.0,17.0,79.0,18.0").json()
+        assert len(data) == 1
+        assert abs(data[0]["lat"] - 17.44) < 0.001
+
+        data = client.get(
+            "/api/v1/analytics/heatmap?bbox=78.0,17.0,79.0,18.0&zoom=12"
+        ).json()
+        assert [point["count"] for point in data] == [1]
+
+    def test_heatmap_without_zoom_is_binned(self, client, session):
+        cat, _, _, citizen, *_ = _seed(session)
+
+        # ~20 m apart: one cell at the default zoom.
+        _create_issue(session, cat, citizen, location="SRID=4326;POINT(78.3500 17.4400)")
+        _create_issue(session, cat, citizen, location="SRID=4326;POINT(78.3502 17.4401)")
+
+        data = client.get("/api/v1/analytics/heatmap").json()
+        assert [point["count"] for point in data] == [2]
+
+    def test_heatmap_failure_is_not_cached(self, client, session, monkeypatch):
+        from app.services.public_analytics_service import PublicAnalyticsService
+
+        cat, _, _, citizen, *_ = _seed(session)
+        _create_issue(session, cat, citizen)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("database unavailable")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(PublicAnalyticsService, "_heatmap_cells", staticmethod(fail))
+            with pytest.raises(RuntimeError):
+                client.get("/api/v1/analytics/heatmap")
+
+        assert len(client.get("/api/v1/analytics/heatmap").json()) == 1
+
+    def test_heatmap_rejects_malformed_bbox(self, client, session):
+        assert client.get("/api/v1/analytics/heatmap?bbox=1,2,3").status_code == 400
+        assert client.get("/api/v1/analytics/heatmap?bbox=79,17,78,18").status_code == 400
+        assert client.get("/api/v1/analytics/heatmap?zoom=30").status_code == 422
+
 
 # ===========================================================================
 # 3. PUBLIC ISSUES
@@ -287,6 +464,65 @@ class TestPublicIssues:
         assert "category_name" in item
         assert "created_at" in item
 
+    def test_issues_public_filters(self, client, session):
+        cat_p, cat_d, _, citizen, _, worker_a, *_ = _seed(session)
+
+        _create_issue(session, cat_p, citizen, location="SRID=4326;POINT(78.35 17.44)")
+        _create_issue(
+            session, cat_d, citizen, status="CLOSED", worker=worker_a,
+            location="SRID=4326;POINT(78.36 17.45)",
+        )
+        _create_issue(session, cat_p, citizen, location="SRID=4326;POINT(77.20 28.60)")
+
+        def ids(query):
+            resp = client.get(f"/api/v1/analytics/issues-public?{query}")
+            assert resp.status_code == 200
+            return resp.json()
+
+        assert len(ids("bbox=78.0,17.0,79.0,18.0")) == 2
+        assert len(ids("status=REPORTED")) == 2
+        assert len(ids("status=REPORTED&status=CLOSED")) == 3
+        assert [d["category_name"] for d in ids(f"category_id={cat_d.id}")] == ["Drainage"]
+        future = (utc_now() + timedelta(days=1)).isoformat()
+        assert ids(f"created_since={future.replace('+', '%2B')}") == []
+
+    def test_issues_public_keyset_pagination(self, client, session):
+        cat, _, _, citizen, *_ = _seed(session)
+        base = utc_now() - timedelta(days=1)
+        created = [
+            _create_issue(session, cat, citizen, created_at=base + timedelta(minutes=i))
+            for i in range(5)
+        ]
+
+        seen = []
+        cursor = None
+        for _ in range(3):
+            query = "limit=2" + (f"&cursor={cursor}" if cursor else "")
+            resp = client.get(f"/api/v1/analytics/issues-public?{query}")
+            seen += [item["id"] for item in resp.json()]
+            cursor = resp.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+
+        assert cursor is None
+        assert seen == [str(issue.id) for issue in reversed(created)]
+
+    def test_issues_public_rejects_bad_cursor(self, client, session):
+        resp = client.get("/api/v1/analytics/issues-public?cursor=not-a-cursor")
+        assert resp.status_code == 400
+
+    def test_issues_public_is_one_statement(self, client, session):
+        from conftest import record_statements
+
+        cat_p, cat_d, _, citizen, *_ = _seed(session)
+        for cat in (cat_p, cat_d, cat_p):
+            _create_issue(session, cat, citizen)
+
+        with record_statements() as log:
+            resp = client.get("/api/v1/analytics/issues-public")
+        assert len(resp.json()) == 3
+        assert len(log.statements) == 1, log.statements
+
 
 # ===========================================================================
 # 4. AUDIT ENDPOINT
@@ -414,6 +650,43 @@ class TestWorkersWithStats:
         assert wa["total_assigned"] == 4  # all 4
         assert wa["resolved_count"] == 1  # 1 CLOSED
 
+    def test_warm_snapshot_skips_issue_queries(self, client, session):
+        from conftest import record_statements
+
+        cat, _, _, citizen, admin, worker_a, worker_b, _ = _seed(session)
+        _create_issue(session, cat, citizen, status="ASSIGNED", worker=worker_a)
+
+        _login(client, session, admin.email)
+        first = client.get("/api/v1/admin/workers-with-stats").json()
+        with record_statements() as log:
+            second = client.get("/api/v1/admin/workers-with-stats").json()
+        assert second == first
+        assert log.matching(r"\bissue\b") == []
+
+    def test_snapshot_follows_assignments(self, client, session):
+        cat, _, _, citizen, admin, worker_a, worker_b, _ = _seed(session)
+        issue = _create_issue(session, cat, citizen)
+
+        _login(client, session, admin.email)
+
+        def active(email):
+            data = client.get("/api/v1/admin/workers-with-stats").json()
+            return next(w for w in data if w["email"] == email)["active_task_count"]
+
+        assert active(worker_a.email) == 0
+        resp = client.post(
+            f"/api/v1/admin/assign?issue_id={issue.id}&worker_id={worker_a.id}"
+        )
+        assert resp.status_code == 200
+        assert active(worker_a.email) == 1
+
+        resp = client.post(
+            f"/api/v1/admin/reassign?issue_id={issue.id}&worker_id={worker_b.id}"
+        )
+        assert resp.status_code == 200
+        assert active(worker_a.email) == 0
+        assert active(worker_b.email) == 1
+
     def test_inactive_worker_included_in_list(self, client, session):
         """Workers-with-stats returns ALL workers (including inactive) since
         the service queries role=WORKER without filtering by status."""
@@ -506,3 +779,59 @@ class TestWorkerAnalytics:
 
         wa = next(w for w in data["workers"] if w["email"] == worker_a.email)
         assert wa["avg_resolution_days"] is None
+
+    def test_worker_analytics_is_one_issue_query(self, client, session):
+        from conftest import record_statements
+
+        cat, _, _, citizen, admin, worker_a, worker_b, _ = _seed(session)
+        now = utc_now()
+        for worker, status in (
+            (worker_a, "ASSIGNED"),
+            (worker_a, "CLOSED"),
+            (worker_b, "IN_PROGRESS"),
+            (worker_b, "RESOLVED"),
+        ):
+            _create_issue(
+                session, cat, citizen, status=status, worker=worker,
+                accepted_at=now - timedelta(days=2), resolved_at=now,
+            )
+
+        _login(client, session, admin.email)
+        with record_statements() as log:
+            resp = client.get("/api/v1/admin/worker-analytics")
+        assert resp.status_code == 200
+        # Independent of the number of workers.
+        assert len(log.matching(r"\bissue\b")) == 1, log.statements
+
+        by_email = {w["email"]: w for w in resp.json()["workers"]}
+        assert by_email[worker_a.email]["tasks_this_week"] == 1
+        assert by_email[worker_a.email]["avg_resolution_days"] == 2.0
+        assert by_email[worker_b.email]["tasks_this_month"] == 1
+        assert by_email["worker_c@authority.gov.in"]["active_tasks"] == 0
+
+    def test_org_scoped_analytics_ignore_other_orgs_issues(self, client, session):
+        from app.services.admin_analytics_service import AdminAnalyticsService
+        from conftest import seed_default_authority
+
+        cat, _, _, citizen, _, worker_a, _, _ = _seed(session)
+        _, organization = seed_default_authority(session)
+        other = Organization(name="Other Authority", zone_id=organization.zone_id)
+        session.add(other)
+        worker_a.org_id = organization.id
+        session.add(worker_a)
+        session.commit()
+
+        _create_issue(
+            session, cat, citizen, status="ASSIGNED", worker=worker_a,
+            org_id=organization.id,
+        )
+        # Assigned while the worker still belonged to another authority.
+        _create_issue(
+            session, cat, citizen, status="ASSIGNED", worker=worker_a,
+            org_id=other.id,
+        )
+
+        data = AdminAnalyticsService.get_worker_analytics(session, organization.id)
+        assert [w["email"] for w in data["workers"]] == [worker_a.email]
+        assert data["workers"][0]["pending_acceptance"] == 1
+        assert data["summary"]["total_active_tasks"] == 1
@@ -0,0 +1,188 @@
+"""
+Public Analytics Cache Tests
+
+Covers the cache in front of /analytics/heatmap, /stats and /issues-public:
+  1. Fresh entries are served without recomputing, as copies
+  2. Concurrent misses for one key compute once (single-flight)
+  3. Stale entries are served while one background refresh runs
+  4. Expired entries and failed computations are recomputed
+  5. Warm endpoint requests issue no SQL, and local writes invalidate them
+  6. Counters are exposed to admins
+"""
+
+import threading
+import time
+
+import pytest
+from sqlmodel import Session
+
+from app.core.cache import MemoryBackend, ResponseCache
+from app.models.domain import Category, Issue, User
+from app.services.analytics_cache import AnalyticsCacheService
+from conftest import login_via_otp, record_statements
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(clock, ttl=10, stale=0):
+    return ResponseCache(MemoryBackend(16), ttl_seconds=ttl, stale_seconds=stale, clock=clock)
+
+
+def test_fresh_entry_is_not_recomputed():
+    cache = _cache(_Clock())
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_compute("k", compute) == "value"
+    assert cache.get_or_compute("k", compute) == "value"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_memory_backend_hits_are_copies():
+    cache = _cache(_Clock())
+    cache.get_or_compute("k", lambda: {"points": [1, 2]})
+
+    cache.get_or_compute("k", lambda: None)["points"].append(3)
+
+    assert cache.get_or_compute("k", lambda: None) == {"points": [1, 2]}
+
+
+def test_concurrent_misses_compute_once():
+    cache = _cache(_Clock())
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.stats()["misses"] < 8:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_stale_entry_is_served_while_refreshing():
+    clock = _Clock()
+    cache = _cache(clock, ttl=10, stale=60)
+    cache.get_or_compute("k", lambda: "old")
+    clock.now += 30
+
+    refreshed = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        return "new"
+
+    assert cache.get_or_compute("k", lambda: "unused", refresh) == "old"
+    assert refreshed.wait(timeout=5)
+    cache.shutdown(wait=True)
+    assert cache.get_or_compute("k", lambda: "unused") == "new"
+    stats = cache.stats()
+    assert (stats["stale_hits"], stats["refreshes"]) == (1, 1)
+
+
+def test_expired_entry_and_errors_are_recomputed():
+    clock = _Clock()
+    cache = _cache(clock, ttl=10, stale=5)
+    cache.get_or_compute("k", lambda: "old")
+    clock.now += 20
+    assert cache.get_or_compute("k", lambda: "new") == "new"
+
+    def fail():
+        raise RuntimeError("database unavailable")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("other", fail)
+    assert cache.get_or_compute("other", lambda: "recovered") == "recovered"
+    assert cache.stats()["errors"] == 1
+
+
+def _seed_issue(session: Session):
+    category = Category(name="Pothole")
+    citizen = User(email="citizen-cache@test.com", role="CITIZEN")
+    session.add(category)
+    session.add(citizen)
+    session.commit()
+    issue = Issue(
+        category_id=category.id,
+        status="REPORTED",
+        location="SRID=4326;POINT(78.35 17.44)",
+        reporter_id=citizen.id,
+    )
+    session.add(issue)
+    session.commit()
+    return category, citizen
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/v1/analytics/heatmap", "/api/v1/analytics/stats", "/api/v1/analytics/issues-public"]
+)
+def test_warm_public_endpoint_issues_no_sql(client, session, path):
+    _seed_issue(session)
+    first = client.get(path)
+    assert first.status_code == 200
+
+    with record_statements() as log:
+        second = client.get(path)
+    assert second.json() == first.json()
+    assert log.statements == []
+
+
+def test_local_write_invalidates_cached_heatmap(client, session):
+    category, citizen = _seed_issue(session)
+    assert len(client.get("/api/v1/analytics/heatmap").json()) == 1
+
+    session.add(
+        Issue(
+            category_id=category.id,
+            status="REPORTED",
+            location="SRID=4326;POINT(78.36 17.45)",
+            reporter_id=citizen.id,
+        )
+    )
+    session.commit()
+
+    assert len(client.get("/api/v1/analytics/heatmap").json()) == 2
+
+
+def test_cache_stats_are_admin_only(client, session):
+    before = AnalyticsCacheService.stats()
+    _seed_issue(session)
+    client.get("/api/v1/analytics/stats")
+    client.get("/api/v1/analytics/stats")
+
+    assert client.get("/api/v1/analytics/cache-stats").status_code == 401
+
+    session.add(User(email="admin-cache@authority.gov.in", role="ADMIN"))
+    session.commit()
+    login_via_otp(client, session, "admin-cache@authority.gov.in")
+    response = client.get("/api/v1/analytics/cache-stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["misses"] >= before["misses"] + 1
+    assert stats["hits"] >= before["hits"] + 1
@@ -1,8 +1,10 @@
+import re
+
 import pytest
 from app.models.domain import Category, User, Issue, Otp
 from sqlmodel import Session, select
 import io
-from conftest import login_via_otp, seed_default_authority
+from conftest import login_via_otp, record_statements, seed_default_authority
 
 
 def test_root(client):
@@ -131,3 +133,93 @@ def test_duplicate_report_integration(client, session):
     issues = session.exec(select(Issue)).all()
     assert len(issues) == 1
     assert issues[0].report_count == 2
+
+
+def _jpeg_bytes() -> bytes:
+    from PIL import Image
+
+    img = Image.new("RGB", (10, 10), color=(0, 0, 255))
+    img_byte_arr = io.BytesIO()
+    img.save(img_byte_arr, format="JPEG")
+    return img_byte_arr.getvalue()
+
+
+def _assert_statements(log, expected):
+    """Every statement the request issued, in order, against ``expected``.
+
+    Deliberately exhaustive: a change that adds a query to the report path
+    has to add it here too.
+    """
+    statements = [statement.strip() for statement in log.statements]
+    assert len(statements) == len(expected), statements
+    for statement, pattern in zip(statements, expected):
+        assert re.match(pattern, statement, re.IGNORECASE | re.DOTALL), (pattern, statement)
+
+
+def test_report_issue_is_single_unit_of_work(client, session):
+    from app.services.jurisdiction_index import jurisdiction_index
+
+    seed_default_authority(session)
+    category = Category(name="Pothole")
+    session.add(category)
+    session.commit()
+    login_via_otp(client, session, "unit-of-work@example.com")
+    jurisdiction_index.rebuild(session)
+
+    with record_statements() as log:
+        response = client.post(
+            "/api/v1/issues/report",
+            data={"category_id": str(category.id), "lat": 17.4447, "lng": 78.3483},
+            files={"photo": ("test.jpg", _jpeg_bytes(), "image/jpeg")},
+        )
+    assert response.status_code == 200
+
+    _assert_statements(
+        log,
+        [
+            r'SELECT .* FROM "user"',  # current user
+            r"SELECT .* FROM category",
+            r"SELECT .* FROM issue",  # duplicate probe
+            r"INSERT INTO issue ",
+            r"INSERT INTO evidence ",
+            r"INSERT INTO issuestatuscounter ",
+        ],
+    )
+    assert log.commits == 1
+
+
+def test_duplicate_report_is_single_unit_of_work(client, session):
+    seed_default_authority(session)
+    category = Category(name="Pothole")
+    session.add(category)
+    session.commit()
+    login_via_otp(client, session, "unit-of-work-dup@example.com")
+    data = {"category_id": str(category.id), "lat": 17.4447, "lng": 78.3483}
+    first = client.post(
+        "/api/v1/issues/report",
+        data=data,
+        files={"photo": ("test1.jpg", _jpeg_bytes(), "image/jpeg")},
+    )
+    assert first.status_code == 200
+
+    with record_statements() as log:
+        response = client.post(
+            "/api/v1/issues/report",
+            data=data,
+            files={"photo": ("test2.jpg", _jpeg_bytes(), "image/jpeg")},
+        )
+    assert response.status_code == 200
+    assert response.json()["issue_id"] == first.json()["issue_id"]
+
+    # A report_count bump moves no status, so the rollups are untouched.
+    _assert_statements(
+        log,
+        [
+            r'SELECT .* FROM "user"',  # current user
+            r"SELECT .* FROM category",
+            r"SELECT .* FROM issue",  # duplicate probe
+            r"UPDATE issue SET report_count",
+            r"INSERT INTO evidence ",
+        ],
+    )
+    assert log.commits == 1
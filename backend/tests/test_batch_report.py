@@ -0,0 +1,130 @@
+"""
+Batch Report Submission Tests
+
+Covers POST /issues/report-batch:
+  1. Mixed batch: new issue, merge into an existing issue, merge within the
+     batch, and per-item rejections
+  2. Set-based duplicate lookup
+  3. Request-level validation of the repeated form fields
+"""
+
+import io
+from uuid import uuid4
+
+from PIL import Image
+from sqlmodel import Session, select
+
+from app.models.domain import Category, Evidence, Issue
+from app.services.issue_service import IssueService
+from conftest import login_via_otp, seed_default_authority
+
+
+def _make_jpeg() -> bytes:
+    img = Image.new("RGB", (64, 64), color="blue")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _seed(session: Session):
+    seed_default_authority(session)
+    category = Category(name="Pothole", default_priority="P2")
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    return category
+
+
+def _batch(client, entries):
+    data = {
+        "category_id": [str(entry[0]) for entry in entries],
+        "lat": [entry[1] for entry in entries],
+        "lng": [entry[2] for entry in entries],
+    }
+    files = [
+        ("photo", (f"photo-{i}.jpg", _make_jpeg(), "image/jpeg"))
+        for i in range(len(entries))
+    ]
+    return client.post("/api/v1/issues/report-batch", data=data, files=files)
+
+
+def test_batch_creates_merges_and_rejects_per_item(client, session):
+    category = _seed(session)
+    login_via_otp(client, session, "batch@test.com")
+
+    existing = client.post(
+        "/api/v1/issues/report",
+        data={"category_id": str(category.id), "lat": 17.4447, "lng": 78.3483},
+        files={"photo": ("test.jpg", _make_jpeg(), "image/jpeg")},
+    )
+    assert existing.status_code == 200
+    existing_id = existing.json()["issue_id"]
+
+    response = _batch(
+        client,
+        [
+            (category.id, 17.4500, 78.3600),  # new issue
+            (category.id, 17.44471, 78.34831),  # duplicate of the existing issue
+            (category.id, 17.45001, 78.36001),  # same spot as item 0
+            (category.id, 12.9716, 77.5946),  # outside every jurisdiction
+            (uuid4(), 17.4300, 78.3300),  # unknown category
+        ],
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["index"] for item in items] == [0, 1, 2, 3, 4]
+    assert [item["status"] for item in items] == [
+        "CREATED",
+        "MERGED",
+        "MERGED",
+        "REJECTED",
+        "REJECTED",
+    ]
+    assert items[1]["issue_id"] == existing_id
+    assert items[2]["issue_id"] == items[0]["issue_id"]
+    assert items[3]["detail"] == "No authority jurisdiction covers these coordinates"
+    assert items[4]["detail"] == "Issue category not found"
+
+    session.expire_all()
+    merged = session.get(Issue, existing_id)
+    created = session.get(Issue, items[0]["issue_id"])
+    assert merged.report_count == 2
+    assert created.report_count == 2
+    evidence = session.exec(
+        select(Evidence).where(Evidence.issue_id == created.id)
+    ).all()
+    assert len(evidence) == 2
+
+
+def test_find_duplicate_issue_ids_matches_each_point(client, session):
+    category = _seed(session)
+    login_via_otp(client, session, "batch-dupes@test.com")
+    response = client.post(
+        "/api/v1/issues/report",
+        data={"category_id": str(category.id), "lat": 17.4447, "lng": 78.3483},
+        files={"photo": ("test.jpg", _make_jpeg(), "image/jpeg")},
+    )
+    issue_id = response.json()["issue_id"]
+
+    matches = IssueService.find_duplicate_issue_ids(
+        session, [(17.4000, 78.3100), (17.44472, 78.34832)]
+    )
+    assert matches[0] is None
+    assert str(matches[1]) == issue_id
+    assert IssueService.find_duplicate_issue_ids(session, []) == []
+
+
+def test_batch_rejects_mismatched_fields(client, session):
+    category = _seed(session)
+    login_via_otp(client, session, "batch-invalid@test.com")
+
+    response = client.post(
+        "/api/v1/issues/report-batch",
+        data={
+            "category_id": [str(category.id), str(category.id)],
+            "lat": [17.44, 17.45],
+            "lng": [78.34],
+        },
+        files=[("photo", ("a.jpg", _make_jpeg(), "image/jpeg"))] * 2,
+    )
+    assert response.status_code == 400
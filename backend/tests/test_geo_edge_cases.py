@@ -164,6 +164,56 @@ class TestDuplicateDetection:
         assert dup is None
 
 
+class TestDuplicateDetectionAtScale:
+    def test_nearest_candidate_wins(self, client, session):
+        """Two open issues inside the radius: the closer one is returned."""
+        cat, citizen, _ = _seed(session)
+        _create_issue(session, cat, citizen, lat=17.44 + 0.000036, lng=78.35)
+        near = _create_issue(session, cat, citizen, lat=17.44 + 0.000009, lng=78.35)
+
+        point = IssueService.build_point_wkt(17.44, 78.35)
+        dup = IssueService.find_duplicate_issue(session, point)
+        assert dup is not None
+        assert dup.id == near.id
+
+    def test_duplicate_lookup_uses_partial_geography_index(self, client, session):
+        """EXPLAIN over 1M issues must show the open-issue GiST index."""
+        from sqlalchemy import text
+        from sqlalchemy.dialects import postgresql
+
+        cat, citizen, _ = _seed(session)
+        conn = session.connection()
+        conn.execute(
+            text(
+                """
+                INSERT INTO issue (id, category_id, status, location, reporter_id,
+                                   report_count, created_at, updated_at)
+                SELECT gen_random_uuid(), :category_id,
+                       CASE WHEN g % 4 = 0 THEN 'CLOSED' ELSE 'REPORTED' END,
+                       ST_SetSRID(ST_MakePoint(78.30 + random() * 0.10,
+                                               17.38 + random() * 0.10), 4326),
+                       :reporter_id, 1, now(), now()
+                FROM generate_series(1, 1000000) AS g
+                """
+            ),
+            {"category_id": cat.id, "reporter_id": citizen.id},
+        )
+        session.commit()
+        session.connection().execute(text("ANALYZE issue"))
+
+        statement = IssueService.duplicate_issue_statement(
+            IssueService.build_point_wkt(17.44, 78.35)
+        )
+        compiled = statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        plan = "\n".join(
+            row[0]
+            for row in session.connection().execute(text(f"EXPLAIN {compiled}"))
+        )
+        assert "ix_issue_open_location_geog" in plan, plan
+
+
 # ===========================================================================
 # 3. REPORT ENDPOINT — DUPLICATE MERGING
 # ===========================================================================
@@ -0,0 +1,141 @@
+"""
+Idempotency-Key Tests
+
+Covers retries of the upload endpoints:
+  1. A repeated report replays the first response without new evidence
+  2. Reusing a key for a different report is rejected
+  3. A repeated resolve replays instead of failing the workflow transition
+  4. Expired keys run the request again
+  5. Expired records are purged, live ones kept
+"""
+
+import io
+from datetime import timedelta
+
+from PIL import Image
+from sqlmodel import Session, select
+
+from app.core.time import utc_now
+from app.models.domain import Category, Evidence, IdempotencyRecord, Issue, User
+from app.services.idempotency_service import IdempotencyService
+from conftest import login_via_otp, seed_default_authority
+
+
+def _make_jpeg() -> bytes:
+    img = Image.new("RGB", (32, 32), color="orange")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _seed(session: Session):
+    _, organization = seed_default_authority(session)
+    category = Category(name="Pothole", default_priority="P2")
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    return category, organization
+
+
+def _report(client, category, key, lat=17.4447):
+    return client.post(
+        "/api/v1/issues/report",
+        data={"category_id": str(category.id), "lat": lat, "lng": 78.3483},
+        files={"photo": ("test.jpg", _make_jpeg(), "image/jpeg")},
+        headers={"Idempotency-Key": key},
+    )
+
+
+def test_retried_report_replays_first_response(client, session):
+    category, _ = _seed(session)
+    login_via_otp(client, session, "retry@test.com")
+
+    first = _report(client, category, "report-1")
+    second = _report(client, category, "report-1")
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["idempotent-replayed"] == "true"
+
+    issues = session.exec(select(Issue)).all()
+    assert len(issues) == 1
+    assert issues[0].report_count == 1
+    assert len(session.exec(select(Evidence)).all()) == 1
+
+
+def test_key_reused_for_different_report_is_rejected(client, session):
+    category, _ = _seed(session)
+    login_via_otp(client, session, "reuse@test.com")
+
+    assert _report(client, category, "report-2").status_code == 200
+    response = _report(client, category, "report-2", lat=17.4300)
+    assert response.status_code == 422
+
+
+def test_retried_resolve_replays_first_response(client, session):
+    category, organization = _seed(session)
+    citizen = User(email="citizen-idem@test.com", role="CITIZEN")
+    worker = User(email="worker-idem@test.com", role="WORKER", org_id=organization.id)
+    session.add(citizen)
+    session.add(worker)
+    session.commit()
+    issue = Issue(
+        category_id=category.id,
+        status="IN_PROGRESS",
+        location="SRID=4326;POINT(78.35 17.44)",
+        reporter_id=citizen.id,
+        worker_id=worker.id,
+        org_id=organization.id,
+    )
+    session.add(issue)
+    session.commit()
+    login_via_otp(client, session, worker.email)
+
+    def resolve():
+        return client.post(
+            f"/api/v1/worker/tasks/{issue.id}/resolve",
+            files={"photo": ("after.jpg", _make_jpeg(), "image/jpeg")},
+            headers={"Idempotency-Key": "resolve-1"},
+        )
+
+    first = resolve()
+    second = resolve()
+    assert first.status_code == second.status_code == 200
+    assert second.headers["idempotent-replayed"] == "true"
+    evidence = session.exec(
+        select(Evidence).where(Evidence.issue_id == issue.id, Evidence.type == "RESOLVE")
+    ).all()
+    assert len(evidence) == 1
+
+
+def test_expired_key_runs_request_again(client, session):
+    category, _ = _seed(session)
+    login_via_otp(client, session, "expired@test.com")
+
+    assert _report(client, category, "report-3").status_code == 200
+    record = session.exec(select(IdempotencyRecord)).one()
+    record.expires_at = utc_now() - timedelta(seconds=1)
+    session.add(record)
+    session.commit()
+
+    response = _report(client, category, "report-3")
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+    assert session.exec(select(Issue)).one().report_count == 2
+
+
+def test_purge_removes_only_expired_records(client, session):
+    category, _ = _seed(session)
+    login_via_otp(client, session, "purge@test.com")
+
+    assert _report(client, category, "report-4").status_code == 200
+    assert _report(client, category, "report-5", lat=17.4300).status_code == 200
+    expired = session.exec(
+        select(IdempotencyRecord).where(IdempotencyRecord.key == "report-4")
+    ).one()
+    expired.expires_at = utc_now() - timedelta(seconds=1)
+    session.add(expired)
+    session.commit()
+
+    assert IdempotencyService.purge_expired(session) == 1
+    remaining = session.exec(select(IdempotencyRecord)).all()
+    assert [record.key for record in remaining] == ["report-5"]
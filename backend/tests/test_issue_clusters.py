@@ -0,0 +1,115 @@
+"""
+Issue Clustering Tests
+
+Covers the supercluster-style index behind /analytics/clusters:
+  1. KDBush range and radius queries match a brute-force scan
+  2. Nearby issues merge at low zoom and split at high zoom
+  3. Clusters carry counts by status and conserve the issue count
+  4. The endpoint rebuilds after issue writes, in the background and at most
+     once per CLUSTER_MIN_REBUILD_SECONDS, and honours bbox
+"""
+
+import random
+from uuid import uuid4
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.domain import Category, Issue, User
+from app.services.issue_clusters import ClusterIndex, KDBush, issue_cluster_index
+
+
+def test_kdbush_matches_brute_force():
+    rng = random.Random(7)
+    xs = [rng.random() for _ in range(2000)]
+    ys = [rng.random() for _ in range(2000)]
+    tree = KDBush(xs, ys, node_size=16)
+
+    in_box = [i for i in range(2000) if 0.2 <= xs[i] <= 0.5 and 0.3 <= ys[i] <= 0.6]
+    assert sorted(tree.range(0.2, 0.3, 0.5, 0.6)) == in_box
+
+    near = [i for i in range(2000) if (xs[i] - 0.5) ** 2 + (ys[i] - 0.5) ** 2 <= 0.01]
+    assert sorted(tree.within(0.5, 0.5, 0.1)) == near
+
+
+def _points():
+    return [
+        (uuid4(), 78.3500, 17.4400, "REPORTED"),
+        (uuid4(), 78.3502, 17.4402, "ASSIGNED"),
+        (uuid4(), 78.3501, 17.4401, "REPORTED"),
+        (uuid4(), 77.2000, 28.6000, "IN_PROGRESS"),
+    ]
+
+
+def test_nearby_issues_cluster_at_low_zoom_only():
+    index = ClusterIndex(_points(), max_zoom=16, radius_px=40)
+    world = (-180, -85, 180, 85)
+
+    low = index.clusters(*world, zoom=8)
+    assert sorted(item["count"] for item in low) == [1, 3]
+    cluster = next(item for item in low if item["count"] == 3)
+    assert cluster["status_counts"] == {"REPORTED": 2, "ASSIGNED": 1}
+    assert cluster["issue_id"] is None
+    assert cluster["expansion_zoom"] is not None
+    assert abs(cluster["lat"] - 17.4401) < 0.001
+
+    high = index.clusters(*world, zoom=17)
+    assert len(high) == 4
+    assert all(item["count"] == 1 and item["issue_id"] for item in high)
+
+    for zoom in range(0, 18):
+        assert sum(item["count"] for item in index.clusters(*world, zoom=zoom)) == 4
+
+
+def test_cluster_query_is_limited_to_bbox():
+    index = ClusterIndex(_points(), max_zoom=16, radius_px=40)
+    assert [item["count"] for item in index.clusters(78.0, 17.0, 79.0, 18.0, zoom=17)] == [1, 1, 1]
+    assert index.clusters(70.0, 10.0, 71.0, 11.0, zoom=5) == []
+
+
+def test_clusters_endpoint_tracks_issue_writes(client, session: Session, monkeypatch):
+    issue_cluster_index.clear()
+    category = Category(name="Pothole")
+    citizen = User(email="citizen-clusters@test.com", role="CITIZEN")
+    session.add(category)
+    session.add(citizen)
+    session.commit()
+
+    def add_issue(lng, lat, status="REPORTED"):
+        session.add(
+            Issue(
+                category_id=category.id,
+                status=status,
+                location=f"SRID=4326;POINT({lng} {lat})",
+                reporter_id=citizen.id,
+            )
+        )
+        session.commit()
+
+    add_issue(78.35, 17.44)
+    add_issue(78.3501, 17.4401, status="ASSIGNED")
+    add_issue(78.36, 17.45, status="CLOSED")
+
+    data = client.get("/api/v1/analytics/clusters?zoom=10").json()
+    assert len(data) == 1
+    assert data[0]["count"] == 2
+    assert data[0]["status_counts"] == {"REPORTED": 1, "ASSIGNED": 1}
+
+    add_issue(77.20, 28.60)
+    # Within the minimum interval the previous index is served as is.
+    data = client.get("/api/v1/analytics/clusters?zoom=10").json()
+    issue_cluster_index.join()
+    assert [item["count"] for item in data] == [2]
+    assert len(client.get("/api/v1/analytics/clusters?zoom=10").json()) == 1
+
+    # Afterwards a background rebuild picks the write up.
+    monkeypatch.setattr(settings, "CLUSTER_MIN_REBUILD_SECONDS", 0)
+    data = client.get("/api/v1/analytics/clusters?zoom=10").json()
+    assert [item["count"] for item in data] == [2]
+    issue_cluster_index.join()
+    data = client.get("/api/v1/analytics/clusters?zoom=10").json()
+    assert sorted(item["count"] for item in data) == [1, 2]
+
+    data = client.get("/api/v1/analytics/clusters?zoom=10&bbox=77.0,28.0,78.0,29.0").json()
+    assert [item["count"] for item in data] == [1]
+    assert client.get("/api/v1/analytics/clusters").status_code == 422
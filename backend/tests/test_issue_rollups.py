@@ -0,0 +1,282 @@
+"""
+Issue Rollup Tests
+
+Covers the incrementally maintained issuedailyrollup table:
+  1. Creating an issue adds it to the rollup in the same commit
+  2. Workflow transitions move the issue between status buckets
+  3. A rolled-back transition leaves the rollup untouched
+  4. rebuild() reproduces the incrementally maintained rows
+  5. Stats and dashboard read from the rollup match the live queries; an
+     issue resolved then closed on the same day is counted once, and one
+     closed without a resolution is counted by updated_at
+  6. Per-(org, status) counters follow transitions and back the dashboard;
+     with rollups disabled only the counters are maintained
+  7. Reconciliation repairs counters that drifted from the issue table, once
+     even when two processes reconcile at the same time
+  8. The flush hook neither refreshes loaded issues nor reads them one by one
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.time import municipal_date
+from app.models.domain import AuditLog, Category, Issue, IssueDailyRollup, IssueStatusCounter, User
+from app.services.admin_analytics_service import AdminAnalyticsService
+from app.services.issue_metrics_service import IssueMetricsService
+from app.services.workflow_service import WorkflowService
+from conftest import record_statements, seed_default_authority, test_engine
+
+
+@pytest.fixture(autouse=True)
+def rollups_enabled(monkeypatch):
+    # The daily rollup is only maintained while rollups are enabled.
+    monkeypatch.setattr(settings, "ANALYTICS_USE_ROLLUPS", True)
+
+
+def _seed(session: Session):
+    _, organization = seed_default_authority(session)
+    category = Category(name="Pothole", default_priority="P2")
+    admin = User(email="admin-rollup@authority.gov.in", role="ADMIN", org_id=organization.id)
+    citizen = User(email="citizen-rollup@test.com", role="CITIZEN")
+    for obj in (category, admin, citizen):
+        session.add(obj)
+    session.commit()
+    for obj in (category, admin, citizen):
+        session.refresh(obj)
+    return category, organization, admin, citizen
+
+
+def _create_issue(session: Session, category, organization, reporter, status="REPORTED"):
+    issue = Issue(
+        category_id=category.id,
+        status=status,
+        location="SRID=4326;POINT(78.35 17.44)",
+        reporter_id=reporter.id,
+        org_id=organization.id,
+    )
+    session.add(issue)
+    session.commit()
+    session.refresh(issue)
+    return issue
+
+
+def _rollup(session: Session):
+    rows = session.exec(select(IssueDailyRollup)).all()
+    return {
+        (row.org_id, row.category_id, row.status, row.day): (
+            row.issue_count,
+            row.transition_count,
+            row.resolved_count,
+        )
+        for row in rows
+        if row.issue_count or row.transition_count or row.resolved_count
+    }
+
+
+def _counters(session: Session):
+    rows = session.exec(select(IssueStatusCounter)).all()
+    return {(row.org_id, row.status): row.issue_count for row in rows if row.issue_count}
+
+
+def test_new_issue_is_counted(session):
+    category, organization, _, citizen = _seed(session)
+    issue = _create_issue(session, category, organization, citizen)
+
+    assert _rollup(session) == {
+        (organization.id, category.id, "REPORTED", municipal_date(issue.created_at)): (1, 0, 0)
+    }
+
+
+def test_transition_moves_issue_between_statuses(session):
+    category, organization, admin, citizen = _seed(session)
+    issue = _create_issue(session, category, organization, citizen)
+
+    WorkflowService.update_status(session, issue, "RESOLVED", admin.id)
+    session.commit()
+
+    counts = IssueMetricsService.status_counts(session, organization.id)
+    assert counts.get("REPORTED", 0) == 0
+    assert counts["RESOLVED"] == 1
+    day = municipal_date(issue.created_at)
+    assert _rollup(session)[(organization.id, category.id, "RESOLVED", day)] == (1, 1, 1)
+
+
+def test_rolled_back_transition_is_not_counted(session):
+    category, organization, admin, citizen = _seed(session)
+    issue = _create_issue(session, category, organization, citizen)
+    before = _rollup(session)
+
+    WorkflowService.update_status(session, issue, "CLOSED", admin.id)
+    session.flush()
+    session.rollback()
+
+    assert _rollup(session) == before
+
+
+def test_rebuild_matches_incremental_rollup(session):
+    category, organization, admin, citizen = _seed(session)
+    issues = [_create_issue(session, category, organization, citizen) for _ in range(3)]
+    WorkflowService.update_status(session, issues[0], "RESOLVED", admin.id)
+    WorkflowService.approve_resolution(session, issues[0], admin.id)
+    WorkflowService.update_status(session, issues[1], "ASSIGNED", admin.id)
+    session.commit()
+    incremental = _rollup(session)
+
+    IssueMetricsService.rebuild(session)
+
+    assert _rollup(session) == incremental
+
+
+def test_rollup_reads_match_live_queries(client, session, monkeypatch):
+    category, organization, admin, citizen = _seed(session)
+    for status in ("REPORTED", "ASSIGNED", "IN_PROGRESS"):
+        _create_issue(session, category, organization, citizen, status=status)
+    resolved = _create_issue(session, category, organization, citizen)
+    WorkflowService.update_status(session, resolved, "RESOLVED", admin.id)
+    closed = _create_issue(session, category, organization, citizen)
+    WorkflowService.update_status(session, closed, "RESOLVED", admin.id)
+    WorkflowService.approve_resolution(session, closed, admin.id)
+    session.commit()
+    # Closed without a resolution: no resolved_at, counted by updated_at.
+    _create_issue(session, category, organization, citizen, status="CLOSED")
+
+    monkeypatch.setattr(settings, "ANALYTICS_USE_ROLLUPS", False)
+    live_stats = client.get("/api/v1/analytics/stats").json()
+    assert live_stats["trend"][-1]["resolved"] == 3
+    live_dashboard = AdminAnalyticsService.get_dashboard_stats(session, organization.id)
+
+    monkeypatch.setattr(settings, "ANALYTICS_USE_ROLLUPS", True)
+    rollup_stats = client.get("/api/v1/analytics/stats").json()
+    rollup_dashboard = AdminAnalyticsService.get_dashboard_stats(session, organization.id)
+
+    for key in ("summary", "status_split", "category_split", "trend"):
+        assert rollup_stats[key] == live_stats[key], key
+    assert rollup_dashboard == live_dashboard
+
+
+def test_rollup_is_left_alone_while_disabled(session, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYTICS_USE_ROLLUPS", False)
+    category, organization, admin, citizen = _seed(session)
+    issue = _create_issue(session, category, organization, citizen)
+    WorkflowService.update_status(session, issue, "ASSIGNED", admin.id)
+    session.commit()
+
+    assert _rollup(session) == {}
+    assert _counters(session) == {(organization.id, "ASSIGNED"): 1}
+
+
+def test_status_counters_follow_transitions(session):
+    category, organization, admin, citizen = _seed(session)
+    first = _create_issue(session, category, organization, citizen)
+    _create_issue(session, category, organization, citizen)
+    assert _counters(session) == {(organization.id, "REPORTED"): 2}
+
+    WorkflowService.update_status(session, first, "ASSIGNED", admin.id)
+    session.commit()
+
+    assert _counters(session) == {
+        (organization.id, "REPORTED"): 1,
+        (organization.id, "ASSIGNED"): 1,
+    }
+
+
+def test_dashboard_reads_counters_without_scanning_issues(session):
+    category, organization, admin, citizen = _seed(session)
+    for status in ("REPORTED", "ACCEPTED", "CLOSED", "RESOLVED"):
+        _create_issue(session, category, organization, citizen, status=status)
+
+    with record_statements() as log:
+        dashboard = AdminAnalyticsService.get_dashboard_stats(session, organization.id)
+    assert dashboard == {"reported": 1, "in_progress": 1, "resolved": 2}
+    assert log.matching(r"FROM issue\b") == []
+
+
+def test_reconcile_repairs_drifted_counters(session):
+    category, organization, _, citizen = _seed(session)
+    issue = _create_issue(session, category, organization, citizen)
+
+    # Writes that bypass the ORM leave the counters behind.
+    connection = session.connection()
+    connection.execute(
+        text("UPDATE issue SET status = 'CLOSED' WHERE id = :id"), {"id": issue.id}
+    )
+    connection.execute(text("UPDATE issuestatuscounter SET issue_count = issue_count + 5"))
+    session.commit()
+
+    assert IssueMetricsService.reconcile_status_counters(session) == 2
+    assert _counters(session) == {(organization.id, "CLOSED"): 1}
+    assert IssueMetricsService.reconcile_status_counters(session) == 0
+
+
+def test_dashboard_counts_issues_until_counters_are_seeded(session):
+    category, organization, _, citizen = _seed(session)
+    for status in ("REPORTED", "IN_PROGRESS", "CLOSED"):
+        _create_issue(session, category, organization, citizen, status=status)
+    # A database that predates the counter table.
+    session.connection().execute(text("DELETE FROM issuestatuscounter"))
+    session.commit()
+
+    expected = {"reported": 1, "in_progress": 1, "resolved": 1}
+    assert AdminAnalyticsService.get_dashboard_stats(session, organization.id) == expected
+
+    assert IssueMetricsService.reconcile_status_counters(session) == 3
+    assert AdminAnalyticsService.get_dashboard_stats(session, organization.id) == expected
+
+
+def test_concurrent_reconciles_seed_counters_once(session):
+    category, organization, _, citizen = _seed(session)
+    for status in ("REPORTED", "REPORTED", "CLOSED"):
+        _create_issue(session, category, organization, citizen, status=status)
+    session.connection().execute(text("DELETE FROM issuestatuscounter"))
+    session.commit()
+
+    # Two API workers starting at the same time.
+    start = threading.Barrier(2)
+
+    def reconcile():
+        with Session(test_engine) as worker_session:
+            start.wait()
+            return IssueMetricsService.reconcile_status_counters(worker_session)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        repaired = sorted(pool.map(lambda _: reconcile(), range(2)))
+
+    assert repaired == [0, 2]
+    assert _counters(session) == {
+        (organization.id, "REPORTED"): 2,
+        (organization.id, "CLOSED"): 1,
+    }
+
+
+def test_flush_hook_does_not_refresh_or_read_issues_one_by_one(session):
+    category, organization, admin, citizen = _seed(session)
+    issue_ids = [
+        _create_issue(session, category, organization, citizen).id for _ in range(3)
+    ]
+    admin_id = admin.id
+    session.commit()  # expires every loaded issue
+
+    with record_statements() as log:
+        session.add(User(email="bystander-rollup@test.com", role="CITIZEN"))
+        session.commit()
+    assert log.matching(r"FROM issue\b") == []
+
+    with record_statements() as log:
+        for issue_id in issue_ids:
+            session.add(
+                AuditLog(
+                    action="STATUS_CHANGE",
+                    entity_type="ISSUE",
+                    entity_id=issue_id,
+                    actor_id=admin_id,
+                    old_value="REPORTED",
+                    new_value="RESOLVED",
+                )
+            )
+        session.commit()
+    assert len(log.matching(r"FROM issue\b")) == 1, log.statements
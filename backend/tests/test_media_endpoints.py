@@ -15,7 +15,7 @@ import pytest
 import io
 from datetime import datetime, timedelta
 from app.core.time import utc_now
-from uuid import uuid4
+from uuid import UUID, uuid4
 from PIL import Image
 from sqlmodel import Session, select, desc
 
@@ -231,6 +231,238 @@ class TestMediaEndpoint:
         assert resp.status_code == 200
         assert "image/jpeg" in resp.headers.get("content-type", "")
 
+    def test_get_thumbnail_is_downscaled_and_stored_next_to_original(
+        self, client, session
+    ):
+        from app.core.config import settings
+        from app.services.media_derivatives import MediaDerivativeService
+        from app.services.minio_client import minio_client
+
+        cat, citizen, _, _ = _seed(session)
+        _login(client, session, citizen.email)
+        resp = client.post(
+            "/api/v1/issues/report",
+            data={"category_id": str(cat.id), "lat": "17.44", "lng": "78.35"},
+            files={"photo": ("big.jpg", _make_jpeg(2000, 1500), "image/jpeg")},
+        )
+        assert resp.status_code == 200
+        issue_id = resp.json()["issue_id"]
+
+        resp = client.get(f"/api/v1/media/{issue_id}/before?size=thumb")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "image/jpeg"
+        thumb = Image.open(io.BytesIO(resp.content))
+        assert max(thumb.size) == settings.MEDIA_THUMB_MAX_PX
+
+        resp = client.get(
+            f"/api/v1/media/{issue_id}/before?size=medium",
+            headers={"Accept": "image/webp,image/*"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "image/webp"
+        assert Image.open(io.BytesIO(resp.content)).format == "WEBP"
+
+        evidence = session.exec(
+            select(Evidence).where(Evidence.issue_id == issue_id)
+        ).first()
+        thumb_path = MediaDerivativeService.derivative_path(
+            evidence.file_path, "thumb", "webp"
+        )
+        assert thumb_path.rsplit("/", 1)[0] == evidence.file_path.rsplit("/", 1)[0]
+        minio_client.stat_object(settings.MINIO_BUCKET, thumb_path)
+
+    def test_concurrent_derivative_requests_render_once(self, monkeypatch):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from app.services.media_derivatives import MediaDerivativeService
+        from app.services.photo_storage import PhotoStorage
+
+        stored = set()
+        renders = []
+
+        def generate(file_path):
+            renders.append(file_path)
+            time.sleep(0.2)
+            for size in ("thumb", "medium"):
+                for fmt in ("jpeg", "webp"):
+                    stored.add(MediaDerivativeService.derivative_path(file_path, size, fmt))
+
+        monkeypatch.setattr(MediaDerivativeService, "generate", staticmethod(generate))
+        monkeypatch.setattr(PhotoStorage, "object_exists", staticmethod(stored.__contains__))
+
+        start = threading.Barrier(8)
+
+        def request(_):
+            start.wait()
+            return MediaDerivativeService.ensure("issues/a.jpg", "thumb", "webp")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            paths = set(pool.map(request, range(8)))
+        assert paths == {"issues/a.thumb.webp"}
+        assert renders == ["issues/a.jpg"]
+
+    def test_object_stream_releases_once_even_if_never_iterated(self):
+        from app.api.v1.media import _ObjectStream
+
+        class FakeResponse:
+            released = 0
+
+            def stream(self, chunk_size):
+                yield b"abc"
+
+            def close(self):
+                pass
+
+            def release_conn(self):
+                self.released += 1
+
+        unread = FakeResponse()
+        body = _ObjectStream(unread, 1024)
+        body.close()
+        body.close()
+        assert unread.released == 1
+
+        drained = FakeResponse()
+        body = _ObjectStream(drained, 1024)
+        assert list(body) == [b"abc"]
+        body.close()
+        assert drained.released == 1
+
+    def _report_photo(self, client, session, photo):
+        cat, citizen, _, _ = _seed(session)
+        _login(client, session, citizen.email)
+        resp = client.post(
+            "/api/v1/issues/report",
+            data={"category_id": str(cat.id), "lat": "17.44", "lng": "78.35"},
+            files={"photo": ("test.jpg", photo, "image/jpeg")},
+        )
+        assert resp.status_code == 200
+        return resp.json()["issue_id"]
+
+    def test_get_media_sends_validators_and_honours_if_none_match(
+        self, client, session
+    ):
+        photo = _make_jpeg()
+        issue_id = self._report_photo(client, session, photo)
+
+        resp = client.get(f"/api/v1/media/{issue_id}/before")
+        assert resp.status_code == 200
+        assert resp.content == photo
+        assert resp.headers["accept-ranges"] == "bytes"
+        assert resp.headers["last-modified"]
+        etag = resp.headers["etag"]
+
+        resp = client.get(
+            f"/api/v1/media/{issue_id}/before", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    def test_get_media_serves_byte_ranges(self, client, session):
+        photo = _make_jpeg()
+        issue_id = self._report_photo(client, session, photo)
+        url = f"/api/v1/media/{issue_id}/before"
+
+        resp = client.get(url, headers={"Range": "bytes=0-9"})
+        assert resp.status_code == 206
+        assert resp.content == photo[:10]
+        assert resp.headers["content-range"] == f"bytes 0-9/{len(photo)}"
+
+        resp = client.get(url, headers={"Range": "bytes=-5"})
+        assert resp.status_code == 206
+        assert resp.content == photo[-5:]
+
+        resp = client.get(url, headers={"Range": f"bytes={len(photo)}-"})
+        assert resp.status_code == 416
+        assert resp.headers["content-range"] == f"bytes */{len(photo)}"
+
+    def test_redirect_mode_returns_cached_presigned_url(
+        self, client, session, monkeypatch
+    ):
+        import httpx
+
+        from app.core.config import settings
+        from app.services.presigned_urls import presigned_urls
+
+        photo = _make_jpeg()
+        issue_id = self._report_photo(client, session, photo)
+        monkeypatch.setattr(settings, "MEDIA_DELIVERY_MODE", "redirect")
+        presigned_urls.clear()
+
+        url = f"/api/v1/media/{issue_id}/before"
+        first = client.get(url, follow_redirects=False)
+        second = client.get(url, follow_redirects=False)
+        assert first.status_code == 302
+        location = first.headers["location"]
+        assert "X-Amz-Signature" in location
+        assert second.headers["location"] == location
+        assert "max-age=" in first.headers["cache-control"]
+
+        direct = httpx.get(location)
+        assert direct.status_code == 200
+        assert direct.content == photo
+
+    def test_warm_media_lookup_skips_database(self, client, session):
+        from conftest import record_statements
+
+        first_photo = _make_jpeg(color=(10, 20, 30))
+        issue_id = self._report_photo(client, session, first_photo)
+        url = f"/api/v1/media/{issue_id}/before"
+
+        etag = client.get(url).headers["etag"]
+        with record_statements() as log:
+            resp = client.get(url)
+            revalidated = client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert revalidated.status_code == 304
+        assert log.statements == []
+
+        # A new report photo for the same issue replaces the cached entry.
+        second_photo = _make_jpeg(color=(200, 20, 30))
+        category = session.exec(select(Category)).first()
+        resp = client.post(
+            "/api/v1/issues/report",
+            data={"category_id": str(category.id), "lat": "17.44", "lng": "78.35"},
+            files={"photo": ("again.jpg", second_photo, "image/jpeg")},
+        )
+        assert resp.json()["issue_id"] == issue_id
+        assert client.get(url).content == second_photo
+
+    def test_lookup_overlapping_an_evidence_commit_is_not_cached(
+        self, client, session, monkeypatch
+    ):
+        from conftest import record_statements
+        from app.db import change_tracking
+        from app.services.evidence_lookup import EvidenceLookupService
+
+        issue_id = UUID(self._report_photo(client, session, _make_jpeg()))
+        EvidenceLookupService.clear()
+
+        # Another request commits evidence while this lookup reads the row.
+        original_exec = Session.exec
+
+        def exec_then_commit_elsewhere(self, *args, **kwargs):
+            result = original_exec(self, *args, **kwargs)
+            change_tracking.bump(["evidence"])
+            return result
+
+        monkeypatch.setattr(Session, "exec", exec_then_commit_elsewhere)
+        assert EvidenceLookupService.latest(session, issue_id, "REPORT") is not None
+        monkeypatch.undo()
+
+        with record_statements() as log:
+            assert EvidenceLookupService.latest(session, issue_id, "REPORT") is not None
+        assert len(log.statements) == 1, log.statements
+
+    def test_get_media_rejects_unknown_size(self, client, session):
+        cat, citizen, _, _ = _seed(session)
+        issue = _create_issue(session, cat, citizen)
+
+        resp = client.get(f"/api/v1/media/{issue.id}/before?size=huge")
+        assert resp.status_code == 400
+
     def test_get_media_404_when_no_evidence(self, client, session):
         cat, citizen, _, _ = _seed(session)
         issue = _create_issue(session, cat, citizen)
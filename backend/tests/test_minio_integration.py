@@ -53,3 +53,73 @@ def test_report_issue_uploads_to_minio(client, session):
 
     result = minio_client.stat_object(settings.MINIO_BUCKET, evidence.file_path)
     assert result.object_name == evidence.file_path
+
+
+def test_store_stream_reports_size_and_digest():
+    import hashlib
+
+    from app.services.photo_storage import PhotoStorage
+
+    file_content = _make_test_image_bytes()
+    stored = PhotoStorage.store_stream(io.BytesIO(file_content), "issues/stream-test.jpg")
+
+    assert stored.size == len(file_content)
+    assert stored.sha256 == hashlib.sha256(file_content).hexdigest()
+    stat = minio_client.stat_object(settings.MINIO_BUCKET, stored.file_path)
+    assert stat.size == len(file_content)
+
+
+def test_report_issue_rejects_oversized_photo(client, session, monkeypatch):
+    seed_default_authority(session)
+    category = Category(name="Pothole", default_priority="P2")
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    login_via_otp(client, session, "oversized@test.com")
+
+    file_content = _make_test_image_bytes()
+    monkeypatch.setattr(settings, "MAX_PHOTO_UPLOAD_BYTES", len(file_content) - 1)
+
+    response = client.post(
+        "/api/v1/issues/report",
+        data={"category_id": str(category.id), "lat": 17.4447, "lng": 78.3483},
+        files={"photo": ("big.jpg", file_content, "image/jpeg")},
+    )
+
+    assert response.status_code == 413
+    assert session.exec(select(Issue)).all() == []
+
+
+def test_content_addressed_reports_share_one_object(client, session, monkeypatch):
+    import hashlib
+
+    from app.services.photo_storage import PhotoStorage, digest_index
+
+    monkeypatch.setattr(settings, "PHOTO_STORAGE_MODE", "content")
+    seed_default_authority(session)
+    category = Category(name="Pothole", default_priority="P2")
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    login_via_otp(client, session, "content-addressed@example.com")
+
+    file_content = _make_test_image_bytes()
+    digest = hashlib.sha256(file_content).hexdigest()
+    for lat, lng in ((17.4447, 78.3483), (17.4300, 78.3300)):
+        response = client.post(
+            "/api/v1/issues/report",
+            data={"category_id": str(category.id), "lat": lat, "lng": lng},
+            files={"photo": ("test.jpg", file_content, "image/jpeg")},
+        )
+        assert response.status_code == 200
+
+    evidence = session.exec(select(Evidence)).all()
+    assert len(evidence) == 2
+    assert {row.file_path for row in evidence} == {PhotoStorage.content_key(digest)}
+    assert {row.content_sha256 for row in evidence} == {digest}
+
+    # With the local index cold, stat_object still finds the object.
+    digest_index.clear()
+    stored = PhotoStorage.store_content_addressed(io.BytesIO(file_content))
+    assert stored.reused
+    assert stored.file_path == PhotoStorage.content_key(digest)
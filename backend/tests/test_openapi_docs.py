@@ -64,7 +64,11 @@ def test_all_routes_have_openapi_metadata_and_documented_success_responses():
             primary_success = operation["responses"][sorted(success_codes)[0]]
             content = primary_success.get("content", {})
             json_schema = content.get("application/json", {}).get("schema")
-            binary_schema = content.get("image/jpeg", {}).get("schema")
+            binary_schema = (
+                content.get("image/jpeg")
+                or content.get("application/vnd.mapbox-vector-tile")
+                or {}
+            ).get("schema")
 
             if content and not (
                 _has_meaningful_schema(json_schema)
@@ -214,3 +214,57 @@ class TestSysadminSeesAllIssues:
         resp = client.get("/api/v1/admin/issues")
         assert resp.status_code == 200
         assert len(resp.json()) == 2
+
+
+class TestJurisdictionIndex:
+    """In-memory routing must agree with PostGIS and follow zone edits."""
+
+    def _seed_overlapping(self, session: Session):
+        big_zone, big_org = _seed_org_with_zone(session)
+        small_zone = Zone(
+            name="Old City Zone",
+            boundary="SRID=4326;POLYGON((78.40 17.41,78.46 17.41,78.46 17.44,78.40 17.44,78.40 17.41))",
+        )
+        session.add(small_zone)
+        session.flush()
+        small_org = Organization(name="Old City Authority", zone_id=small_zone.id)
+        session.add(small_org)
+        session.flush()
+        return big_org, small_org
+
+    def test_overlapping_zones_route_to_smallest(self, client, session):
+        _, small_org = self._seed_overlapping(session)
+        point_wkt = f"SRID=4326;POINT({HYDERABAD_LNG} {HYDERABAD_LAT})"
+
+        # Uncommitted zones: answered by PostGIS.
+        assert IssueService.find_org_for_location(session, point_wkt) == small_org.id
+
+        # Committed zones: answered by the in-memory index.
+        session.commit()
+        assert IssueService.find_org_for_location(session, point_wkt) == small_org.id
+
+    def test_index_follows_committed_zone_update(self, client, session):
+        from app.services.system_admin_service import SystemAdminService
+
+        _, org = _seed_org_with_zone(session)
+        actor = User(email="sysadmin@marg.gov.in", role="SYSADMIN")
+        session.add(actor)
+        session.commit()
+
+        point_wkt = "SRID=4326;POINT(78.60 17.42)"
+        assert IssueService.find_org_for_location(session, point_wkt) is None
+
+        SystemAdminService.update_authority(
+            session,
+            org_id=org.id,
+            actor_id=actor.id,
+            jurisdiction_points=[
+                (78.33, 17.40),
+                (78.70, 17.40),
+                (78.70, 17.47),
+                (78.33, 17.47),
+                (78.33, 17.40),
+            ],
+        )
+        session.commit()
+        assert IssueService.find_org_for_location(session, point_wkt) == org.id
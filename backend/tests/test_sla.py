@@ -0,0 +1,168 @@
+"""
+SLA Compliance Tests
+
+Covers GET /api/v1/analytics/sla and GET /api/v1/admin/sla:
+  1. Met, late, breached and pending issues against each category's SLA
+  2. Time to the next breach and average acceptance time
+  3. Issues closed without a resolution are not counted
+  4. Admins only see their own authority, per (org, category, priority)
+  5. The report is built from one statement
+  6. Categories sharing a name are reported separately
+"""
+
+from datetime import timedelta
+
+from sqlmodel import Session, select
+
+from app.core.time import utc_now
+from app.models.domain import Category, Issue, Organization, User, Zone
+from conftest import login_via_otp, record_statements, seed_default_authority
+
+
+def _seed(session: Session):
+    _, organization = seed_default_authority(session)
+    other_zone = Zone(
+        name="North Zone",
+        boundary="SRID=4326;POLYGON((78.40 17.48,78.50 17.48,78.50 17.58,78.40 17.58,78.40 17.48))",
+    )
+    session.add(other_zone)
+    session.flush()
+    other = Organization(name="North Authority", zone_id=other_zone.id)
+    pothole = Category(name="Pothole", expected_sla_days=7)
+    drainage = Category(name="Drainage", expected_sla_days=2)
+    citizen = User(email="citizen-sla@test.com", role="CITIZEN")
+    admin = User(email="admin-sla@authority.gov.in", role="ADMIN", org_id=organization.id)
+    session.add_all([other, pothole, drainage, citizen, admin])
+    session.commit()
+
+    now = utc_now()
+    ten_days_ago = now - timedelta(days=10)
+    yesterday = now - timedelta(days=1)
+
+    def issue(category, org, created_at, status="REPORTED", priority="P3", **kwargs):
+        session.add(
+            Issue(
+                category_id=category.id,
+                org_id=org.id,
+                status=status,
+                priority=priority,
+                location="SRID=4326;POINT(78.35 17.44)",
+                reporter_id=citizen.id,
+                created_at=created_at,
+                **kwargs,
+            )
+        )
+
+    # Resolved within the 7-day SLA, accepted after 24 h.
+    issue(
+        pothole,
+        organization,
+        ten_days_ago,
+        status="RESOLVED",
+        accepted_at=ten_days_ago + timedelta(days=1),
+        resolved_at=ten_days_ago + timedelta(days=3),
+    )
+    # Resolved after the deadline.
+    issue(
+        pothole,
+        organization,
+        ten_days_ago,
+        status="CLOSED",
+        resolved_at=ten_days_ago + timedelta(days=9),
+    )
+    # Open past the deadline.
+    issue(pothole, organization, ten_days_ago)
+    # Open, six days left.
+    issue(pothole, organization, yesterday)
+    # Closed without a resolution: not counted.
+    issue(drainage, organization, ten_days_ago, status="CLOSED", priority="P1")
+    # Open, one day of the 2-day SLA left, accepted after 12 h.
+    issue(
+        drainage,
+        organization,
+        yesterday,
+        status="ACCEPTED",
+        priority="P1",
+        accepted_at=yesterday + timedelta(hours=12),
+    )
+    # Another authority, open past the deadline.
+    issue(pothole, other, ten_days_ago)
+    session.commit()
+    return organization, admin
+
+
+def test_public_sla_report(client, session):
+    _seed(session)
+
+    response = client.get("/api/v1/analytics/sla")
+    assert response.status_code == 200
+    data = response.json()
+
+    summary = data["summary"]
+    assert summary["issues"] == 6
+    assert summary["met"] == 1
+    assert summary["resolved_late"] == 1
+    assert summary["open_breached"] == 2
+    assert summary["breached"] == 3
+    assert summary["open_within_sla"] == 2
+    assert summary["compliance"] == 25.0
+    assert 23.5 <= summary["hours_to_next_breach"] <= 24.0
+    assert summary["avg_accept_hours"] == 18.0
+
+    by_category = {item["name"]: item for item in data["by_category"]}
+    assert by_category["Pothole"]["issues"] == 5
+    assert by_category["Pothole"]["compliance"] == 25.0
+    assert by_category["Drainage"]["issues"] == 1
+    assert by_category["Drainage"]["compliance"] is None
+    assert [item["name"] for item in data["by_priority"]] == ["P1", "P3"]
+    assert "groups" not in data
+
+
+def test_admin_sla_is_scoped_to_their_authority(client, session):
+    organization, admin = _seed(session)
+
+    assert client.get("/api/v1/admin/sla").status_code == 401
+
+    login_via_otp(client, session, admin.email)
+    response = client.get("/api/v1/admin/sla")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["summary"]["issues"] == 5
+    assert data["summary"]["compliance"] == 33.3
+    groups = {(group["category_name"], group["priority"]): group for group in data["groups"]}
+    assert set(groups) == {("Pothole", "P3"), ("Drainage", "P1")}
+    assert all(group["org_id"] == str(organization.id) for group in data["groups"])
+    assert groups[("Pothole", "P3")]["sla_days"] == 7
+    assert groups[("Pothole", "P3")]["open_breached"] == 1
+    assert groups[("Drainage", "P1")]["open_within_sla"] == 1
+
+
+def test_sla_report_is_one_statement(client, session):
+    _seed(session)
+
+    with record_statements() as log:
+        assert client.get("/api/v1/analytics/sla").status_code == 200
+    assert len(log.statements) == 1, log.statements
+
+
+def test_categories_with_the_same_name_are_not_merged(client, session):
+    organization, _ = _seed(session)
+    citizen = session.exec(select(User).where(User.role == "CITIZEN")).one()
+    lenient = Category(name="Drainage", expected_sla_days=30)
+    session.add(lenient)
+    session.commit()
+    session.add(
+        Issue(
+            category_id=lenient.id,
+            org_id=organization.id,
+            location="SRID=4326;POINT(78.35 17.44)",
+            reporter_id=citizen.id,
+            created_at=utc_now() - timedelta(days=10),
+        )
+    )
+    session.commit()
+
+    data = client.get("/api/v1/analytics/sla").json()
+    drainage = [item for item in data["by_category"] if item["name"] == "Drainage"]
+    assert sorted(item["open_within_sla"] for item in drainage) == [1, 1]
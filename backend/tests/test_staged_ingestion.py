@@ -0,0 +1,116 @@
+"""
+Staged Report Ingestion Tests
+
+Covers the REPORT_INGEST_MODE=staged path of POST /issues/report:
+  1. 202 response with a PENDING evidence row
+  2. Background EXIF + upload completing the evidence row
+  3. Status and metrics endpoints
+  4. Backpressure when the pipeline is full
+"""
+
+import io
+
+import pytest
+from PIL import Image
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.domain import Category, Evidence, User
+from app.services.ingest_service import IngestPipeline, ingest_pipeline
+from app.services.minio_client import minio_client
+from conftest import login_via_otp, seed_default_authority, test_engine
+
+
+def _make_jpeg() -> bytes:
+    img = Image.new("RGB", (64, 64), color="green")
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def staged_mode(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_INGEST_MODE", "staged")
+    monkeypatch.setattr(
+        ingest_pipeline, "session_factory", lambda: Session(test_engine)
+    )
+    yield
+    assert ingest_pipeline.drain(timeout=10)
+
+
+def _seed(session: Session):
+    seed_default_authority(session)
+    category = Category(name="Pothole", default_priority="P2")
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    return category
+
+
+def _report(client, category):
+    return client.post(
+        "/api/v1/issues/report",
+        data={"category_id": str(category.id), "lat": 17.4447, "lng": 78.3483},
+        files={"photo": ("test.jpg", _make_jpeg(), "image/jpeg")},
+    )
+
+
+def test_staged_report_returns_202_and_completes(client, session, staged_mode):
+    category = _seed(session)
+    login_via_otp(client, session, "staged@test.com")
+
+    response = _report(client, category)
+    assert response.status_code == 202
+    body = response.json()
+    assert body["upload_status"] == "PENDING"
+
+    assert ingest_pipeline.drain(timeout=10)
+    session.expire_all()
+    evidence = session.get(Evidence, body["evidence_id"])
+    assert evidence is not None
+    assert evidence.upload_status == "STORED"
+    assert evidence.exif_timestamp is not None
+    stat = minio_client.stat_object(settings.MINIO_BUCKET, evidence.file_path)
+    assert stat.object_name == evidence.file_path
+
+    status_response = client.get(f"/api/v1/issues/ingest/{body['evidence_id']}")
+    assert status_response.status_code == 200
+    assert status_response.json()["upload_status"] == "STORED"
+
+
+def test_ingest_status_hidden_from_other_citizens(client, session, staged_mode):
+    category = _seed(session)
+    login_via_otp(client, session, "owner@test.com")
+    evidence_id = _report(client, category).json()["evidence_id"]
+
+    login_via_otp(client, session, "stranger@test.com")
+    response = client.get(f"/api/v1/issues/ingest/{evidence_id}")
+    assert response.status_code == 404
+
+
+def test_staged_report_rejected_when_pipeline_full(
+    client, session, staged_mode, monkeypatch
+):
+    category = _seed(session)
+    login_via_otp(client, session, "busy@test.com")
+    monkeypatch.setattr(
+        "app.api.v1.issues.ingest_pipeline",
+        IngestPipeline(max_workers=1, max_pending=0),
+    )
+
+    response = _report(client, category)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.INGEST_RETRY_AFTER_SECONDS)
+    session.expire_all()
+    assert session.exec(select(Evidence)).all() == []
+
+
+def test_ingest_metrics_requires_admin(client, session):
+    admin = User(email="admin@authority.gov.in", role="ADMIN")
+    session.add(admin)
+    session.commit()
+    login_via_otp(client, session, admin.email)
+
+    response = client.get("/api/v1/issues/ingest/metrics")
+    assert response.status_code == 200
+    assert response.json()["capacity"] == ingest_pipeline.max_pending
@@ -67,3 +67,62 @@ def test_exif_timestamp_boundary():
     # 7 days, 1 hour (Fail)
     old = now - timedelta(days=7, hours=1)
     assert ExifService.validate_timestamp(old, threshold_days=7) is False
+
+
+def _jpeg_with_exif(timestamp="2024:06:01 08:15:00", lat_ref="N", lng_ref="E"):
+    import io
+    from PIL import Image
+
+    exif = Image.Exif()
+    exif.get_ifd(0x8769)[0x9003] = timestamp
+    exif.get_ifd(0x8825).update(
+        {1: lat_ref, 2: (17.0, 26.0, 40.92), 3: lng_ref, 4: (78.0, 20.0, 53.88)}
+    )
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 64), color="gray").save(buf, format="JPEG", exif=exif)
+    return buf.getvalue()
+
+
+def test_exif_fast_path_reads_gps_and_capture_time():
+    metadata = ExifService.extract_metadata(_jpeg_with_exif()[:4096])
+    assert metadata["timestamp"] == datetime(2024, 6, 1, 8, 15, 0)
+    assert metadata["lat"] == pytest.approx(17.4447, abs=1e-4)
+    assert metadata["lng"] == pytest.approx(78.3483, abs=1e-4)
+
+
+def test_exif_fast_path_matches_pil_hemispheres():
+    photo = _jpeg_with_exif(lat_ref="S", lng_ref="W")
+    fast = ExifService.extract_metadata(photo)
+    import io
+
+    legacy = ExifService._extract_metadata_pil(io.BytesIO(photo))
+    assert fast["lat"] == pytest.approx(legacy["lat"])
+    assert fast["lng"] == pytest.approx(legacy["lng"])
+    assert fast["lat"] < 0 and fast["lng"] < 0
+
+
+def test_exif_fallback_reads_the_full_stream(monkeypatch):
+    import io
+
+    def unparseable(file_content):
+        raise ValueError("Invalid TIFF byte order")
+
+    monkeypatch.setattr(
+        ExifService, "_extract_jpeg_metadata", staticmethod(unparseable)
+    )
+    source = io.BytesIO(_jpeg_with_exif())
+    metadata = ExifService.extract_metadata(source.read(64), source)
+    assert metadata["lat"] == pytest.approx(17.4447, abs=1e-4)
+    assert metadata["timestamp"] == datetime(2024, 6, 1, 8, 15, 0)
+    assert source.tell() == 0
+
+
+def test_exif_non_jpeg_falls_back_to_pil():
+    import io
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (16, 16)).save(buf, format="PNG")
+    metadata = ExifService.extract_metadata(buf.getvalue())
+    assert metadata["lat"] is None
+    assert isinstance(metadata["timestamp"], datetime)
@@ -0,0 +1,101 @@
+"""
+Vector Tile Tests
+
+Covers GET /api/v1/analytics/tiles/{z}/{x}/{y}.pbf:
+  1. A tile over an open issue and its zone carries both layers
+  2. Closed issues and tiles elsewhere are left out
+  3. ETag revalidation and the (z, x, y, data version) cache
+  4. Out-of-range tile coordinates are rejected
+"""
+
+import math
+
+from sqlmodel import Session
+
+from app.models.domain import Category, Issue, User
+from conftest import record_statements, seed_default_authority
+
+ZOOM = 12
+
+
+def _tile_for(lng: float, lat: float, z: int = ZOOM):
+    n = 2**z
+    x = int((lng + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return z, x, y
+
+
+def _url(z, x, y):
+    return f"/api/v1/analytics/tiles/{z}/{x}/{y}.pbf"
+
+
+def _seed(session: Session, status="REPORTED"):
+    seed_default_authority(session)
+    category = Category(name="Pothole")
+    citizen = User(email="citizen-tiles@test.com", role="CITIZEN")
+    session.add(category)
+    session.add(citizen)
+    session.commit()
+    session.add(
+        Issue(
+            category_id=category.id,
+            status=status,
+            location="SRID=4326;POINT(78.35 17.44)",
+            reporter_id=citizen.id,
+        )
+    )
+    session.commit()
+    return category, citizen
+
+
+def test_tile_contains_issue_and_zone_layers(client, session):
+    _seed(session)
+
+    response = client.get(_url(*_tile_for(78.35, 17.44)))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    body = response.content
+    for value in (b"issues", b"zones", b"Pothole", b"REPORTED", b"Central Zone"):
+        assert value in body
+
+
+def test_closed_issues_and_distant_tiles_are_empty(client, session):
+    _seed(session, status="CLOSED")
+
+    body = client.get(_url(*_tile_for(78.35, 17.44))).content
+    assert b"Pothole" not in body
+
+    distant = client.get(_url(*_tile_for(77.20, 28.60)))
+    assert distant.status_code == 200
+    assert distant.content == b""
+
+
+def test_tile_revalidation_and_cache(client, session):
+    category, citizen = _seed(session)
+    url = _url(*_tile_for(78.35, 17.44))
+
+    first = client.get(url)
+    with record_statements() as log:
+        cached = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert cached.status_code == 304
+    assert log.statements == []
+
+    session.add(
+        Issue(
+            category_id=category.id,
+            status="IN_PROGRESS",
+            location="SRID=4326;POINT(78.351 17.441)",
+            reporter_id=citizen.id,
+        )
+    )
+    session.commit()
+
+    changed = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert changed.status_code == 200
+    assert b"IN_PROGRESS" in changed.content
+
+
+def test_out_of_range_tile_is_rejected(client, session):
+    assert client.get(_url(2, 4, 0)).status_code == 400
+    assert client.get(_url(23, 0, 0)).status_code == 400
@@ -39,6 +39,21 @@ const StatBox = ({ label, value, trend, icon: Icon, colorClass }) => (
     </motion.div>
 )
 
+// /analytics/issues-public is paginated; follow X-Next-Cursor until the
+// last page so the map shows every issue.
+const fetchAllPublicIssues = async () => {
+  const issues = []
+  let cursor = null
+  do {
+    const res = await api.get('/analytics/issues-public', {
+      params: cursor ? { limit: 5000, cursor } : { limit: 5000 }
+    })
+    issues.push(...res.data)
+    cursor = res.headers['x-next-cursor'] || null
+  } while (cursor)
+  return issues
+}
+
 export default function AnalyticsDashboard() {
   const [data, setData] = useState(null)
   const [heatmapData, setHeatmapData] = useState([])
@@ -57,14 +72,14 @@ export default function AnalyticsDashboard() {
     }
 
     try {
-      const [statsRes, heatRes, issuesRes] = await Promise.all([
+      const [statsRes, heatRes, allIssues] = await Promise.all([
         api.get('/analytics/stats'),
         api.get('/analytics/heatmap'),
-        api.get('/analytics/issues-public')
+        fetchAllPublicIssues()
       ])
       setData(statsRes.data)
       setHeatmapData(heatRes.data)
-      setIssues(issuesRes.data)
+      setIssues(allIssues)
       setLastRefresh(new Date())
     } catch (err) {
       console.error("Failed to fetch analytics", err)